@@ -0,0 +1,175 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+from fastapi import HTTPException, Request
+import metrics
+from config import (
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_QUEUE_LIMITS,
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+    PRIORITY_API_KEYS,
+    REPORT_LATENCY_BUDGET_MS,
+    SEARCH_LATENCY_BUDGET_MS
+)
+from models import QueryRequest, ReportRequest
+from profiling import stage
+from routing import deadline_from_budget
+
+# Highest priority first
+PRIORITY_CLASSES = ("urgent", "standard", "bulk")
+DEFAULT_PRIORITY = "standard"
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, priority: str, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason}) for {priority} requests")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Limits concurrent LLM-bound requests, queueing the rest by priority class.
+
+    Each class has a bounded FIFO queue. A freed slot always goes to the oldest
+    waiter of the highest non-empty class. A request that would overflow its
+    queue is rejected immediately, and one that waits past its class's maximum
+    queue wait is shed; both surface as Overloaded.
+    """
+
+    def __init__(self, max_concurrent: int, queue_limits: Dict[str, int], max_queue_wait: Dict[str, float]):
+        self.max_concurrent = max_concurrent
+        self.queue_limits = queue_limits
+        self.max_queue_wait = max_queue_wait
+        self.active = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {priority: deque() for priority in PRIORITY_CLASSES}
+        self._service_time = 1.0  # EWMA of seconds a request holds a slot
+
+    def queue_depth(self, priority: str) -> int:
+        return sum(1 for waiter in self._queues[priority] if not waiter.done())
+
+    def _retry_after(self, priority: str) -> int:
+        ahead = sum(self.queue_depth(p) for p in PRIORITY_CLASSES[:PRIORITY_CLASSES.index(priority) + 1])
+        return max(1, math.ceil((ahead + 1) * self._service_time / max(1, self.max_concurrent)))
+
+    def _shed(self, priority: str, reason: str) -> Overloaded:
+        metrics.incr(f"admission.{priority}.shed_{reason}")
+        return Overloaded(priority, reason, self._retry_after(priority))
+
+    def _publish_depth(self, priority: str) -> None:
+        metrics.set_gauge(f"admission.{priority}.queue_depth", self.queue_depth(priority))
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued requests, highest priority first"""
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            while queue and self.active < self.max_concurrent:
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                self.active += 1
+                waiter.set_result(None)
+            self._publish_depth(priority)
+
+    async def _acquire(self, priority: str, deadline: Optional[float]) -> None:
+        if self.active < self.max_concurrent and not any(self.queue_depth(p) for p in PRIORITY_CLASSES):
+            self.active += 1
+            metrics.observe(f"admission.{priority}.wait_seconds", 0.0)
+            return
+        queue = self._queues[priority]
+        if self.queue_depth(priority) >= self.queue_limits[priority]:
+            raise self._shed(priority, "queue_full")
+
+        timeout = self.max_queue_wait[priority]
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+        if timeout <= 0:
+            raise self._shed(priority, "deadline")
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._dispatch()
+        enqueued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            raise self._shed(priority, "deadline")
+        except asyncio.CancelledError:
+            # The slot may have been granted just before the client went away
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+        finally:
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                queue.remove(waiter)
+            except ValueError:
+                pass
+            self._publish_depth(priority)
+        metrics.observe(f"admission.{priority}.wait_seconds", time.monotonic() - enqueued_at)
+
+    def _release(self) -> None:
+        self.active -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self, priority: str, deadline: Optional[float] = None):
+        """Hold a slot for the duration of the block, waiting in the class queue if needed"""
+        with stage("admission.queue"):
+            await self._acquire(priority, deadline)
+        metrics.incr(f"admission.{priority}.admitted")
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - start_time)
+            self._release()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": {priority: self.queue_depth(priority) for priority in PRIORITY_CLASSES},
+            "service_time_seconds": round(self._service_time, 3)
+        }
+
+def request_priority(request: Request) -> str:
+    """Priority class granted to the caller's API key; everyone else is standard.
+
+    A caller-supplied header is never trusted, or any client could jump the queue.
+    """
+    priority = PRIORITY_API_KEYS.get(request.headers.get("x-api-key", ""), DEFAULT_PRIORITY)
+    return priority if priority in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+admission_controller = AdmissionController(
+    ADMISSION_MAX_CONCURRENT,
+    ADMISSION_QUEUE_LIMITS,
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS
+)
+metrics.register_collector("admission", admission_controller.stats)
+
+@asynccontextmanager
+async def _admitted(http_request: Request, budget_ms: Optional[int], default_budget_ms: int):
+    # The budget starts on arrival, so time spent queued counts against it;
+    # the route reads the same deadline from request.state
+    deadline = deadline_from_budget(budget_ms, default_budget_ms)
+    http_request.state.deadline = deadline
+    try:
+        async with admission_controller.admit(request_priority(http_request), deadline):
+            yield
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def admitted_search(request: QueryRequest, http_request: Request):
+    """Route dependency: admit a search within its latency budget or fail fast with 503 and Retry-After"""
+    async with _admitted(http_request, request.latency_budget_ms, SEARCH_LATENCY_BUDGET_MS):
+        yield
+
+async def admitted_report(request: ReportRequest, http_request: Request):
+    """Route dependency: admit a report within its latency budget or fail fast with 503 and Retry-After"""
+    async with _admitted(http_request, request.latency_budget_ms, REPORT_LATENCY_BUDGET_MS):
+        yield
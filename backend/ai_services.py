@@ -1,10 +1,43 @@
-from typing import List
+import asyncio
+import logging
+from typing import Dict, List, Optional
 from datetime import datetime
-from models import CaseSummary, ActionableInsight, ReportResponse
-from config import anthropic_client
+from models import CaseSummary, ActionableInsight, ReportFragment, ReportResponse
+import metrics
+from config import (
+    LLM_HEDGE_MAX_FRACTION,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_QUANTILE,
+    LLM_HEDGING_ENABLED,
+    LLM_REPORT_TIMEOUT_SECONDS,
+    LLM_SUMMARY_TIMEOUT_SECONDS,
+    get_anthropic_client
+)
+from cache import report_fragment_cache, report_fragment_cache_key
+from case_packs import case_id, get_case
+from hedging import HedgePolicy
+from executors import run_parser
+from parsers import parse_executive_summary, parse_report_fragment, parse_summary_response
+from profiling import stage
+from routing import FALLBACK, model_router
 
-async def generate_ai_summary(case_data: dict, query: str, jurisdiction: str = "federal") -> CaseSummary:
-    """Generate AI-powered summary and key takeaways for a case using Anthropic"""
+logger = logging.getLogger(__name__)
+
+summary_hedging = HedgePolicy(
+    "summary",
+    enabled=LLM_HEDGING_ENABLED,
+    max_hedge_fraction=LLM_HEDGE_MAX_FRACTION,
+    quantile=LLM_HEDGE_QUANTILE,
+    min_samples=LLM_HEDGE_MIN_SAMPLES
+)
+metrics.register_collector("summary_hedging", summary_hedging.stats)
+
+async def generate_ai_summary(case_data: dict, query: str, jurisdiction: str = "federal", deadline: Optional[float] = None) -> CaseSummary:
+    """Generate AI-powered summary and key takeaways for a case using Anthropic.
+
+    The model tier is picked per call from the deadline and current load; under
+    pressure the precomputed fallback summary is returned without an LLM call.
+    """
     
     # Fallback summary and takeaways in case AI fails
     fallback_summary = f"In {case_data['case_name']}, the {case_data['court']} addressed {case_data['legal_principle'].lower()}. The court ruled that {case_data['ruling'].lower()}."
@@ -16,8 +49,11 @@ async def generate_ai_summary(case_data: dict, query: str, jurisdiction: str = "
     ]
     
     # Check if Anthropic client is available
-    if anthropic_client is None:
-        print("Anthropic client not available, using fallback response")
+    anthropic_client = get_anthropic_client()
+    tier = model_router.choose("summary", deadline) if anthropic_client is not None else FALLBACK
+    if tier.model is None:
+        reason = "no_client" if anthropic_client is None else "load"
+        logger.info("Using fallback summary", extra={"event": "summary.fallback", "reason": reason, "case": case_data["citation"]})
         return CaseSummary(
             case_name=case_data["case_name"],
             citation=case_data["citation"], 
@@ -30,7 +66,9 @@ async def generate_ai_summary(case_data: dict, query: str, jurisdiction: str = "
             ruling=case_data["ruling"],
             relevance_score=case_data["relevance_score"],
             jurisdiction=case_data.get("jurisdiction", "federal"),
-            full_text_link=f"https://scholar.google.com/scholar_case?q={case_data['citation'].replace(' ', '+')}"
+            full_text_link=f"https://scholar.google.com/scholar_case?q={case_data['citation'].replace(' ', '+')}",
+            generation_tier=FALLBACK.name,
+            case_id=case_id(case_data)
         )
     
     try:
@@ -58,79 +96,68 @@ async def generate_ai_summary(case_data: dict, query: str, jurisdiction: str = "
         Focus on practical application and officer safety. Make the language clear and professional.
         """
         
-        response = anthropic_client.messages.create(
-            model="claude-3-5-haiku-20241022",
-            max_tokens=1000,
-            temperature=0.3,
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        )
-        
-        ai_response = response.content[0].text
+        async def call_model():
+            with model_router.track(tier):
+                return await anthropic_client.messages.create(
+                    model=tier.model,
+                    max_tokens=1000,
+                    temperature=0.3,
+                    timeout=model_router.call_timeout(LLM_SUMMARY_TIMEOUT_SECONDS, deadline),
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ]
+                )
         
-        # Parse the AI response to extract summary and key takeaways
-        lines = ai_response.strip().split('\n')
-        summary_lines = []
-        takeaways = []
+        # Slow calls get a duplicate request once they pass the recent p90
+        with stage("llm.summary"):
+            response = await summary_hedging.run(call_model)
         
-        current_section = None
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            if 'summary' in line.lower() or line.startswith('1.'):
-                current_section = 'summary'
-                if line.startswith('1.'):
-                    summary_lines.append(line[2:].strip())
-                continue
-            elif 'takeaway' in line.lower() or 'key points' in line.lower() or line.startswith('2.'):
-                current_section = 'takeaways'
-                continue
-                
-            if current_section == 'summary' and not line.startswith('-') and not line.startswith('•'):
-                summary_lines.append(line)
-            elif current_section == 'takeaways' and (line.startswith('-') or line.startswith('•') or line.startswith('*')):
-                takeaway = line.lstrip('-•* ').strip()
-                if takeaway:
-                    takeaways.append(takeaway)
+        # Parsed on the parser thread pool so long responses never stall the event loop
+        with stage("parse.summary"):
+            summary, takeaways = await run_parser(parse_summary_response, response.content[0].text)
         
         # Use AI response if parsing successful, otherwise use fallback
-        if not summary_lines:
-            summary = fallback_summary
-        else:
-            summary = ' '.join(summary_lines)
-            
-        if not takeaways:
-            takeaways = fallback_takeaways
+        summary = summary or fallback_summary
+        takeaways = takeaways or fallback_takeaways
             
     except Exception as e:
-        print(f"AI generation error: {e}")
+        logger.warning("AI summary generation failed, using fallback summary", extra={"event": "summary.error", "error": str(e), "case": case_data["citation"]})
         # Use fallback content
         summary = fallback_summary
         takeaways = fallback_takeaways
+        tier = FALLBACK
+    else:
+        logger.info("Summary generated", extra={"event": "summary.generated", "tier": tier.name, "case": case_data["citation"]})
     
-    return CaseSummary(
-        case_name=case_data["case_name"],
-        citation=case_data["citation"], 
-        year=case_data["year"],
-        court=case_data["court"],
-        summary=summary,
-        key_takeaways=takeaways,
-        facts=case_data["facts"],
-        legal_principle=case_data["legal_principle"],
-        ruling=case_data["ruling"],
-        relevance_score=case_data["relevance_score"],
-        jurisdiction=case_data.get("jurisdiction", "federal"),
-        full_text_link=f"https://scholar.google.com/scholar_case?q={case_data['citation'].replace(' ', '+')}"
-    )
+    with stage("model.summary"):
+        return CaseSummary(
+            case_name=case_data["case_name"],
+            citation=case_data["citation"], 
+            year=case_data["year"],
+            court=case_data["court"],
+            summary=summary,
+            key_takeaways=takeaways,
+            facts=case_data["facts"],
+            legal_principle=case_data["legal_principle"],
+            ruling=case_data["ruling"],
+            relevance_score=case_data["relevance_score"],
+            jurisdiction=case_data.get("jurisdiction", "federal"),
+            full_text_link=f"https://scholar.google.com/scholar_case?q={case_data['citation'].replace(' ', '+')}",
+            generation_tier=tier.name,
+            case_id=case_id(case_data)
+        )
+
+async def generate_actionable_report(query: str, case_results: List[CaseSummary], jurisdiction: str = "federal", deadline: Optional[float] = None) -> ReportResponse:
+    """Generate comprehensive actionable insights report using Anthropic AI.
 
-async def generate_actionable_report(query: str, case_results: List[CaseSummary], jurisdiction: str = "federal") -> ReportResponse:
-    """Generate comprehensive actionable insights report using Anthropic AI"""
+    The report is assembled from per-case fragments (see get_report_fragment)
+    plus one short synthesis call for the executive summary. generation_tier
+    is the synthesis tier, which degrades from Sonnet to Haiku to a template
+    as load rises or the deadline gets closer.
+    """
     
     # Fallback response in case AI fails
     fallback_response = ReportResponse(
@@ -157,193 +184,254 @@ async def generate_actionable_report(query: str, case_results: List[CaseSummary]
             "Verify local laws and regulations",
             "Consult department legal resources"
         ],
-        generated_at=datetime.now().isoformat()
+        generated_at=datetime.now().isoformat(),
+        generation_tier=FALLBACK.name
     )
     
     # Check if Anthropic client is available
+    anthropic_client = get_anthropic_client()
     if anthropic_client is None:
-        print("Anthropic client not available, using fallback report")
+        logger.info("Anthropic client not available, using fallback report", extra={"event": "report.fallback", "reason": "no_client"})
         return fallback_response
+    # Fragments are built from the server's own record of each case, never
+    # from the client's copy, since they are cached and shared between users
+    cases = []
+    for result in case_results:
+        identifier = result.case_id or case_id(result.model_dump())
+        case = get_case(identifier)
+        if case is None:
+            logger.info("Report case not in corpus, skipped", extra={"event": "report.unknown_case", "case": result.citation})
+            continue
+        cases.append((identifier, case))
+    # Per-case fragments come from the cache or are generated concurrently;
+    # under load, missing ones fall back to text built from the case itself
+    fragments = await asyncio.gather(*(
+        get_report_fragment(identifier, case, query, jurisdiction, deadline) for identifier, case in cases
+    ))
     
-    try:
-        # Prepare case summaries for the prompt
-        cases_text = ""
-        for i, case in enumerate(case_results, 1):
-            cases_text += f"""
-            Case {i}: {case.case_name} ({case.citation})
-            Court: {case.court}
-            Year: {case.year}
-            Facts: {case.facts}
-            Legal Principle: {case.legal_principle}
-            Ruling: {case.ruling}
-            Key Takeaways: {', '.join(case.key_takeaways)}
-            
-            """
-        
-        prompt = f"""
-        You are a legal expert providing actionable insights to police officers. Based on the officer's query and relevant case law, generate a comprehensive report with practical guidance.
+    # With no case to draw on, the model could only restate the query
+    tier = model_router.choose("report", deadline) if fragments else FALLBACK
+    executive_summary = None
+    if tier.model is not None:
+        try:
+            executive_summary = await synthesize_executive_summary(anthropic_client, tier, query, jurisdiction, fragments, deadline)
+        except Exception as e:
+            logger.warning("Report synthesis failed, using fallback summary", extra={"event": "report.error", "error": str(e)})
+    if not executive_summary:
+        tier = FALLBACK
+        executive_summary = f"Based on relevant case law, officers dealing with {query.lower()} situations must balance constitutional requirements with operational safety."
+    
+    logger.info("Report generated", extra={
+        "event": "report.generated",
+        "tier": tier.name,
+        "cases": len(case_results),
+        "fragment_tiers": sorted({fragment.generation_tier for fragment in fragments})
+    })
+    with stage("model.report"):
+        return assemble_report(query, jurisdiction, executive_summary, fragments, tier)
+
+# Reports are assembled from per-case fragments, so a case set that overlaps
+# an earlier report reuses its fragments and only pays for the new cases
+REPORT_MAX_INSIGHTS = 6
+REPORT_MAX_RECOMMENDATIONS = 6
+REPORT_MAX_WARNINGS = 5
+REPORT_MAX_JURISDICTION_NOTES = 4
+
+_fragments_in_flight: Dict[tuple, asyncio.Future] = {}
+
+def _fragment_stats() -> dict:
+    reused = metrics.counter("report.fragments.reused")
+    generated = metrics.counter("report.fragments.generated")
+    total = reused + generated
+    return {
+        "reused": reused,
+        "generated": generated,
+        "reuse_rate": round(reused / total, 3) if total else None,
+        "in_flight": len(_fragments_in_flight)
+    }
+
+metrics.register_collector("report_fragments", _fragment_stats)
+
+def _finish_fragment(key: tuple, task: asyncio.Future) -> None:
+    _fragments_in_flight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    fragment = task.result()
+    # Fallback fragments are cheap to rebuild and should not outlive the load that caused them
+    if fragment.generation_tier != FALLBACK.name:
+        report_fragment_cache.set(key, fragment)
+
+async def get_report_fragment(identifier: str, case: dict, query: str, jurisdiction: str, deadline: Optional[float] = None) -> ReportFragment:
+    """A corpus case's fragment for this query: cached, already being generated, or generated now"""
+    key = report_fragment_cache_key(identifier, query, jurisdiction)
+    fragment = report_fragment_cache.get(key)
+    if fragment is not None:
+        metrics.incr("report.fragments.reused")
+        return fragment
+    task = _fragments_in_flight.get(key)
+    if task is not None:
+        metrics.incr("report.fragments.reused")
+    else:
+        metrics.incr("report.fragments.generated")
+        task = asyncio.ensure_future(generate_report_fragment(case, query, jurisdiction, deadline))
+        _fragments_in_flight[key] = task
+        task.add_done_callback(lambda done: _finish_fragment(key, done))
+    # Shielded so a cancelled report does not throw away work another report may reuse
+    return await asyncio.shield(task)
+
+def fallback_report_fragment(case: dict) -> ReportFragment:
+    return ReportFragment(
+        citation=case["citation"],
+        case_name=case["case_name"],
+        insight=ActionableInsight(
+            category=case["case_name"],
+            insight=case["legal_principle"],
+            action_items=["Follow department protocols", "Document the facts that justify each action"],
+            legal_considerations=[case["ruling"]]
+        ),
+        procedural_recommendations=[],
+        legal_warnings=[],
+        jurisdiction_notes=[],
+        generation_tier=FALLBACK.name
+    )
+
+async def generate_report_fragment(case: dict, query: str, jurisdiction: str, deadline: Optional[float] = None) -> ReportFragment:
+    """What one case means for the officer's query, from a short LLM call"""
+    anthropic_client = get_anthropic_client()
+    tier = model_router.choose("report_fragment", deadline) if anthropic_client is not None else FALLBACK
+    if tier.model is None:
+        return fallback_report_fragment(case)
+    
+    prompt = f"""
+        You are a legal expert helping police officers apply case law.
 
         Officer's Query: "{query}"
         Target Jurisdiction: {jurisdiction}
-        
-        Relevant Case Law:
-        {cases_text}
-        
-        Please provide a structured report with:
 
-        1. EXECUTIVE SUMMARY (2-3 sentences summarizing the legal landscape for this query)
+        Case: {case['case_name']} ({case['citation']})
+        Court: {case['court']}
+        Year: {case['year']}
+        Facts: {case['facts']}
+        Legal Principle: {case['legal_principle']}
+        Ruling: {case['ruling']}
 
-        2. KEY INSIGHTS (3-4 categorized insights with specific action items):
-           - Format: Category | Insight | Action Items | Legal Considerations
+        Explain what this one case means for the officer's query. Reply in exactly this format:
+        INSIGHT: Category | Insight | Action item; Action item | Legal consideration; Legal consideration
+        PROCEDURE:
+        - One or two specific steps officers should follow
+        WARNING:
+        - One or two legal pitfalls this case warns against
+        JURISDICTION:
+        - How {jurisdiction} law may differ from this holding, if at all
 
-        3. PROCEDURAL RECOMMENDATIONS (4-6 specific steps officers should follow)
+        Use professional law enforcement language.
+        """
+    
+    try:
+        with model_router.track(tier), stage("llm.report_fragment"):
+            response = await anthropic_client.messages.create(
+                model=tier.model,
+                max_tokens=400,
+                temperature=0.2,
+                timeout=model_router.call_timeout(LLM_SUMMARY_TIMEOUT_SECONDS, deadline),
+                messages=[
+                    {
+                        "role": "user",
+                        "content": prompt
+                    }
+                ]
+            )
+        with stage("parse.report_fragment"):
+            return await run_parser(parse_report_fragment, response.content[0].text, case, tier.name)
+    except Exception as e:
+        logger.warning("Report fragment generation failed, using fallback fragment", extra={"event": "report.fragment.error", "error": str(e), "case": case["citation"]})
+        return fallback_report_fragment(case)
 
-        4. LEGAL WARNINGS (Critical legal pitfalls to avoid)
+async def synthesize_executive_summary(anthropic_client, tier, query: str, jurisdiction: str, fragments: List[ReportFragment], deadline: Optional[float] = None) -> str:
+    """The one per-report LLM call: a short executive summary over the case fragments"""
+    fragments_text = "\n".join(
+        f"- {fragment.case_name} ({fragment.citation}): {fragment.insight.insight}"
+        for fragment in fragments
+    )
+    prompt = f"""
+        You are a legal expert providing actionable insights to police officers.
 
-        5. JURISDICTION-SPECIFIC NOTES (How {jurisdiction} law may differ from federal precedent)
+        Officer's Query: "{query}"
+        Target Jurisdiction: {jurisdiction}
 
-        Focus on:
-        - Officer safety and legal compliance
-        - Clear, actionable guidance
-        - Risk mitigation
-        - Documentation requirements
-        - When to seek legal counsel
+        What each relevant case contributes:
+        {fragments_text}
 
-        Use professional law enforcement language.
+        Write a 2-3 sentence executive summary of the legal landscape for this query.
+        Reply with the summary only. Use professional law enforcement language.
         """
-        
-        response = anthropic_client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=2000,
+    with model_router.track(tier), stage("llm.report"):
+        response = await anthropic_client.messages.create(
+            model=tier.model,
+            max_tokens=300,
             temperature=0.2,
+            timeout=model_router.call_timeout(LLM_REPORT_TIMEOUT_SECONDS, deadline),
             messages=[
                 {
-                    "role": "user", 
+                    "role": "user",
                     "content": prompt
                 }
             ]
         )
-        
-        ai_response = response.content[0].text
-        
-        # Parse the AI response
-        sections = {
-            'executive_summary': '',
-            'key_insights': [],
-            'procedural_recommendations': [],
-            'legal_warnings': [],
-            'jurisdiction_notes': []
-        }
-        
-        current_section = None
-        lines = ai_response.strip().split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Identify sections
-            if 'executive summary' in line.lower():
-                current_section = 'executive_summary'
-                continue
-            elif 'key insights' in line.lower():
-                current_section = 'key_insights'
-                continue
-            elif 'procedural recommendations' in line.lower():
-                current_section = 'procedural_recommendations'
-                continue
-            elif 'legal warnings' in line.lower():
-                current_section = 'legal_warnings'
-                continue
-            elif 'jurisdiction' in line.lower() and 'notes' in line.lower():
-                current_section = 'jurisdiction_notes'
-                continue
-                
-            # Parse content based on current section
-            if current_section == 'executive_summary' and not line.startswith('-') and not line.startswith('•'):
-                sections['executive_summary'] += line + ' '
-            elif current_section in ['procedural_recommendations', 'legal_warnings', 'jurisdiction_notes']:
-                if line.startswith('-') or line.startswith('•') or line.startswith('*'):
-                    clean_line = line.lstrip('-•* ').strip()
-                    if clean_line:
-                        sections[current_section].append(clean_line)
-            elif current_section == 'key_insights':
-                if '|' in line:
-                    parts = [p.strip() for p in line.split('|')]
-                    if len(parts) >= 4:
-                        insight = ActionableInsight(
-                            category=parts[0],
-                            insight=parts[1],
-                            action_items=[parts[2]] if parts[2] else [],
-                            legal_considerations=[parts[3]] if parts[3] else []
-                        )
-                        sections['key_insights'].append(insight)
-                elif line.startswith('-') or line.startswith('•'):
-                    # Fallback parsing for insights
-                    clean_line = line.lstrip('-•* ').strip()
-                    if clean_line and len(sections['key_insights']) < 4:
-                        insight = ActionableInsight(
-                            category="General",
-                            insight=clean_line,
-                            action_items=["Follow department protocols"],
-                            legal_considerations=["Consult legal counsel if uncertain"]
-                        )
-                        sections['key_insights'].append(insight)
-        
-        # Generate fallback content if parsing fails
-        if not sections['executive_summary'].strip():
-            sections['executive_summary'] = f"Based on relevant case law, officers dealing with {query.lower()} situations must balance constitutional requirements with operational safety."
-            
-        if not sections['key_insights']:
-            sections['key_insights'] = [
-                ActionableInsight(
-                    category="Constitutional Compliance",
-                    insight="Ensure all actions meet Fourth Amendment standards",
-                    action_items=["Document reasonable suspicion/probable cause", "Follow established procedures"],
-                    legal_considerations=["Constitutional violations can lead to evidence suppression", "Civil liability concerns"]
-                ),
-                ActionableInsight(
-                    category="Officer Safety",
-                    insight="Prioritize officer and public safety in all interactions",
-                    action_items=["Maintain situational awareness", "Use appropriate officer safety measures"],
-                    legal_considerations=["Safety measures must be legally justified", "Excessive force issues"]
-                )
-            ]
-            
-        if not sections['procedural_recommendations']:
-            sections['procedural_recommendations'] = [
-                "Document all observations and actions thoroughly",
-                "Articulate reasonable suspicion or probable cause clearly",
-                "Follow department standard operating procedures",
-                "Seek supervisor consultation for complex situations"
-            ]
-            
-        if not sections['legal_warnings']:
-            sections['legal_warnings'] = [
-                "Avoid actions that could violate constitutional rights",
-                "Ensure proper legal justification before conducting searches",
-                "Be aware of changing legal precedents"
-            ]
-            
-        if not sections['jurisdiction_notes']:
-            sections['jurisdiction_notes'] = [
-                f"Verify current {jurisdiction} statutes and regulations",
-                "Local case law may provide additional guidance or restrictions",
-                "Consult department legal counsel for jurisdiction-specific questions"
-            ]
-        
-        return ReportResponse(
-            query=query,
-            executive_summary=sections['executive_summary'].strip(),
-            key_insights=sections['key_insights'],
-            procedural_recommendations=sections['procedural_recommendations'],
-            legal_warnings=sections['legal_warnings'],
-            jurisdiction_specific_notes=sections['jurisdiction_notes'],
-            generated_at=datetime.now().isoformat()
-        )
-        
-    except Exception as e:
-        print(f"Report generation error: {e}")
-        # Return fallback response
-        return fallback_response
+    with stage("parse.report"):
+        return await run_parser(parse_executive_summary, response.content[0].text)
+
+def _merge(lists: List[List[str]], limit: int) -> List[str]:
+    """Concatenate in case order, dropping repeats, up to limit items"""
+    merged = {}
+    for items in lists:
+        for item in items:
+            merged.setdefault(item.lower(), item)
+    return list(merged.values())[:limit]
+
+def assemble_report(query: str, jurisdiction: str, executive_summary: str, fragments: List[ReportFragment], tier) -> ReportResponse:
+    """Lay the fragments out as a report; sections no fragment filled get the standard guidance"""
+    key_insights = [fragment.insight for fragment in fragments][:REPORT_MAX_INSIGHTS]
+    if not key_insights:
+        key_insights = [
+            ActionableInsight(
+                category="Constitutional Compliance",
+                insight="Ensure all actions meet Fourth Amendment standards",
+                action_items=["Document reasonable suspicion/probable cause", "Follow established procedures"],
+                legal_considerations=["Constitutional violations can lead to evidence suppression", "Civil liability concerns"]
+            ),
+            ActionableInsight(
+                category="Officer Safety",
+                insight="Prioritize officer and public safety in all interactions",
+                action_items=["Maintain situational awareness", "Use appropriate officer safety measures"],
+                legal_considerations=["Safety measures must be legally justified", "Excessive force issues"]
+            )
+        ]
+    
+    procedural_recommendations = _merge([fragment.procedural_recommendations for fragment in fragments], REPORT_MAX_RECOMMENDATIONS) or [
+        "Document all observations and actions thoroughly",
+        "Articulate reasonable suspicion or probable cause clearly",
+        "Follow department standard operating procedures",
+        "Seek supervisor consultation for complex situations"
+    ]
+    legal_warnings = _merge([fragment.legal_warnings for fragment in fragments], REPORT_MAX_WARNINGS) or [
+        "Avoid actions that could violate constitutional rights",
+        "Ensure proper legal justification before conducting searches",
+        "Be aware of changing legal precedents"
+    ]
+    jurisdiction_notes = _merge([fragment.jurisdiction_notes for fragment in fragments], REPORT_MAX_JURISDICTION_NOTES) or [
+        f"Verify current {jurisdiction} statutes and regulations",
+        "Local case law may provide additional guidance or restrictions",
+        "Consult department legal counsel for jurisdiction-specific questions"
+    ]
+    
+    return ReportResponse(
+        query=query,
+        executive_summary=executive_summary,
+        key_insights=key_insights,
+        procedural_recommendations=procedural_recommendations,
+        legal_warnings=legal_warnings,
+        jurisdiction_specific_notes=jurisdiction_notes,
+        generated_at=datetime.now().isoformat(),
+        generation_tier=tier.name
+    )
@@ -0,0 +1,43 @@
+"""Cold-start measurement: import time of the app and time to the first ready request.
+
+Run from the backend directory:
+    python -m benchmarks.bench_cold_start
+"""
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+IMPORT_SNIPPET = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+READY_SNIPPET = """
+import time
+start = time.perf_counter()
+from fastapi.testclient import TestClient
+import main
+with TestClient(main.app) as client:
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.001)
+    ready = time.perf_counter() - start
+print(ready)
+"""
+
+def measure(snippet: str) -> float:
+    samples = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", snippet], capture_output=True, text=True, check=True).stdout
+        samples.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def main():
+    print(f"import main:          {measure(IMPORT_SNIPPET) * 1000:8.1f} ms (median of {RUNS})")
+    print(f"import main -> ready: {measure(READY_SNIPPET) * 1000:8.1f} ms (median of {RUNS})")
+
+if __name__ == "__main__":
+    main()
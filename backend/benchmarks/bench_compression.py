@@ -0,0 +1,63 @@
+"""Bytes on the wire and compression CPU per response.
+
+Compares identity, gzip and brotli at the configured dynamic and static
+levels for /search pages of several sizes, a report and /jurisdictions.
+
+Run from the backend directory:
+    python -m benchmarks.bench_compression
+"""
+import gzip
+import json
+import timeit
+from benchmarks.bench_serialization import make_report, make_summary
+from models import QueryResponse
+from routes import JURISDICTIONS
+from serialization import dump_model
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+REPEAT = 50
+
+def codecs() -> list:
+    options = [
+        ("gzip-1", lambda raw: gzip.compress(raw, 1, mtime=0)),
+        ("gzip-6", lambda raw: gzip.compress(raw, 6, mtime=0)),
+        ("gzip-9", lambda raw: gzip.compress(raw, 9, mtime=0)),
+    ]
+    if brotli is not None:
+        options += [
+            ("br-4", lambda raw: brotli.compress(raw, quality=4)),
+            ("br-11", lambda raw: brotli.compress(raw, quality=11)),
+        ]
+    return options
+
+def bodies() -> list:
+    samples = []
+    for size in (1, 10, 50):
+        summaries = [make_summary(i) for i in range(size)]
+        response = QueryResponse(query="vehicle search", results=summaries, total_results=size, processing_time=0.5)
+        samples.append((f"search x{size}", dump_model(response)))
+    samples.append(("report", dump_model(make_report(4))))
+    samples.append(("jurisdictions", json.dumps({"jurisdictions": JURISDICTIONS}, separators=(",", ":")).encode("utf-8")))
+    return samples
+
+def main():
+    options = codecs()
+    header = f"{'response':<15}{'identity':>10}" + "".join(f"{name:>16}" for name, _ in options)
+    print("bytes on the wire (compression CPU per response)")
+    print(header)
+    for label, raw in bodies():
+        row = f"{label:<15}{len(raw):>10}"
+        for _, codec in options:
+            size = len(codec(raw))
+            cpu_us = min(timeit.repeat(lambda: codec(raw), number=REPEAT, repeat=3)) / REPEAT * 1e6
+            row += f"{f'{size} ({cpu_us:.0f}us)':>16}"
+        print(row)
+    if brotli is None:
+        print("brotli is not installed; only gzip was measured")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Event-loop lag under mixed load: ranking inline vs in the search process pool.
+
+Builds a synthetic corpus of CORPUS_SIZE cases, then runs concurrent
+"requests" that each search the way POST /search does (facet bitsets,
+one keyword match shared by the ranking and the facet counts, a page of
+PAGE_SIZE + 1 results) and then wait on a simulated LLM call, while a
+ticker measures how late the event loop wakes it. Inline ranking blocks
+the loop for the whole scan; offloaded ranking only blocks it for the
+keyword match, the facet counts and materializing the returned
+(index, score) pairs. Also reports how long the pool takes to start, its
+workers forked from a fork server that already holds the corpus.
+
+Run from the backend directory:
+    python -m benchmarks.bench_executors
+"""
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+CORPUS_SIZE = 20_000
+REQUESTS = 200
+CONCURRENCY = 20
+PAGE_SIZE = 10
+LLM_WAIT_SECONDS = 0.05
+TICK_SECONDS = 0.001
+
+def write_corpus(path: str, rng: random.Random) -> None:
+    from benchmarks.bench_keyword_matcher import VOCABULARY
+    cases = []
+    for number in range(CORPUS_SIZE):
+        cases.append({
+            "case_name": f"State v. Defendant {number}",
+            "citation": f"{number} Bench {1900 + number % 120}",
+            "year": 1900 + number % 120,
+            "court": rng.choice(["U.S. Supreme Court", "Court of Appeals", "State Supreme Court"]),
+            "facts": " ".join(rng.sample(VOCABULARY, 12)),
+            "legal_principle": " ".join(rng.sample(VOCABULARY, 6)),
+            "ruling": " ".join(rng.sample(VOCABULARY, 8)),
+            "keywords": [" ".join(rng.sample(VOCABULARY, rng.randint(1, 3))) for _ in range(6)],
+            "jurisdiction": rng.choice(["federal", "california", "texas"])
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cases, f)
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+async def search(query: str) -> tuple:
+    """The ranking and facet steps of POST /search, unfiltered"""
+    from database import facet_counts, get_index, keyword_matches
+    from executors import run_search
+    facet_index = get_index("facets")
+    filters = facet_index.filters()
+    keyword_scores = keyword_matches(query)
+    results = await run_search(query, "all", PAGE_SIZE + 1, 0, facet_index.combine(filters), keyword_scores)
+    return results, facet_counts(keyword_scores, "all", filters)
+
+async def run(queries: list) -> tuple:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def request(query: str) -> None:
+        async with semaphore:
+            await search(query)
+            await asyncio.sleep(LLM_WAIT_SECONDS)
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(request(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, lags
+
+def report(label: str, elapsed: float, lags: list) -> None:
+    lags = sorted(lags) or [0.0]
+    p99 = lags[int(len(lags) * 0.99)]
+    print(f"{label:<10}{REQUESTS / elapsed:>12.1f}{p99 * 1000:>12.2f}{lags[-1] * 1000:>12.2f}")
+
+def main():
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cases.json")
+        write_corpus(path, rng)
+        # Config is read at import time
+        os.environ["CASES_PATH"] = path
+        import database
+        import executors
+        from benchmarks.bench_keyword_matcher import QUERIES
+
+        database.warm_up()
+        queries = [QUERIES[number % len(QUERIES)] for number in range(REQUESTS)]
+        executors.SEARCH_EXECUTOR = "inline"
+        inline_results = [asyncio.run(search(query)) for query in QUERIES]
+
+        print(f"{CORPUS_SIZE} cases, {REQUESTS} requests, {CONCURRENCY} concurrent, "
+              f"{LLM_WAIT_SECONDS * 1000:.0f} ms LLM wait, {executors.SEARCH_PROCESS_WORKERS} workers")
+        print(f"{'':<10}{'req/s':>12}{'p99 lag ms':>12}{'max lag ms':>12}")
+        elapsed, lags = asyncio.run(run(queries))
+        report("inline", elapsed, lags)
+
+        executors.SEARCH_EXECUTOR = "process"
+        start = time.perf_counter()
+        executors.start_executors()
+        pool_start = time.perf_counter() - start
+        offloaded_results = [asyncio.run(search(query)) for query in QUERIES]
+        assert offloaded_results == inline_results, "process pool ranking differs from inline"
+        elapsed, lags = asyncio.run(run(queries))
+        report("process", elapsed, lags)
+        executors.shutdown_executors()
+        print(f"pool start: {pool_start:.2f} s ({executors._start_method()})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Hedged summary requests against a stub server that injects tail latency.
+
+Most stub responses take ~40 ms but a small share stall for 600 ms, the way a
+slow upstream replica would. The same /search-style fan-out is run with
+hedging off and on, reporting per-summary latency percentiles, upstream call
+overhead and hedge wins.
+
+Run from the backend directory:
+    python -m benchmarks.bench_hedging
+"""
+import asyncio
+import os
+import random
+import statistics
+import time
+from benchmarks.stub_llm import StubLLMServer
+
+WAVES = 40
+FAN_OUT = 10
+FAST_SECONDS = 0.04
+SLOW_SECONDS = 0.6
+SLOW_SHARE = 0.05
+
+# (label, enabled, quantile, max hedge fraction)
+SETTINGS = [
+    ("off", False, 90, 0.1),
+    ("p90, cap 10%", True, 90, 0.1),
+    ("p95, cap 10%", True, 95, 0.1),
+    ("p90, cap 20%", True, 90, 0.2),
+]
+
+CASE = {
+    "case_name": "United States v. Ross",
+    "citation": "456 U.S. 798 (1982)",
+    "year": 1982,
+    "court": "U.S. Supreme Court",
+    "facts": "Police searched vehicle and containers within based on probable cause",
+    "legal_principle": "Automobile exception to warrant requirement",
+    "ruling": "Police may search vehicle and containers within if they have probable cause",
+    "relevance_score": 4,
+    "jurisdiction": "federal"
+}
+
+def injected_latency(body: dict) -> float:
+    return SLOW_SECONDS if random.random() < SLOW_SHARE else FAST_SECONDS * random.uniform(0.8, 1.2)
+
+async def run(generate_ai_summary) -> list:
+    latencies = []
+
+    async def one():
+        start = time.perf_counter()
+        summary = await generate_ai_summary(CASE, "vehicle search probable cause")
+        assert summary.generation_tier != "fallback"
+        latencies.append(time.perf_counter() - start)
+
+    for _ in range(WAVES):
+        await asyncio.gather(*(one() for _ in range(FAN_OUT)))
+    return sorted(latencies)
+
+async def compare(stub: StubLLMServer) -> None:
+    import metrics
+    from ai_services import generate_ai_summary, summary_hedging
+
+    print(f"{WAVES} waves x {FAN_OUT} summaries; {SLOW_SHARE:.0%} of upstream calls stall for {SLOW_SECONDS * 1000:.0f} ms")
+    print(f"{'hedging':<16}{'p50 ms':>8}{'p90 ms':>8}{'p99 ms':>8}{'max ms':>8}{'upstream':>10}{'hedges':>8}{'wins':>6}")
+    for label, enabled, quantile, max_fraction in SETTINGS:
+        summary_hedging.enabled = enabled
+        summary_hedging.quantile = quantile
+        summary_hedging.max_hedge_fraction = max_fraction
+        # One pass fills the latency window, the second is measured
+        await run(generate_ai_summary)
+        calls_before = stub.requests
+        metrics.reset()
+        latencies = await run(generate_ai_summary)
+        upstream = stub.requests - calls_before
+        hedges = int(metrics.counter("llm.hedge.summary.sent"))
+        wins = int(metrics.counter("llm.hedge.summary.wins"))
+        p = lambda q: latencies[int(q * (len(latencies) - 1))] * 1000
+        print(f"{label:<16}{statistics.median(latencies) * 1000:>8.1f}{p(0.9):>8.1f}{p(0.99):>8.1f}"
+              f"{latencies[-1] * 1000:>8.1f}{upstream:>10}{hedges:>8}{wins:>6}")
+
+def main():
+    random.seed(7)
+    with StubLLMServer(latency_fn=injected_latency) as stub:
+        os.environ["ANTHROPIC_API_KEY"] = "stub"
+        os.environ["ANTHROPIC_BASE_URL"] = stub.base_url
+        os.environ["LLM_MAX_RETRIES"] = "0"
+        asyncio.run(compare(stub))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Keyword matching: per-keyword substring loop vs the Aho-Corasick automaton.
+
+Builds synthetic corpora of increasing size from a legal vocabulary and times
+keyword scoring for a fixed set of queries.
+
+Run from the backend directory:
+    python -m benchmarks.bench_keyword_matcher
+"""
+import random
+import time
+from keyword_matcher import KeywordAutomaton
+
+VOCABULARY = (
+    "search seizure warrant vehicle traffic stop probable cause reasonable suspicion "
+    "miranda custody interrogation consent arrest incident exigent circumstances home "
+    "curtilage canine sniff detection marijuana odor container inventory impound "
+    "force deadly excessive suspect fleeing pursuit identification lineup phone digital "
+    "gps tracking privacy thermal imaging dna booking counsel silence waiver plain view"
+).split()
+
+QUERIES = [
+    "can i search a vehicle during a traffic stop without consent",
+    "miranda warnings before custodial interrogation of a juvenile",
+    "dog sniff extending the traffic stop duration",
+    "warrantless entry into a home under exigent circumstances",
+    "research on gps tracking and digital privacy",
+]
+
+SIZES = [100, 1_000, 10_000]
+KEYWORDS_PER_CASE = 6
+
+def make_corpus(size: int, rng: random.Random) -> list:
+    corpus = []
+    for _ in range(size):
+        keywords = [" ".join(rng.sample(VOCABULARY, rng.randint(1, 3))) for _ in range(KEYWORDS_PER_CASE)]
+        corpus.append(keywords)
+    return corpus
+
+def substring_scores(corpus: list, query: str) -> dict:
+    query_lower = query.lower()
+    scores = {}
+    for index, keywords in enumerate(corpus):
+        score = 0
+        for keyword in keywords:
+            if keyword in query_lower:
+                score += 2
+        if score:
+            scores[index] = score
+    return scores
+
+def time_per_query(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (repeat * len(QUERIES))
+
+def main():
+    rng = random.Random(42)
+    print(f"{'cases':>8}{'build ms':>10}{'loop us/query':>16}{'automaton us/query':>20}{'speedup':>9}")
+    for size in SIZES:
+        corpus = make_corpus(size, rng)
+        start = time.perf_counter()
+        automaton = KeywordAutomaton()
+        for index, keywords in enumerate(corpus):
+            for keyword in keywords:
+                automaton.add(keyword, index, 2)
+        automaton.build()
+        build_ms = (time.perf_counter() - start) * 1000
+
+        repeat = max(1, 20_000 // size)
+        loop = time_per_query(lambda query: substring_scores(corpus, query), repeat)
+        matched = time_per_query(automaton.match, repeat * 10)
+        print(f"{size:>8}{build_ms:>10.1f}{loop * 1e6:>16.1f}{matched * 1e6:>20.1f}{loop / matched:>8.0f}x")
+
+if __name__ == "__main__":
+    main()
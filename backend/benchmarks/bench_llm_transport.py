@@ -0,0 +1,72 @@
+"""LLM transport tuning against a local stub server.
+
+Drives waves of concurrent messages.create calls (the /search fan-out) through
+the pooled client with different pool settings and reports call latency,
+connections opened and pool utilization.
+
+Run from the backend directory:
+    python -m benchmarks.bench_llm_transport
+"""
+import asyncio
+import statistics
+import time
+import anthropic
+import metrics
+from benchmarks.stub_llm import StubLLMServer
+from llm_transport import build_http_client
+
+WAVES = 20
+FAN_OUT = 10
+UPSTREAM_LATENCY = 0.04
+
+SETTINGS = [
+    ("pool=4 keep-alive", dict(max_connections=4, max_keepalive_connections=4, keepalive_expiry=60)),
+    ("pool=32 no keep-alive", dict(max_connections=32, max_keepalive_connections=0, keepalive_expiry=0)),
+    ("pool=32 keep-alive", dict(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60)),
+]
+
+async def run(base_url: str, pool_settings: dict) -> tuple:
+    http_client = build_http_client(connect_timeout=5, read_timeout=20, http2=True, **pool_settings)
+    client = anthropic.AsyncAnthropic(api_key="stub", base_url=base_url, http_client=http_client, max_retries=0)
+    latencies = []
+    peak_utilization = 0.0
+
+    async def call():
+        start = time.perf_counter()
+        await client.messages.create(
+            model="claude-3-5-haiku-20241022",
+            max_tokens=1000,
+            messages=[{"role": "user", "content": "summarize"}],
+            timeout=10
+        )
+        latencies.append(time.perf_counter() - start)
+
+    async def sample_pool():
+        nonlocal peak_utilization
+        while True:
+            peak_utilization = max(peak_utilization, http_client._transport.pool_stats()["utilization"])
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample_pool())
+    for _ in range(WAVES):
+        await asyncio.gather(*(call() for _ in range(FAN_OUT)))
+    sampler.cancel()
+    stats = http_client._transport.pool_stats()
+    await http_client.aclose()
+    latencies.sort()
+    return latencies, stats, peak_utilization
+
+def main():
+    print(f"{WAVES} waves x {FAN_OUT} concurrent calls, upstream latency {UPSTREAM_LATENCY * 1000:.0f} ms")
+    print(f"{'settings':<24}{'p50 ms':>8}{'p99 ms':>8}{'conns':>7}{'peak util':>11}")
+    for label, pool_settings in SETTINGS:
+        metrics.reset()
+        with StubLLMServer(latency_fn=lambda body: UPSTREAM_LATENCY) as stub:
+            latencies, stats, peak_utilization = asyncio.run(run(stub.base_url, pool_settings))
+            connections = stub.connections
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+        print(f"{label:<24}{p50:>8.1f}{p99:>8.1f}{connections:>7}{peak_utilization:>11.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Event-loop lag while logging heavily to a slow sink.
+
+Many coroutines emit log events while a ticker measures how late the event
+loop wakes it. The sink blocks on every write to stand in for a slow log
+collector. Compared: print(), a logging StreamHandler written from the
+loop, and the queue-backed JSON handler from logs.py.
+
+Run from the backend directory:
+    python -m benchmarks.bench_logging
+"""
+import asyncio
+import io
+import logging
+import queue
+import time
+from logging.handlers import QueueListener
+from logs import JSONFormatter, NonBlockingQueueHandler, RequestContextFilter, request_id_var
+
+WORKERS = 100
+EVENTS_PER_WORKER = 50
+SINK_WRITE_SECONDS = 0.0002
+TICK_SECONDS = 0.001
+
+class SlowStream(io.StringIO):
+    """A stream whose writes block, like a pipe to a collector that has fallen behind"""
+
+    def write(self, text: str) -> int:
+        time.sleep(SINK_WRITE_SECONDS)
+        return super().write(text)
+
+async def ticker(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(time.perf_counter() - start - TICK_SECONDS)
+
+async def worker(number: int, emit) -> None:
+    request_id_var.set(f"req-{number}")
+    for event in range(EVENTS_PER_WORKER):
+        emit(number, event)
+        await asyncio.sleep(0)
+
+async def run(emit) -> tuple:
+    lags: list = []
+    stop = asyncio.Event()
+    tick = asyncio.create_task(ticker(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(number, emit) for number in range(WORKERS)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    return elapsed, lags
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(f"bench_logging.{name}")
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    return logger
+
+def report(label: str, elapsed: float, lags: list, events: int) -> None:
+    lags = sorted(lags) or [0.0]
+    p99 = lags[int(len(lags) * 0.99)]
+    print(f"{label:<22}{events / elapsed:>12.0f}{p99 * 1000:>12.2f}{lags[-1] * 1000:>12.2f}")
+
+def main():
+    events = WORKERS * EVENTS_PER_WORKER
+    print(f"{events} events, sink write {SINK_WRITE_SECONDS * 1e6:.0f} us")
+    print(f"{'':<22}{'events/s':>12}{'p99 lag ms':>12}{'max lag ms':>12}")
+
+    sink = SlowStream()
+    elapsed, lags = asyncio.run(run(lambda number, event: print(f"worker {number} event {event}", file=sink)))
+    report("print()", elapsed, lags, events)
+
+    direct = logging.StreamHandler(SlowStream())
+    direct.setFormatter(JSONFormatter())
+    direct.addFilter(RequestContextFilter())
+    logger = make_logger("direct", direct)
+    elapsed, lags = asyncio.run(run(
+        lambda number, event: logger.info("Event", extra={"event": "bench", "worker": number, "n": event})
+    ))
+    report("StreamHandler", elapsed, lags, events)
+
+    sink_handler = logging.StreamHandler(SlowStream())
+    sink_handler.setFormatter(JSONFormatter())
+    queued = NonBlockingQueueHandler(queue.Queue(maxsize=events))
+    queued.addFilter(RequestContextFilter())
+    listener = QueueListener(queued.queue, sink_handler)
+    listener.start()
+    logger = make_logger("queued", queued)
+    elapsed, lags = asyncio.run(run(
+        lambda number, event: logger.info("Event", extra={"event": "bench", "worker": number, "n": event})
+    ))
+    report("queue + JSON listener", elapsed, lags, events)
+    drain_start = time.perf_counter()
+    listener.stop()
+    print(f"listener drained the backlog {time.perf_counter() - drain_start:.2f} s after the workers finished")
+
+if __name__ == "__main__":
+    main()
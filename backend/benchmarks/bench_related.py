@@ -0,0 +1,92 @@
+"""Related-cases graph build: pairwise loop vs sparse postings vs numpy batches.
+
+Builds synthetic corpora of increasing size from the keyword benchmark's
+vocabulary and times a full build of the top-k graph three ways, then the
+incremental build after adding 1% more cases. The slower builds are only
+run on the smaller corpora; where two builds run, their graphs must agree.
+
+Run from the backend directory:
+    python -m benchmarks.bench_related
+"""
+import random
+import time
+import related
+from benchmarks.bench_keyword_matcher import VOCABULARY
+
+SIZES = [1_000, 5_000, 20_000]
+PAIRWISE_MAX_SIZE = 1_000
+POSTINGS_MAX_SIZE = 5_000
+GROWTH = 0.01
+
+def make_cases(count: int, start: int, rng: random.Random) -> list:
+    return [
+        {
+            "case_name": f"State v. Defendant {number}",
+            "citation": f"{number} Bench {1900 + number % 120}",
+            "year": 1900 + number % 120,
+            "court": "Court of Appeals",
+            "facts": " ".join(rng.sample(VOCABULARY, 12)),
+            "legal_principle": " ".join(rng.sample(VOCABULARY, 6)),
+            "ruling": " ".join(rng.sample(VOCABULARY, 8)),
+            "keywords": [" ".join(rng.sample(VOCABULARY, rng.randint(1, 3))) for _ in range(6)],
+            "jurisdiction": "federal"
+        }
+        for number in range(start, start + count)
+    ]
+
+def pairwise_neighbours(state) -> list:
+    neighbours = []
+    for row in range(len(state.ids)):
+        scored = []
+        for other in range(len(state.ids)):
+            if other == row:
+                continue
+            cosine = sum(weight * state.vectors[other].get(term, 0.0) for term, weight in state.vectors[row].items())
+            shared = len(state.keywords[row] & state.keywords[other])
+            union = state.keyword_counts[row] + state.keyword_counts[other] - shared
+            jaccard = shared / union if union else 0.0
+            scored.append((related.RELATED_TEXT_WEIGHT * cosine + (1 - related.RELATED_TEXT_WEIGHT) * jaccard, other))
+        neighbours.append(related._top_k(scored))
+    return neighbours
+
+def timed(fn) -> tuple:
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def positions(graph: list) -> list:
+    return [[position for _, position in neighbours] for neighbours in graph]
+
+def main():
+    rng = random.Random(42)
+    numpy = related.np
+    print(f"top {related.RELATED_TOP_K}, numpy {'available' if numpy is not None else 'not installed'}")
+    print(f"{'cases':>8}{'pairwise s':>12}{'postings s':>12}{'numpy s':>10}{'+1% incremental s':>20}")
+    for size in SIZES:
+        cases = make_cases(size, 0, rng)
+
+        state = None
+        pairwise = postings = vectorized = "-"
+        related.np = None
+        if size <= POSTINGS_MAX_SIZE or numpy is None:
+            seconds, state = timed(lambda: related._full_build(cases))
+            postings = f"{seconds:.2f}"
+            if size <= PAIRWISE_MAX_SIZE:
+                seconds, graph = timed(lambda: pairwise_neighbours(state))
+                assert positions(graph) == positions(state.neighbours), "postings graph differs from pairwise"
+                pairwise = f"{seconds:.2f}"
+
+        related.np = numpy
+        if numpy is not None:
+            seconds, numpy_state = timed(lambda: related._full_build(cases))
+            if state is not None:
+                assert positions(numpy_state.neighbours) == positions(state.neighbours), "numpy graph differs from postings"
+            vectorized = f"{seconds:.2f}"
+            state = numpy_state
+
+        added = make_cases(int(size * GROWTH), size, rng)
+        incremental, _ = timed(lambda: related._extend(state, added))
+        print(f"{size:>8}{pairwise:>12}{postings:>12}{vectorized:>10}{incremental:>20.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Microbenchmark for /search and /generate-report response serialization.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization
+"""
+import json
+import timeit
+from fastapi.encoders import jsonable_encoder
+from models import ActionableInsight, CaseSummary, QueryResponse, ReportResponse
+from serialization import dump_model, dump_with_preserialized_list
+
+SIZES = [1, 5, 10, 25, 50]
+REPEAT = 2000
+
+def make_summary(i: int) -> CaseSummary:
+    return CaseSummary(
+        case_name=f"State v. Example {i}",
+        citation=f"{100 + i} U.S. {200 + i} (2001)",
+        year=2001,
+        court="U.S. Supreme Court",
+        summary="The court addressed the scope of a warrantless vehicle search during a lawful traffic stop. " * 3,
+        key_takeaways=[f"Document the basis for action number {n} before proceeding" for n in range(6)],
+        facts="Officer stopped a vehicle for speeding and observed contraband in plain view on the passenger seat.",
+        legal_principle="Automobile exception to the warrant requirement",
+        ruling="Police may search a vehicle without a warrant when they have probable cause",
+        relevance_score=4.0,
+        full_text_link=f"https://scholar.google.com/scholar_case?q={100 + i}+U.S.+{200 + i}",
+        jurisdiction="federal",
+    )
+
+def make_report(insights: int) -> ReportResponse:
+    return ReportResponse(
+        query="vehicle search without consent",
+        executive_summary="Officers may search vehicles without a warrant when probable cause exists. " * 2,
+        key_insights=[
+            ActionableInsight(
+                category=f"Category {i}",
+                insight="Probable cause must be articulable and documented",
+                action_items=["Document observations", "Photograph evidence in place"],
+                legal_considerations=["Suppression risk if justification is weak"],
+            )
+            for i in range(insights)
+        ],
+        procedural_recommendations=["Document all observations thoroughly"] * 5,
+        legal_warnings=["Avoid extending the stop without reasonable suspicion"] * 3,
+        jurisdiction_specific_notes=["Verify current federal statutes and regulations"] * 3,
+        generated_at="2025-06-29T00:00:00",
+    )
+
+def fastapi_default(model) -> bytes:
+    """What FastAPI does for a returned model: jsonable_encoder, then JSONResponse.render"""
+    return json.dumps(jsonable_encoder(model), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def per_call_us(fn) -> float:
+    return min(timeit.repeat(fn, number=REPEAT, repeat=3)) / REPEAT * 1e6
+
+def main():
+    print(f"{'response':<18}{'bytes':>8}{'default us':>12}{'direct us':>12}{'cached us':>12}")
+    for size in SIZES:
+        summaries = [make_summary(i) for i in range(size)]
+        response = QueryResponse(query="vehicle search", results=summaries, total_results=size, processing_time=0.5)
+        envelope = response.model_copy(update={"results": []})
+        preserialized = [dump_model(summary) for summary in summaries]
+        assert dump_with_preserialized_list(envelope, "results", preserialized) == dump_model(response)
+
+        default = per_call_us(lambda: fastapi_default(response))
+        direct = per_call_us(lambda: dump_model(response))
+        cached = per_call_us(lambda: dump_with_preserialized_list(envelope, "results", preserialized))
+        print(f"{f'search x{size}':<18}{len(dump_model(response)):>8}{default:>12.1f}{direct:>12.1f}{cached:>12.1f}")
+
+    for insights in (2, 4, 8):
+        report = make_report(insights)
+        default = per_call_us(lambda: fastapi_default(report))
+        direct = per_call_us(lambda: dump_model(report))
+        print(f"{f'report x{insights}':<18}{len(dump_model(report)):>8}{default:>12.1f}{direct:>12.1f}{'-':>12}")
+
+if __name__ == "__main__":
+    main()
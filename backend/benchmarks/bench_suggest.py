@@ -0,0 +1,74 @@
+"""Typeahead latency per keystroke: linear prefix scan vs the radix trie.
+
+Builds vocabularies of increasing size (the real corpus plus synthetic legal
+phrases), then replays each query one keystroke at a time and reports the
+per-keystroke lookup time.
+
+Run from the backend directory:
+    python -m benchmarks.bench_suggest
+"""
+import random
+import time
+from benchmarks.bench_keyword_matcher import VOCABULARY
+from database import get_cases
+from suggest import PhraseTrie, build_suggest_index, normalize
+
+QUERIES = [
+    "vehicle search without consent",
+    "miranda warnings before interrogation",
+    "traffic stop duration",
+    "fourth amendment",
+    "canine sniff",
+]
+SIZES = [0, 1_000, 10_000, 100_000]
+LIMIT = 8
+
+def keystrokes() -> list:
+    return [query[:i] for query in QUERIES for i in range(1, len(query) + 1)]
+
+def linear_complete(phrases: dict, prefix: str) -> list:
+    """Reference: every phrase with a word starting at prefix, best first"""
+    matches = [
+        phrase for phrase in phrases
+        if phrase.startswith(prefix) or (" " + prefix) in (" " + phrase)
+    ]
+    return sorted(matches, key=lambda phrase: (-phrases[phrase], len(phrase), phrase))[:LIMIT]
+
+def percentiles(samples: list) -> tuple:
+    samples = sorted(samples)
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+def main():
+    rng = random.Random(7)
+    base = build_suggest_index(get_cases()).trie
+    print(f"{'phrases':>9}{'build ms':>10}{'scan p50 us':>13}{'scan p99 us':>13}{'trie p50 us':>13}{'trie p99 us':>13}")
+    for extra in SIZES:
+        phrases = dict(base.scores)
+        for _ in range(extra):
+            phrase = " ".join(rng.sample(VOCABULARY, rng.randint(2, 5)))
+            phrases[phrase] = phrases.get(phrase, 0.0) + 1.0
+        start = time.perf_counter()
+        trie = PhraseTrie(max_results=LIMIT)
+        for phrase, score in phrases.items():
+            trie.add(phrase, score)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        typed = [normalize(text) + (" " if text.endswith(" ") else "") for text in keystrokes()]
+        for prefix in typed:
+            assert [phrase for phrase, _ in trie.complete(prefix, LIMIT)] == linear_complete(phrases, prefix), prefix
+
+        scan, lookup = [], []
+        for prefix in typed:
+            start = time.perf_counter()
+            linear_complete(phrases, prefix)
+            scan.append((time.perf_counter() - start) * 1e6)
+            start = time.perf_counter()
+            for _ in range(100):
+                trie.complete(prefix, LIMIT)
+            lookup.append((time.perf_counter() - start) * 1e4)
+        scan_p50, scan_p99 = percentiles(scan)
+        trie_p50, trie_p99 = percentiles(lookup)
+        print(f"{len(phrases):>9}{build_ms:>10.0f}{scan_p50:>13.0f}{scan_p99:>13.0f}{trie_p50:>13.2f}{trie_p99:>13.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""Replay recorded traffic against the app and report how it held up.
+
+Reads a recording made with TRAFFIC_RECORD_PATH set and sends each request
+to an in-process copy of the app at its recorded arrival offset, divided by
+--speed (0 sends everything at once). Idle gaps in the recording, including
+restarts of the recorded server, are shortened to --max-gap seconds.
+
+The LLM is a stub that replays the recorded calls: each call a replayed
+request makes takes the latency and response size of a call its recorded
+request made to the same model. Calls the recording has no match for (the
+router picked another tier, or a cache that was warm when recording is cold
+now) take a recorded call to that model from any request, in turn, and only
+without any take --llm-latency-ms. The response text itself is canned, since
+recordings keep no responses; it is padded to the recorded size.
+
+Reports throughput, latency percentiles per route next to the recorded
+ones, how late requests were sent, and cache hit rates over the run.
+
+Run from the backend directory:
+    python -m benchmarks.replay traffic.jsonl --speed 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from itertools import cycle
+from benchmarks.stub_llm import StubLLMServer, canned_text
+
+REQUEST_ID_PREFIX = "replay-"
+# Bytes the stub's JSON envelope adds around the response text
+ENVELOPE_BYTES = 250
+
+def load_entries(path: str, limit: int) -> list:
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if "r" in entry:
+                entries.append(entry)
+    entries.sort(key=lambda entry: entry["t"])
+    return entries[:limit] if limit else entries
+
+def schedule(entries: list, speed: float, max_gap: float) -> list:
+    """Send offsets in seconds from the start of the replay"""
+    offsets = []
+    elapsed = 0.0
+    for previous, entry in zip([None] + entries, entries):
+        if previous is not None:
+            elapsed += min(entry["t"] - previous["t"], max_gap)
+        offsets.append(elapsed / speed if speed > 0 else 0.0)
+    return offsets
+
+class RecordedLLM:
+    """Stub LLM replies shaped like the recorded calls (see the module docstring)"""
+
+    def __init__(self, entries: list, default_latency_ms: float):
+        self.default_latency_ms = default_latency_ms
+        self._by_request = {}
+        by_model = defaultdict(list)
+        for number, entry in enumerate(entries):
+            calls = defaultdict(deque)
+            for model, ms, size in entry.get("llm", []):
+                calls[model].append((ms, size))
+                by_model[model].append((ms, size))
+            self._by_request[f"{REQUEST_ID_PREFIX}{number}"] = calls
+        self._by_model = {model: cycle(calls) for model, calls in by_model.items()}
+        self._lock = threading.Lock()
+        self.sources = Counter()
+
+    def reply(self, body: dict, headers) -> tuple:
+        model = body.get("model")
+        with self._lock:
+            calls = self._by_request.get(headers.get("x-request-id"), {}).get(model)
+            if calls:
+                source, (ms, size) = "own request", calls.popleft()
+            elif model in self._by_model:
+                source, (ms, size) = "same model", next(self._by_model[model])
+            else:
+                source, ms, size = "default latency", self.default_latency_ms, 0
+            self.sources[source] += 1
+        text = canned_text(body)
+        return ms / 1000, text + " " * max(0, size - ENVELOPE_BYTES - len(text))
+
+def percentiles(values: list) -> str:
+    if not values:
+        return f"{'-':>9}{'-':>9}{'-':>9}{'-':>9}"
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return f"{pick(0.5):>9.1f}{pick(0.9):>9.1f}{pick(0.99):>9.1f}{values[-1]:>9.1f}"
+
+def cache_totals(snapshot: dict) -> dict:
+    collectors = snapshot.get("collectors", {})
+    return {
+        name: (collectors.get(name, {}).get("hits", 0), collectors.get(name, {}).get("misses", 0))
+        for name in ("search_response_cache", "summary_cache", "report_fragment_cache")
+    }
+
+async def replay(entries: list, offsets: list) -> tuple:
+    import httpx
+    import database
+    from case_packs import case_id
+    from main import app
+    from pagination import encode_cursor, search_scope
+    from models import QueryRequest
+    from spelling import correct_query
+
+    cases_by_id = {case_id(case): case for case in database.get_cases()}
+    missing_cases = Counter()
+
+    def search_body(payload: dict) -> dict:
+        body = dict(payload)
+        offset = body.pop("offset", None)
+        if offset:
+            # Recordings keep the offset; a cursor is rebuilt for the anonymized query
+            request = QueryRequest(**body)
+            jurisdiction = "all" if request.jurisdictions else (request.jurisdiction or "federal")
+            body["cursor"] = encode_cursor(offset, correct_query(request.query)[0], search_scope(jurisdiction, request))
+        return body
+
+    def report_body(payload: dict) -> dict:
+        body = {key: value for key, value in payload.items() if key != "cases"}
+        body["case_results"] = []
+        for identifier, score in payload.get("cases", []):
+            case = cases_by_id.get(identifier)
+            if case is None:
+                missing_cases[identifier] += 1
+                continue
+            body["case_results"].append({
+                **{field: case[field] for field in ("case_name", "citation", "year", "court", "facts", "legal_principle", "ruling")},
+                "summary": case["ruling"],
+                "key_takeaways": [case["legal_principle"]],
+                "relevance_score": score,
+                "jurisdiction": case.get("jurisdiction", "federal"),
+                "case_id": identifier
+            })
+        return body
+
+    builders = {"search": ("/search", search_body), "report": ("/generate-report", report_body)}
+    results = []
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://replay", timeout=None) as client:
+            while (await client.get("/ready")).status_code != 200:
+                await asyncio.sleep(0.05)
+            import metrics
+            caches_before = cache_totals(metrics.snapshot())
+            start = time.perf_counter()
+
+            async def send(number: int, entry: dict, offset: float) -> None:
+                await asyncio.sleep(max(0.0, offset - (time.perf_counter() - start)))
+                sent_at = time.perf_counter()
+                path, build = builders[entry["r"]]
+                # The app passes the id on to its LLM calls, so the stub knows whose calls to replay
+                response = await client.post(path, json=build(entry["b"]), headers={"X-Request-ID": f"{REQUEST_ID_PREFIX}{number}"})
+                results.append({
+                    "route": entry["r"],
+                    "status": response.status_code,
+                    "ms": (time.perf_counter() - sent_at) * 1000,
+                    "lag_ms": (sent_at - start - offset) * 1000,
+                    "recorded_ms": entry.get("ms")
+                })
+
+            await asyncio.gather(*(send(number, entry, offset) for number, (entry, offset) in enumerate(zip(entries, offsets))))
+            elapsed = time.perf_counter() - start
+            caches_after = cache_totals(metrics.snapshot())
+    return results, elapsed, caches_before, caches_after, missing_cases
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording")
+    parser.add_argument("--speed", type=float, default=1.0, help="multiple of the recorded rate; 0 sends everything at once")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="longest idle gap kept from the recording, in seconds")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="stub LLM response time for models the recording never called")
+    parser.add_argument("--limit", type=int, default=0, help="replay only the first N requests")
+    args = parser.parse_args()
+
+    entries = load_entries(args.recording, args.limit)
+    if not entries:
+        raise SystemExit(f"No requests in {args.recording}")
+    offsets = schedule(entries, args.speed, args.max_gap)
+
+    recorded_llm = RecordedLLM(entries, args.llm_latency_ms)
+    with StubLLMServer(reply_fn=recorded_llm.reply) as stub:
+        os.environ["ANTHROPIC_API_KEY"] = "stub"
+        os.environ["ANTHROPIC_BASE_URL"] = stub.base_url
+        os.environ["LLM_MAX_RETRIES"] = "0"
+        # The replay itself is never recorded
+        os.environ["TRAFFIC_RECORD_PATH"] = ""
+        results, elapsed, caches_before, caches_after, missing_cases = asyncio.run(replay(entries, offsets))
+        llm_calls = stub.requests
+
+    recorded_span = entries[-1]["t"] - entries[0]["t"]
+    print(f"{len(results)} requests in {elapsed:.2f} s ({len(results) / elapsed:.1f} req/s); "
+          f"recorded over {recorded_span:.1f} s, replayed at {args.speed:g}x with gaps capped at {args.max_gap:g} s")
+    recorded_calls = sum(len(entry.get("llm", [])) for entry in entries)
+    print(f"{llm_calls} LLM calls ({recorded_calls} recorded); replayed from "
+          + ", ".join(f"{source}: {count}" for source, count in recorded_llm.sources.most_common()))
+    print(f"\n{'route':<10}{'count':>7}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}   statuses")
+    for route in sorted({result["route"] for result in results}):
+        routed = [result for result in results if result["route"] == route]
+        statuses = Counter(result["status"] for result in routed)
+        print(f"{route:<10}{len(routed):>7}{percentiles([result['ms'] for result in routed])}   "
+              + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items())))
+        recorded = [result["recorded_ms"] for result in routed if result["recorded_ms"] is not None]
+        print(f"{'recorded':<10}{len(recorded):>7}{percentiles(recorded)}")
+    print(f"\nsend lag ms (p50 p90 p99 max) {percentiles([result['lag_ms'] for result in results])}")
+
+    print(f"\n{'cache':<24}{'hits':>8}{'misses':>8}{'hit rate':>10}")
+    for name, (hits_after, misses_after) in caches_after.items():
+        hits = hits_after - caches_before[name][0]
+        misses = misses_after - caches_before[name][1]
+        rate = f"{hits / (hits + misses):.3f}" if hits + misses else "-"
+        print(f"{name:<24}{hits:>8}{misses:>8}{rate:>10}")
+    if missing_cases:
+        print(f"\n{sum(missing_cases.values())} report cases not in the current corpus were left out")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Local stand-in for the Anthropic Messages API, used by the benchmarks.
+
+Serves POST /v1/messages over HTTP/1.1 keep-alive with a configurable
+latency and canned responses that the ai_services parsers understand.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Mapping, Optional, Tuple
+
+SUMMARY_TEXT = """1. Summary: The court held that officers with probable cause may search the vehicle without a warrant, which applies directly to the officer's situation.
+
+2. Key Takeaways:
+- Articulate the specific facts that establish probable cause
+- Limit the search to areas where the evidence could be found
+- Document observations before and during the search
+- Consult a supervisor when the basis for the search is unclear
+"""
+
+FRAGMENT_TEXT = """INSIGHT: Probable Cause | Searches require articulable facts | Record observations in the report; Photograph evidence in place | Weak justification risks suppression
+PROCEDURE:
+- Document all observations thoroughly
+- Follow department procedures
+WARNING:
+- Do not extend the stop without reasonable suspicion
+JURISDICTION:
+- State law may impose stricter limits than federal precedent
+"""
+
+SYNTHESIS_TEXT = """Officers may rely on the automobile exception when probable cause exists, but must document the basis for the search."""
+
+def canned_text(body: dict) -> str:
+    prompt = body["messages"][0]["content"] if body.get("messages") else ""
+    if "INSIGHT:" in prompt:
+        return FRAGMENT_TEXT
+    if "executive summary" in prompt:
+        return SYNTHESIS_TEXT
+    return SUMMARY_TEXT
+
+class StubLLMServer:
+    """Threaded stub server; latency_fn(body) returns seconds to wait before replying.
+
+    reply_fn(body, headers), when given, replaces both latency_fn and text_fn
+    and returns (seconds, text), for stubs that need the request headers.
+    """
+
+    def __init__(
+        self,
+        latency_fn: Optional[Callable[[dict], float]] = None,
+        text_fn: Callable[[dict], str] = canned_text,
+        port: int = 0,
+        reply_fn: Optional[Callable[[dict, Mapping[str, str]], Tuple[float, str]]] = None
+    ):
+        latency_fn = latency_fn or (lambda body: 0.0)
+        self.reply_fn = reply_fn or (lambda body, headers: (latency_fn(body), text_fn(body)))
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                latency, text = stub.reply_fn(body, self.headers)
+                time.sleep(latency)
+                payload = json.dumps({
+                    "id": f"msg_stub_{stub.requests}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body.get("model", "stub"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": {"input_tokens": 100, "output_tokens": 100}
+                }).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up on this call, e.g. a cancelled hedge
+                    self.close_connection = True
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "StubLLMServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,31 @@
+"""Build the related-cases graph offline and write it where the server loads it.
+
+Run from the backend directory whenever the corpus changes:
+    python build_related.py
+    python build_related.py --cases data/cases.json --output data/related_graph.json
+
+The graph already at the output path is extended with the new and changed
+cases; pass --full to rebuild it from scratch.
+"""
+import argparse
+import json
+import time
+from config import CASES_PATH, RELATED_GRAPH_PATH
+from related import np, write_graph
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", default=CASES_PATH, help="corpus to build from")
+    parser.add_argument("--output", default=RELATED_GRAPH_PATH, help="graph file to write")
+    parser.add_argument("--full", action="store_true", help="rebuild instead of extending the existing graph")
+    args = parser.parse_args()
+
+    with open(args.cases, encoding="utf-8") as f:
+        cases = json.load(f)
+    start_time = time.perf_counter()
+    count, mode = write_graph(cases, args.output, incremental=not args.full)
+    print(f"Wrote related cases for {count} cases to {args.output} ({mode} build) in {time.perf_counter() - start_time:.2f} s "
+          f"({'numpy' if np is not None else 'pure Python'})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, NamedTuple, Optional
+import metrics
+from config import (
+    REPORT_FRAGMENT_CACHE_SIZE,
+    REPORT_FRAGMENT_CACHE_TTL_SECONDS,
+    SEARCH_RESPONSE_CACHE_SIZE,
+    SEARCH_RESPONSE_CACHE_TTL_SECONDS,
+    SUMMARY_CACHE_SIZE,
+    SUMMARY_CACHE_TTL_SECONDS
+)
+from keyword_matcher import tokenize
+from models import CaseSummary
+
+class TTLCache:
+    """Small thread-safe LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None
+        }
+
+class CachedSummary(NamedTuple):
+    """A case summary together with its serialized JSON bytes"""
+    summary: CaseSummary
+    json: bytes
+
+def summary_cache_key(case_data: dict, query: str, jurisdiction: str) -> tuple:
+    """Summaries depend on the case, the officer's query and the target jurisdiction"""
+    return (case_data["citation"], " ".join(query.lower().split()), jurisdiction)
+
+def normalize_query(query: str) -> str:
+    """The query's words in order, lowercased and without punctuation.
+
+    Every word is kept: dropping "not", "without" or "no" would give
+    opposite questions the same key.
+    """
+    return " ".join(tokenize(query))
+
+def report_fragment_cache_key(case_identifier: str, query: str, jurisdiction: str) -> tuple:
+    """Fragments are built from the corpus record, so the case id fully identifies the case side"""
+    return (case_identifier, normalize_query(query), jurisdiction)
+
+def search_response_cache_key(query: str, jurisdiction_filter: Optional[str], scope: str, offset: int, page_size: int) -> tuple:
+    """The response echoes the query and jurisdiction as typed, so the key uses them verbatim"""
+    return (query, jurisdiction_filter, scope, offset, page_size)
+
+summary_cache = TTLCache(SUMMARY_CACHE_SIZE, SUMMARY_CACHE_TTL_SECONDS)
+search_response_cache = TTLCache(SEARCH_RESPONSE_CACHE_SIZE, SEARCH_RESPONSE_CACHE_TTL_SECONDS)
+report_fragment_cache = TTLCache(REPORT_FRAGMENT_CACHE_SIZE, REPORT_FRAGMENT_CACHE_TTL_SECONDS)
+metrics.register_collector("summary_cache", summary_cache.stats)
+metrics.register_collector("search_response_cache", search_response_cache.stats)
+metrics.register_collector("report_fragment_cache", report_fragment_cache.stats)
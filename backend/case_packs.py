@@ -0,0 +1,141 @@
+import hashlib
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional
+from config import CASE_PACK_HISTORY
+from database import KEYWORD_WEIGHT, get_index, register_index
+from facets import court_level
+from http_cache import EncodedBody
+from models import CasePackResponse, PackedCase
+from serialization import dump_model
+
+PACK_FORMAT = 1
+
+def case_id(case: dict) -> str:
+    """Stable identifier for a case across corpus versions"""
+    return hashlib.sha1(f"{case['case_name']}|{case['citation']}".encode("utf-8")).hexdigest()[:12]
+
+def case_digest(case: dict) -> str:
+    """Content digest of a case; changes whenever any field of the case changes"""
+    canonical = json.dumps(case, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def pack_case(case: dict) -> PackedCase:
+    return PackedCase(
+        id=case_id(case),
+        digest=case_digest(case),
+        case_name=case["case_name"],
+        citation=case["citation"],
+        year=case["year"],
+        court=case["court"],
+        court_level=court_level(case),
+        jurisdiction=case.get("jurisdiction", "federal"),
+        facts=case["facts"],
+        legal_principle=case["legal_principle"],
+        ruling=case["ruling"],
+        keywords=case["keywords"]
+    )
+
+# Manifests ({case id: digest}) of recent pack versions per jurisdiction. They
+# outlive corpus reloads, so a client holding an older version gets a delta.
+_history: Dict[str, "OrderedDict[str, Dict[str, str]]"] = {}
+_history_lock = Lock()
+
+def _remember(jurisdiction: str, version: str, manifest: Dict[str, str]) -> None:
+    with _history_lock:
+        versions = _history.setdefault(jurisdiction, OrderedDict())
+        versions[version] = manifest
+        versions.move_to_end(version)
+        while len(versions) > max(CASE_PACK_HISTORY, 1):
+            versions.popitem(last=False)
+
+def _manifest(jurisdiction: str, version: str) -> Optional[Dict[str, str]]:
+    with _history_lock:
+        return _history.get(jurisdiction, {}).get(version)
+
+class CasePack:
+    """The cases of one jurisdiction in a versioned, offline-searchable pack.
+
+    The version is a digest of the per-case digests, so identical content
+    always has the same version, including across restarts. The full pack and
+    each delta are serialized once and served as stored, precompressed bytes.
+    """
+
+    def __init__(self, jurisdiction: str, cases: List[dict]):
+        self.jurisdiction = jurisdiction
+        self.cases = {packed.id: packed for packed in map(pack_case, cases)}
+        self.manifest = {packed_id: packed.digest for packed_id, packed in self.cases.items()}
+        self.version = hashlib.sha256(
+            json.dumps(sorted(self.manifest.items()), separators=(",", ":")).encode("utf-8")
+        ).hexdigest()[:16]
+        self._full: Optional[EncodedBody] = None
+        self._deltas: Dict[str, EncodedBody] = {}
+        self._lock = Lock()
+        _remember(jurisdiction, self.version, self.manifest)
+
+    def _encode(self, cases: List[PackedCase], removed: List[str], since: Optional[str]) -> EncodedBody:
+        return EncodedBody(dump_model(CasePackResponse(
+            format=PACK_FORMAT,
+            jurisdiction=self.jurisdiction,
+            version=self.version,
+            full=since is None,
+            since=since,
+            keyword_weight=KEYWORD_WEIGHT,
+            cases=cases,
+            removed=removed
+        )))
+
+    def full(self) -> EncodedBody:
+        if self._full is None:
+            with self._lock:
+                if self._full is None:
+                    self._full = self._encode(list(self.cases.values()), [], None)
+        return self._full
+
+    def delta(self, since: str) -> EncodedBody:
+        """Cases added or changed since a pack version, and the ids removed.
+
+        A version this process no longer remembers gets the full pack, which
+        the client recognizes by full being true.
+        """
+        old_manifest = _manifest(self.jurisdiction, since)
+        if old_manifest is None:
+            return self.full()
+        body = self._deltas.get(since)
+        if body is None:
+            changed = [
+                packed for packed_id, packed in self.cases.items()
+                if old_manifest.get(packed_id) != packed.digest
+            ]
+            removed = sorted(set(old_manifest) - set(self.manifest))
+            body = self._encode(changed, removed, since)
+            with self._lock:
+                self._deltas[since] = body
+        return body
+
+def build_case_packs(cases: List[dict]) -> Dict[str, CasePack]:
+    """One pack per jurisdiction, plus "all" for the whole corpus"""
+    by_jurisdiction: Dict[str, List[dict]] = {}
+    for case in cases:
+        by_jurisdiction.setdefault(case.get("jurisdiction", "federal"), []).append(case)
+    packs = {name: CasePack(name, members) for name, members in by_jurisdiction.items()}
+    packs["all"] = CasePack("all", cases)
+    return packs
+
+register_index("case_packs", build_case_packs)
+
+def get_case_pack(jurisdiction: str) -> Optional[CasePack]:
+    return get_index("case_packs").get(jurisdiction)
+
+def build_case_lookup(cases: List[dict]) -> Dict[str, dict]:
+    lookup: Dict[str, dict] = {}
+    for case in cases:
+        lookup.setdefault(case_id(case), case)
+    return lookup
+
+register_index("cases_by_id", build_case_lookup)
+
+def get_case(identifier: str) -> Optional[dict]:
+    """The corpus record for a case id, or None if the corpus has no such case"""
+    return get_index("cases_by_id").get(identifier)
@@ -1,23 +1,86 @@
+import logging
 import os
-from dotenv import load_dotenv
-import anthropic
+from threading import Lock
+from dotenv import find_dotenv, load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables from the backend's own .env file and from the one
+# nearest the working directory; neither overrides the real environment, and
+# the backend's file wins where both set a variable
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
+load_dotenv(find_dotenv(usecwd=True))
+
+logger = logging.getLogger(__name__)
 
-# Initialize Anthropic client
 anthropic_api_key = os.getenv("ANTHROPIC_API_KEY")
-if not anthropic_api_key:
-    print("Warning: ANTHROPIC_API_KEY not found in environment variables")
-    anthropic_client = None
-else:
-    try:
-        anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key)
-        print("Anthropic client initialized successfully")
-    except Exception as e:
-        print(f"Error initializing Anthropic client: {e}")
-        anthropic_client = None
+anthropic_base_url = os.getenv("ANTHROPIC_BASE_URL") or None
+
+# LLM transport: connection pool, keep-alive, HTTP/2 and timeouts
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "32"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "32"))
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_SUMMARY_TIMEOUT_SECONDS = float(os.getenv("LLM_SUMMARY_TIMEOUT_SECONDS", "20"))
+LLM_REPORT_TIMEOUT_SECONDS = float(os.getenv("LLM_REPORT_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+# Tiered model routing
+SEARCH_LATENCY_BUDGET_MS = int(os.getenv("SEARCH_LATENCY_BUDGET_MS", "8000"))
+REPORT_LATENCY_BUDGET_MS = int(os.getenv("REPORT_LATENCY_BUDGET_MS", "30000"))
+LLM_ROUTER_MAX_IN_FLIGHT = int(os.getenv("LLM_ROUTER_MAX_IN_FLIGHT", str(LLM_MAX_CONNECTIONS)))
+LLM_ROUTER_PRIMARY_MAX_PRESSURE = float(os.getenv("LLM_ROUTER_PRIMARY_MAX_PRESSURE", "0.75"))
+# Observed latency estimates decay back toward the priors with this half-life
+LLM_ROUTER_LATENCY_HALF_LIFE_SECONDS = float(os.getenv("LLM_ROUTER_LATENCY_HALF_LIFE_SECONDS", "60"))
+LLM_ROUTER_LATENCY_PRIORS = {
+    "haiku": float(os.getenv("LLM_ROUTER_HAIKU_PRIOR_SECONDS", "3")),
+    "sonnet": float(os.getenv("LLM_ROUTER_SONNET_PRIOR_SECONDS", "15"))
+}
+
+# The Anthropic client is created on first use so that importing config stays cheap
+_anthropic_client = None
+_anthropic_client_initialized = False
+_anthropic_client_lock = Lock()
+
+def get_anthropic_client():
+    """Return the shared Anthropic client, or None if it is not configured"""
+    global _anthropic_client, _anthropic_client_initialized
+    if _anthropic_client_initialized:
+        return _anthropic_client
+    with _anthropic_client_lock:
+        if _anthropic_client_initialized:
+            return _anthropic_client
+        if not anthropic_api_key:
+            logger.warning("ANTHROPIC_API_KEY not found in environment variables", extra={"event": "llm.client.missing_key"})
+        else:
+            try:
+                import anthropic
+                from llm_transport import build_http_client
+                http_client = build_http_client(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+                    connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+                    read_timeout=LLM_REPORT_TIMEOUT_SECONDS,
+                    http2=LLM_HTTP2
+                )
+                _anthropic_client = anthropic.AsyncAnthropic(
+                    api_key=anthropic_api_key,
+                    base_url=anthropic_base_url,
+                    http_client=http_client,
+                    max_retries=LLM_MAX_RETRIES
+                )
+                logger.info("Anthropic client initialized", extra={"event": "llm.client.ready"})
+            except Exception:
+                logger.exception("Error initializing Anthropic client", extra={"event": "llm.client.error"})
+                _anthropic_client = None
+        _anthropic_client_initialized = True
+    return _anthropic_client
+
+def anthropic_client_status() -> str:
+    """Describe the client state without forcing it to be created"""
+    if not _anthropic_client_initialized:
+        return "not_initialized"
+    return "ready" if _anthropic_client is not None else "unavailable"
 
 # CORS origins
 CORS_ORIGINS = [
@@ -28,3 +91,114 @@ CORS_ORIGINS = [
     "http://localhost:5175", 
     "http://127.0.0.1:5175"
 ]
+
+# Hedged summary requests
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_MAX_FRACTION = float(os.getenv("LLM_HEDGE_MAX_FRACTION", "0.1"))
+LLM_HEDGE_QUANTILE = float(os.getenv("LLM_HEDGE_QUANTILE", "90"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+
+# Admission control: priority classes are urgent, standard and bulk
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "16"))
+ADMISSION_QUEUE_LIMITS = {
+    "urgent": int(os.getenv("ADMISSION_URGENT_QUEUE_LIMIT", "64")),
+    "standard": int(os.getenv("ADMISSION_STANDARD_QUEUE_LIMIT", "32")),
+    "bulk": int(os.getenv("ADMISSION_BULK_QUEUE_LIMIT", "8"))
+}
+ADMISSION_MAX_QUEUE_WAIT_SECONDS = {
+    "urgent": float(os.getenv("ADMISSION_URGENT_MAX_WAIT_SECONDS", "10")),
+    "standard": float(os.getenv("ADMISSION_STANDARD_MAX_WAIT_SECONDS", "5")),
+    "bulk": float(os.getenv("ADMISSION_BULK_MAX_WAIT_SECONDS", "2"))
+}
+# Comma-separated key:class pairs, e.g. "field-app-key:urgent,training-key:bulk"
+PRIORITY_API_KEYS = dict(
+    pair.strip().split(":", 1)
+    for pair in os.getenv("PRIORITY_API_KEYS", "").split(",")
+    if ":" in pair
+)
+
+# Case summary cache
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "2048"))
+SUMMARY_CACHE_TTL_SECONDS = float(os.getenv("SUMMARY_CACHE_TTL_SECONDS", "3600"))
+
+# Per-case report fragments, keyed by case id, normalized query and jurisdiction
+REPORT_FRAGMENT_CACHE_SIZE = int(os.getenv("REPORT_FRAGMENT_CACHE_SIZE", "4096"))
+REPORT_FRAGMENT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_FRAGMENT_CACHE_TTL_SECONDS", "86400"))
+
+# Cache of complete /search response bodies, stored with their compressed variants
+SEARCH_RESPONSE_CACHE_SIZE = int(os.getenv("SEARCH_RESPONSE_CACHE_SIZE", "256"))
+SEARCH_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_RESPONSE_CACHE_TTL_SECONDS", "300"))
+
+# Response compression; static bodies are compressed once, so they use denser settings
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "512"))
+GZIP_DYNAMIC_LEVEL = int(os.getenv("GZIP_DYNAMIC_LEVEL", "6"))
+GZIP_STATIC_LEVEL = int(os.getenv("GZIP_STATIC_LEVEL", "9"))
+BROTLI_DYNAMIC_QUALITY = int(os.getenv("BROTLI_DYNAMIC_QUALITY", "4"))
+BROTLI_STATIC_QUALITY = int(os.getenv("BROTLI_STATIC_QUALITY", "11"))
+
+# Typeahead suggestions; also the number of completions each trie node keeps
+SUGGEST_MAX_RESULTS = int(os.getenv("SUGGEST_MAX_RESULTS", "10"))
+
+# Offline case packs; earlier pack versions are remembered so clients can fetch deltas
+CASE_PACK_HISTORY = int(os.getenv("CASE_PACK_HISTORY", "16"))
+CASE_PACK_MAX_AGE_SECONDS = int(os.getenv("CASE_PACK_MAX_AGE_SECONDS", "300"))
+
+# Related cases: top-k neighbours per case by TF-IDF cosine and keyword Jaccard
+# similarity, weighted by RELATED_TEXT_WEIGHT. A corpus change extends the
+# graph with the vocabulary and IDF weights of its last full build, until
+# those drift from the corpus's own by more than RELATED_MAX_DRIFT
+RELATED_TOP_K = int(os.getenv("RELATED_TOP_K", "5"))
+RELATED_TEXT_WEIGHT = float(os.getenv("RELATED_TEXT_WEIGHT", "0.5"))
+RELATED_MAX_FEATURES = int(os.getenv("RELATED_MAX_FEATURES", "2048"))
+RELATED_BATCH_SIZE = int(os.getenv("RELATED_BATCH_SIZE", "512"))
+RELATED_MAX_DRIFT = float(os.getenv("RELATED_MAX_DRIFT", "0.1"))
+RELATED_MAX_AGE_SECONDS = int(os.getenv("RELATED_MAX_AGE_SECONDS", "300"))
+# The graph is built offline (python build_related.py) and loaded from
+# RELATED_GRAPH_PATH. Set RELATED_BUILD_IN_PROCESS to have the server build it
+# instead whenever the file is missing or no longer matches the corpus; the
+# build delays /ready
+RELATED_GRAPH_PATH = os.getenv("RELATED_GRAPH_PATH", os.path.join(os.path.dirname(__file__), "data", "related_graph.json"))
+RELATED_BUILD_IN_PROCESS = os.getenv("RELATED_BUILD_IN_PROCESS", "false").lower() in ("1", "true", "yes")
+
+# Structured logging. LOG_SAMPLE_RATES keeps a fraction of high-volume events,
+# as comma-separated event:rate pairs
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATES = {
+    event.strip(): float(rate)
+    for event, rate in (
+        pair.split(":", 1)
+        for pair in os.getenv("LOG_SAMPLE_RATES", "search.completed:0.1,summary.generated:0.1,summary.fallback:0.1").split(",")
+        if ":" in pair
+    )
+}
+
+# Admin-only profiling endpoints, disabled unless ADMIN_TOKEN is set. Requests
+# slower than SLOW_REQUEST_THRESHOLD_MS keep their stage breakdown (0 disables)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+SLOW_REQUEST_THRESHOLD_MS = float(os.getenv("SLOW_REQUEST_THRESHOLD_MS", "2000"))
+SLOW_REQUEST_BUFFER_SIZE = int(os.getenv("SLOW_REQUEST_BUFFER_SIZE", "100"))
+
+# Opt-in traffic recording for replay: anonymized /search and /generate-report
+# payloads are appended to TRAFFIC_RECORD_PATH (empty disables). Unknown query
+# words are replaced by a keyed hash; set TRAFFIC_RECORD_KEY to keep the
+# replacements stable across restarts
+TRAFFIC_RECORD_PATH = os.getenv("TRAFFIC_RECORD_PATH", "")
+TRAFFIC_RECORD_KEY = os.getenv("TRAFFIC_RECORD_KEY", "")
+TRAFFIC_RECORD_QUEUE_SIZE = int(os.getenv("TRAFFIC_RECORD_QUEUE_SIZE", "10000"))
+TRAFFIC_RECORD_MAX_BODY_BYTES = int(os.getenv("TRAFFIC_RECORD_MAX_BODY_BYTES", "262144"))
+
+# Executors. SEARCH_EXECUTOR is inline, process, or auto (process once the
+# corpus has SEARCH_OFFLOAD_MIN_CASES cases)
+SEARCH_EXECUTOR = os.getenv("SEARCH_EXECUTOR", "auto").lower()
+SEARCH_OFFLOAD_MIN_CASES = int(os.getenv("SEARCH_OFFLOAD_MIN_CASES", "5000"))
+SEARCH_PROCESS_WORKERS = int(os.getenv("SEARCH_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+PARSE_THREAD_WORKERS = int(os.getenv("PARSE_THREAD_WORKERS", "4"))
+
+# Case corpus and start-up behaviour
+CASES_PATH = os.getenv("CASES_PATH", os.path.join(os.path.dirname(__file__), "data", "cases.json"))
+# Ordinary English words (Webster's Second International, public domain) that
+# spelling correction leaves alone even though the corpus never uses them
+ENGLISH_WORDS_PATH = os.getenv("ENGLISH_WORDS_PATH", os.path.join(os.path.dirname(__file__), "data", "english_words.txt.gz"))
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
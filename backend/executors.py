@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+import database
+import metrics
+from config import PARSE_THREAD_WORKERS, SEARCH_EXECUTOR, SEARCH_OFFLOAD_MIN_CASES, SEARCH_PROCESS_WORKERS
+from logs import setup_worker_logging
+
+T = TypeVar("T")
+
+# Response parsing is short and mostly string work, so threads are enough to
+# keep it off the event loop without paying for pickling
+_parse_pool = ThreadPoolExecutor(max_workers=PARSE_THREAD_WORKERS, thread_name_prefix="parser")
+
+async def run_parser(parser: Callable[..., T], *args) -> T:
+    """Run a response parser on the parser thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_parse_pool, functools.partial(parser, *args))
+
+# Ranking runs in worker processes. They are started with forkserver (spawn
+# where that is unavailable), never forked: the pool may be created from the
+# warm-up thread or after a corpus reload while the event loop, log writer and
+# other threads are running, and a forked child can inherit a lock one of them
+# held. The fork server loads the corpus and builds the ranking indexes once
+# (search_preload), and workers forked from it share them read-only; under
+# spawn, or when the corpus file has changed since the fork server loaded it,
+# each worker loads its own when the pool starts. Only the query goes in and
+# only (case index, score) pairs come back; the parent turns those into case
+# dicts from its own copy of the corpus.
+_search_pool: Optional[ProcessPoolExecutor] = None
+_search_pool_generation: Optional[int] = None
+_search_pool_lock = Lock()
+
+def _start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+def _mp_context():
+    context = multiprocessing.get_context(_start_method())
+    if _start_method() == "forkserver":
+        # Warmed once in the fork server rather than by every worker. The fork
+        # server starts with the first pool and outlives corpus reloads
+        context.set_forkserver_preload(["search_preload"])
+    return context
+
+def _init_worker(source: tuple) -> None:
+    # Workers have no event loop to protect, so they log straight to stdout
+    setup_worker_logging()
+    if database.corpus_source() != source:
+        # Spawned, or the fork server preloaded a version of the corpus the parent has since replaced
+        database.reload_cases(source[0])
+
+def _worker_pid(_: int) -> int:
+    return os.getpid()
+
+def should_offload_search() -> bool:
+    """Whether ranking goes to the process pool, per SEARCH_EXECUTOR"""
+    if SEARCH_EXECUTOR == "process":
+        return True
+    if SEARCH_EXECUTOR == "auto":
+        # Below this size a query ranks faster than it can be shipped to another process
+        return len(database.get_cases()) >= SEARCH_OFFLOAD_MIN_CASES
+    return False
+
+def _shutdown_search_pool(wait: bool = False) -> None:
+    global _search_pool, _search_pool_generation
+    with _search_pool_lock:
+        pool, _search_pool, _search_pool_generation = _search_pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+def get_search_pool() -> ProcessPoolExecutor:
+    """The search process pool, started and warmed on first use or after a corpus reload"""
+    global _search_pool, _search_pool_generation
+    with _search_pool_lock:
+        if _search_pool is not None and _search_pool_generation == database.corpus_generation():
+            return _search_pool
+        if _search_pool is not None:
+            # Its workers loaded the old corpus. Searches already submitted to
+            # it still finish and are ranked against the corpus they started on.
+            _search_pool.shutdown(wait=False)
+        database.warm_up()
+        generation = database.corpus_generation()
+        pool = ProcessPoolExecutor(
+            max_workers=SEARCH_PROCESS_WORKERS,
+            mp_context=_mp_context(),
+            initializer=_init_worker,
+            initargs=(database.corpus_source(),)
+        )
+        # Start and warm every worker now rather than on the first searches
+        list(pool.map(_worker_pid, range(SEARCH_PROCESS_WORKERS)))
+        _search_pool, _search_pool_generation = pool, generation
+        metrics.incr("executor.search.pool_starts")
+        return pool
+
+async def _rank(ranker: Callable[..., T], *args) -> T:
+    """Call a database ranking function, in the process pool when offloading is on"""
+    if not should_offload_search():
+        return ranker(*args)
+    loop = asyncio.get_running_loop()
+    generation = database.corpus_generation()
+    try:
+        pool = _search_pool
+        if pool is None or _search_pool_generation != generation:
+            # Starting the pool blocks, so it happens off the loop too
+            pool = await asyncio.to_thread(get_search_pool)
+        result = await loop.run_in_executor(pool, ranker, *args)
+        metrics.incr("executor.search.offloaded")
+        if database.corpus_generation() == generation:
+            return result
+        # Ranked on the corpus a reload has since replaced; its case indexes no longer line up
+        metrics.incr("executor.search.stale")
+    except BrokenProcessPool:
+        # A worker died; rank this query here and start a fresh pool next time
+        metrics.incr("executor.search.broken_pool")
+        _shutdown_search_pool()
+    except (CancelledError, RuntimeError):
+        # The pool was shut down (a reload replaced it, or the app is stopping)
+        # between picking it and submitting; asyncio.CancelledError, the
+        # client going away, is not caught here and still propagates
+        metrics.incr("executor.search.pool_closed")
+    return ranker(*args)
+
+async def run_search(
+    query: str,
+    jurisdiction: str = "federal",
+    max_results: int = 10,
+    offset: int = 0,
+    candidates: Optional[int] = None,
+    keyword_scores: Optional[Dict[int, float]] = None
+) -> List[dict]:
+    """search_cases_by_keywords, with the ranking done in the process pool when offloading is on"""
+    ranked = await _rank(database.rank_cases, query, jurisdiction, max_results, offset, candidates, keyword_scores)
+    return database.materialize_cases(ranked)
+
+def start_executors() -> None:
+    """Start the search pool ahead of the first request if searches will be offloaded"""
+    if should_offload_search():
+        get_search_pool()
+
+def shutdown_executors() -> None:
+    # The parser threads are idle between calls and exit with the interpreter
+    _shutdown_search_pool(wait=True)
+
+def executor_stats() -> dict:
+    return {
+        "search_executor": SEARCH_EXECUTOR,
+        "search_pool_running": _search_pool is not None,
+        "search_workers": SEARCH_PROCESS_WORKERS,
+        "start_method": _start_method(),
+        "parse_threads": PARSE_THREAD_WORKERS
+    }
+
+metrics.register_collector("executors", executor_stats)
@@ -0,0 +1,125 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Court of last resort for each jurisdiction; other appellate courts are "appellate"
+SUPREME_COURTS = {
+    "U.S. Supreme Court",
+    "New Jersey Supreme Court",
+    "Pennsylvania Supreme Court",
+    "New York Court of Appeals"
+}
+
+def court_level(case: dict) -> str:
+    """Hierarchy level of the deciding court: supreme, appellate or trial"""
+    if case.get("court_level"):
+        return case["court_level"]
+    court = case["court"]
+    if court in SUPREME_COURTS or "Supreme Court" in court:
+        return "supreme"
+    if any(marker in court for marker in ("Appeals", "Appellate", "Circuit", "Superior Court")):
+        return "appellate"
+    return "trial"
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Yield the case indexes set in a bitset, lowest first"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+class FacetIndex:
+    """Per-facet bitsets over the corpus, built once at load.
+
+    Bit i is set when case i has the facet value. Year ranges use prefix
+    bitsets over the sorted distinct years, so any range is two lookups and a
+    mask. Filters and counts are bitwise ANDs and popcounts.
+    """
+
+    def __init__(self, cases: List[dict]):
+        self.all = (1 << len(cases)) - 1
+        self.court: Dict[str, int] = {}
+        self.court_level: Dict[str, int] = {}
+        self.jurisdiction: Dict[str, int] = {}
+        self.decade: Dict[str, int] = {}
+        by_year: Dict[int, int] = {}
+        for index, case in enumerate(cases):
+            bit = 1 << index
+            self.court[case["court"]] = self.court.get(case["court"], 0) | bit
+            level = court_level(case)
+            self.court_level[level] = self.court_level.get(level, 0) | bit
+            jurisdiction = case.get("jurisdiction", "federal")
+            self.jurisdiction[jurisdiction] = self.jurisdiction.get(jurisdiction, 0) | bit
+            decade = f"{case['year'] // 10 * 10}s"
+            self.decade[decade] = self.decade.get(decade, 0) | bit
+            by_year[case["year"]] = by_year.get(case["year"], 0) | bit
+
+        # _year_prefix[i] holds every case decided in _years[0] .. _years[i-1]
+        self._years = sorted(by_year)
+        self._year_prefix = [0]
+        for year in self._years:
+            self._year_prefix.append(self._year_prefix[-1] | by_year[year])
+
+    def _union(self, facet: Dict[str, int], values: Iterable[str]) -> int:
+        bits = 0
+        for value in values:
+            bits |= facet.get(value, 0)
+        return bits
+
+    def year_range(self, year_from: Optional[int], year_to: Optional[int]) -> int:
+        low = bisect_left(self._years, year_from) if year_from is not None else 0
+        high = bisect_right(self._years, year_to) if year_to is not None else len(self._years)
+        if high <= low:
+            return 0
+        return self._year_prefix[high] & ~self._year_prefix[low]
+
+    def filters(
+        self,
+        courts: Optional[List[str]] = None,
+        court_levels: Optional[List[str]] = None,
+        jurisdictions: Optional[List[str]] = None,
+        year_from: Optional[int] = None,
+        year_to: Optional[int] = None
+    ) -> Dict[str, int]:
+        """Bitset per filtered facet, keyed like counts(); values within one facet are ORed.
+
+        A year range filters the decade facet.
+        """
+        filters = {}
+        if courts:
+            filters["court"] = self._union(self.court, courts)
+        if court_levels:
+            filters["court_level"] = self._union(self.court_level, court_levels)
+        if jurisdictions:
+            filters["jurisdiction"] = self._union(self.jurisdiction, jurisdictions)
+        if year_from is not None or year_to is not None:
+            filters["decade"] = self.year_range(year_from, year_to)
+        return filters
+
+    def combine(self, filters: Dict[str, int], excluding: Optional[str] = None) -> int:
+        """Bitset of cases passing every filter, optionally leaving one facet's own filter out"""
+        bits = self.all
+        for name, filter_bits in filters.items():
+            if name != excluding:
+                bits &= filter_bits
+        return bits
+
+    def counts(self, bits: int, filters: Optional[Dict[str, int]] = None) -> Dict[str, Dict[str, int]]:
+        """Number of cases in bits for every value of every facet.
+
+        With filters, each facet is counted over the cases passing every other
+        facet's filter, so a selected value's alternatives keep their counts.
+        """
+        filters = filters or {}
+        counts = {}
+        for name, facet in (
+            ("court", self.court),
+            ("court_level", self.court_level),
+            ("jurisdiction", self.jurisdiction),
+            ("decade", self.decade)
+        ):
+            scope = bits & self.combine(filters, excluding=name)
+            counts[name] = {value: popcount(scope & value_bits) for value, value_bits in facet.items() if scope & value_bits}
+        return counts
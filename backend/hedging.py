@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional, TypeVar
+import metrics
+
+T = TypeVar("T")
+
+class HedgePolicy:
+    """Hedged requests: if a call is slower than the recent p90, send a duplicate.
+
+    Whichever copy finishes first wins and the other is cancelled. The share
+    of calls that get hedged is capped over a sliding window, and nothing is
+    hedged until enough latency samples exist to estimate the threshold.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        enabled: bool,
+        max_hedge_fraction: float,
+        quantile: float = 90,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        window: int = 500
+    ):
+        self.name = name
+        self.enabled = enabled
+        self.max_hedge_fraction = max_hedge_fraction
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._hedged = deque(maxlen=window)  # one bool per call
+
+    def threshold(self) -> Optional[float]:
+        """Delay before hedging, or None while there are too few samples"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(round(self.quantile / 100 * (len(ordered) - 1))))
+        return max(self.min_delay, ordered[index])
+
+    def _hedge_allowed(self) -> bool:
+        return sum(self._hedged) + 1 <= self.max_hedge_fraction * max(1, len(self._hedged))
+
+    def _metric(self, event: str) -> str:
+        return f"llm.hedge.{self.name}.{event}"
+
+    async def run(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Await call(), hedging it with a second call() if it runs past the threshold"""
+        delay = self.threshold() if self.enabled else None
+        metrics.incr(self._metric("calls"))
+        start_time = time.monotonic()
+        primary = asyncio.ensure_future(call())
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and self._hedge_allowed():
+                    self._hedged.append(True)
+                    return await self._race(primary, call, start_time)
+            self._hedged.append(False)
+            result = await primary
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        self._latencies.append(time.monotonic() - start_time)
+        return result
+
+    async def _race(self, primary: asyncio.Future, call: Callable[[], Awaitable[T]], start_time: float) -> T:
+        metrics.incr(self._metric("sent"))
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    # A copy cancelled from inside the call has no exception to read
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    metrics.incr(self._metric("wins" if task is hedge else "primary_wins"))
+                    # The caller waited from the start either way; the hedge's own
+                    # shorter time would pull the threshold down
+                    self._latencies.append(time.monotonic() - start_time)
+                    return task.result()
+            raise error or asyncio.CancelledError()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        calls = len(self._hedged)
+        threshold = self.threshold()
+        sent = metrics.counter(self._metric("sent"))
+        return {
+            "enabled": self.enabled,
+            "threshold_seconds": round(threshold, 3) if threshold is not None else None,
+            "recent_calls": calls,
+            "recent_hedge_rate": round(sum(self._hedged) / calls, 3) if calls else 0.0,
+            "max_hedge_fraction": self.max_hedge_fraction,
+            # Share of hedges that beat the original call, and extra upstream calls per call
+            "hedge_win_rate": round(metrics.counter(self._metric("wins")) / sent, 3) if sent else None,
+            "overhead": round(sent / max(1.0, metrics.counter(self._metric("calls"))), 3)
+        }
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+import time
+from threading import Lock
+from typing import Dict, Optional, Union
+from fastapi import Request
+from fastapi.responses import Response
+import metrics
+from config import (
+    BROTLI_DYNAMIC_QUALITY,
+    BROTLI_STATIC_QUALITY,
+    COMPRESSION_MIN_BYTES,
+    GZIP_DYNAMIC_LEVEL,
+    GZIP_STATIC_LEVEL
+)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Preferred first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+def compress(raw: bytes, encoding: str, static: bool = False) -> bytes:
+    """Compress a body; static bodies are compressed once, so they use the slower, denser levels"""
+    start_time = time.perf_counter()
+    if encoding == "br":
+        compressed = brotli.compress(raw, quality=BROTLI_STATIC_QUALITY if static else BROTLI_DYNAMIC_QUALITY)
+    else:
+        compressed = gzip.compress(raw, compresslevel=GZIP_STATIC_LEVEL if static else GZIP_DYNAMIC_LEVEL, mtime=0)
+    metrics.observe(f"http.compress.{encoding}.seconds", time.perf_counter() - start_time)
+    return compressed
+
+def choose_encoding(accept_encoding: Optional[str], size: int) -> Optional[str]:
+    """Best supported encoding the client accepts, or None to send identity"""
+    if not accept_encoding or size < COMPRESSION_MIN_BYTES:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+class EncodedBody:
+    """A cacheable JSON body with a strong ETag and memoized compressed variants.
+
+    Each compressed variant is produced on first request and then served as
+    stored bytes. Long-lived bodies should be static so they get the denser
+    levels; short-lived ones keep the cheaper dynamic levels.
+    """
+
+    def __init__(self, raw: bytes, static: bool = True):
+        self.raw = raw
+        self.static = static
+        self.digest = hashlib.sha256(raw).hexdigest()[:32]
+        self._encoded: Dict[str, bytes] = {}
+        self._lock = Lock()
+
+    def etag(self, encoding: Optional[str]) -> str:
+        # Each content-coding is a different representation and needs its own strong validator
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def body(self, encoding: Optional[str]) -> bytes:
+        if encoding is None:
+            return self.raw
+        encoded = self._encoded.get(encoding)
+        if encoded is None:
+            with self._lock:
+                encoded = self._encoded.get(encoding)
+                if encoded is None:
+                    encoded = self._encoded[encoding] = compress(self.raw, encoding, static=self.static)
+        return encoded
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if any validator in If-None-Match names this body (in any encoding)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-")[0] == self.digest:
+                return True
+        return False
+
+def _record(encoding: Optional[str], raw_size: int, sent_size: int) -> None:
+    metrics.incr("http.bytes_raw", raw_size)
+    metrics.incr("http.bytes_sent", sent_size)
+    metrics.incr(f"http.responses.{encoding or 'identity'}")
+
+def cached_response(request: Request, body: EncodedBody, max_age: int = 0) -> Response:
+    """Serve a cacheable body: 304 on a matching If-None-Match, else precompressed bytes"""
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(body.raw))
+    headers = {
+        "ETag": body.etag(encoding),
+        "Vary": "Accept-Encoding",
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate" if max_age else "no-cache"
+    }
+    if request.method in ("GET", "HEAD") and body.matches(request.headers.get("if-none-match")):
+        metrics.incr("http.not_modified")
+        return Response(status_code=304, headers=headers)
+    content = body.body(encoding)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    _record(encoding, len(body.raw), len(content))
+    return Response(content=content, media_type="application/json", headers=headers)
+
+def compressed_response(request: Request, body: Union[bytes, EncodedBody]) -> Response:
+    """Serve a JSON body without validators, e.g. to a POST.
+
+    Raw bytes are compressed on the fly at the cheaper dynamic levels; an
+    EncodedBody kept server-side reuses its memoized compressed variants.
+    """
+    raw = body.raw if isinstance(body, EncodedBody) else body
+    encoding = choose_encoding(request.headers.get("accept-encoding"), len(raw))
+    headers = {"Vary": "Accept-Encoding"}
+    content = raw
+    if encoding:
+        content = body.body(encoding) if isinstance(body, EncodedBody) else compress(raw, encoding)
+        headers["Content-Encoding"] = encoding
+    _record(encoding, len(raw), len(content))
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -0,0 +1,105 @@
+import re
+from collections import deque
+from typing import Dict, Hashable, Iterator, List, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens; punctuation and whitespace only separate words"""
+    return _WORD_RE.findall(text.lower())
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over multi-word phrases.
+
+    Transitions are on whole words rather than characters, so a phrase only
+    matches on word boundaries ("search" does not match inside "research") and
+    a query is scanned once no matter how many phrases are loaded. Each phrase
+    carries (target, weight) payloads; match() sums weights per target.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Phrases ending at each state, and those plus every phrase ending along its failure links
+        self._own_outputs: List[List[int]] = [[]]
+        self._outputs: List[List[int]] = [[]]
+        self._phrases: List[Tuple[str, ...]] = []
+        self._payloads: List[List[Tuple[Hashable, float]]] = []
+        self._phrase_ids: Dict[Tuple[str, ...], int] = {}
+        self._built = False
+
+    def add(self, phrase: str, target: Hashable, weight: float = 1.0) -> None:
+        words = tuple(tokenize(phrase))
+        if not words:
+            return
+        phrase_id = self._phrase_ids.get(words)
+        if phrase_id is None:
+            phrase_id = self._phrase_ids[words] = len(self._phrases)
+            self._phrases.append(words)
+            self._payloads.append([])
+            state = 0
+            for word in words:
+                next_state = self._goto[state].get(word)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][word] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._own_outputs.append([])
+                    self._outputs.append([])
+                state = next_state
+            self._own_outputs[state].append(phrase_id)
+            self._built = False
+        self._payloads[phrase_id].append((target, weight))
+
+    def build(self) -> "KeywordAutomaton":
+        """Compute failure links breadth-first and merge outputs along them.
+
+        Outputs are rebuilt from each state's own phrases, so building again
+        after more add() calls does not count any phrase twice.
+        """
+        self._outputs = [list(own) for own in self._own_outputs]
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for word, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(word, 0)
+                self._outputs[next_state] = self._own_outputs[next_state] + self._outputs[self._fail[next_state]]
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end word index, phrase id) for every phrase occurrence in text"""
+        if not self._built:
+            self.build()
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for position, word in enumerate(tokenize(text)):
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for phrase_id in outputs[state]:
+                yield position, phrase_id
+
+    def matched_phrases(self, text: str) -> List[str]:
+        """Distinct phrases found in text, in order of first occurrence"""
+        seen = dict.fromkeys(phrase_id for _, phrase_id in self.iter_matches(text))
+        return [" ".join(self._phrases[phrase_id]) for phrase_id in seen]
+
+    def match(self, text: str) -> Dict[Hashable, float]:
+        """Sum payload weights per target, counting each distinct phrase once"""
+        scores: Dict[Hashable, float] = {}
+        for phrase_id in {phrase_id for _, phrase_id in self.iter_matches(text)}:
+            for target, weight in self._payloads[phrase_id]:
+                scores[target] = scores.get(target, 0) + weight
+        return scores
+
+    def __len__(self) -> int:
+        return len(self._phrases)
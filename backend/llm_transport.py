@@ -0,0 +1,106 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+import httpx
+import metrics
+from logs import request_id_var
+
+logger = logging.getLogger(__name__)
+
+# Set by the traffic recorder around each recorded request; every successful
+# LLM call made while handling it appends [model, milliseconds, response bytes]
+llm_call_log_var: ContextVar[Optional[List[list]]] = ContextVar("llm_call_log", default=None)
+
+def _request_model(request: httpx.Request) -> Optional[str]:
+    try:
+        return json.loads(request.content).get("model")
+    except (ValueError, AttributeError, httpx.RequestNotRead):
+        return None
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport that tracks in-flight requests and connection pool usage"""
+
+    def __init__(self, max_connections: int, **kwargs):
+        super().__init__(**kwargs)
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # Lets upstream logs, and the replay's stub LLM, tie a call to the request that made it
+        request_id = request_id_var.get()
+        if request_id and "x-request-id" not in request.headers:
+            request.headers["X-Request-ID"] = request_id
+        self.in_flight += 1
+        self.requests_total += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        start_time = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        finally:
+            self.in_flight -= 1
+            metrics.observe("llm.http.response_headers_seconds", time.perf_counter() - start_time)
+        call_log = llm_call_log_var.get()
+        if call_log is not None and response.status_code < 400:
+            # Messages calls are not streamed, so the body follows the headers at once
+            size = len(await response.aread())
+            call_log.append([_request_model(request), round((time.perf_counter() - start_time) * 1000, 1), size])
+        return response
+
+    def _connections(self) -> Optional[list]:
+        # httpx keeps its httpcore pool private; if a release moves it, only
+        # the connection figures go missing from the stats
+        pool = getattr(self, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return list(connections) if connections is not None else None
+
+    def pool_stats(self) -> dict:
+        stats = {
+            "max_connections": self.max_connections,
+            "in_flight_requests": self.in_flight,
+            "peak_in_flight_requests": self.peak_in_flight,
+            "requests_total": self.requests_total
+        }
+        connections = self._connections()
+        if connections is None:
+            return stats
+        idle = sum(1 for connection in connections if getattr(connection, "is_idle", lambda: False)())
+        active = len(connections) - idle
+        stats.update({
+            "open_connections": len(connections),
+            "active_connections": active,
+            "idle_connections": idle,
+            "waiting_for_connection": max(0, self.in_flight - active),
+            "utilization": round(active / self.max_connections, 3) if self.max_connections else None
+        })
+        return stats
+
+def build_http_client(
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    connect_timeout: float,
+    read_timeout: float,
+    http2: bool
+) -> httpx.AsyncClient:
+    """Build the pooled HTTP client used by the Anthropic SDK and expose its pool metrics"""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    try:
+        transport = InstrumentedTransport(max_connections, limits=limits, http2=http2)
+    except ImportError:
+        # HTTP/2 needs the optional h2 package
+        logger.warning("h2 is not installed, falling back to HTTP/1.1 for the LLM client", extra={"event": "llm.transport.no_http2"})
+        transport = InstrumentedTransport(max_connections, limits=limits, http2=False)
+    metrics.register_collector("llm_pool", transport.pool_stats)
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        follow_redirects=True
+    )
@@ -0,0 +1,174 @@
+import copy
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+import zlib
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+import metrics
+from config import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLE_RATES
+
+# Set per HTTP request by RequestIdMiddleware; asyncio tasks and to_thread
+# calls started while handling the request inherit it
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "request_id"}
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; extra= fields become top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None)
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Stamp the current request id on the record while still on the caller's task"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records for high-volume events.
+
+    Records name their event with extra={"event": ...}; events without a
+    configured rate are always kept. The decision hashes the request id, so a
+    sampled request keeps all of its events rather than a random subset.
+    Dropped records are still counted in metrics.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = self.rates.get(event) if event else None
+        if rate is None or rate >= 1:
+            return True
+        key = getattr(record, "request_id", None) or f"{record.created}:{record.thread}"
+        if zlib.crc32(key.encode("utf-8")) / 2 ** 32 < rate:
+            return True
+        metrics.incr(f"log.sampled_out.{event}")
+        return False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the listener thread without ever waiting on it.
+
+    If the queue is full (the sink has fallen far behind) the record is
+    dropped and counted instead of blocking the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now; the args may change after we return
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.incr("log.dropped")
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[NonBlockingQueueHandler] = None
+
+def setup_logging(stream=None) -> QueueListener:
+    """Route the root logger through a bounded queue to a JSON-lines writer thread.
+
+    Safe to call again after stop_logging(): each call pairs with one stop,
+    so an app whose lifespan runs several times keeps logging every time.
+    """
+    global _listener, _handler
+    if _listener is not None:
+        return _listener
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JSONFormatter())
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    handler.addFilter(RequestContextFilter())
+    handler.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    # httpx logs every LLM request at INFO
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    _handler = handler
+    _listener = QueueListener(handler.queue, sink)
+    _listener.start()
+    metrics.register_collector("log_queue", lambda: {"depth": handler.queue.qsize(), "capacity": LOG_QUEUE_SIZE})
+    return _listener
+
+def stop_logging() -> None:
+    """Flush queued records, stop the writer thread and detach the queue from the root logger"""
+    global _listener, _handler
+    if _handler is not None:
+        # Detached first, so nothing is queued after the listener has drained
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def setup_worker_logging(stream=None) -> None:
+    """Write JSON lines straight to the stream, for worker processes without an event loop"""
+    sink = logging.StreamHandler(stream or sys.stdout)
+    sink.setFormatter(JSONFormatter())
+    sink.addFilter(SamplingFilter(LOG_SAMPLE_RATES))
+    root = logging.getLogger()
+    root.handlers = [sink]
+    root.setLevel(LOG_LEVEL)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+class RequestIdMiddleware:
+    """Assign each HTTP request an id (or accept the caller's X-Request-ID) and echo it back"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_RE.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("ascii"))]
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -1,9 +1,33 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from config import CORS_ORIGINS
+from config import CORS_ORIGINS, TRAFFIC_RECORD_PATH, WARM_UP_ON_STARTUP
+from executors import shutdown_executors
+from logs import RequestIdMiddleware, setup_logging, stop_logging
+from profiling import SlowRequestMiddleware
+from recorder import TrafficRecorderMiddleware, start_recording, stop_recording
 from routes import router
+from startup import run_warm_up
 
-app = FastAPI(title="Case Law AI Assistant", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Log records are written by a background thread, never from the event loop;
+    # started and stopped here so every run of the lifespan gets a live writer
+    setup_logging()
+    # Warm up in the background so the worker starts accepting connections immediately
+    warm_up_task = None
+    if WARM_UP_ON_STARTUP:
+        warm_up_task = asyncio.create_task(asyncio.to_thread(run_warm_up))
+    start_recording()
+    yield
+    if warm_up_task is not None:
+        await warm_up_task
+    stop_recording()
+    shutdown_executors()
+    stop_logging()
+
+app = FastAPI(title="Case Law AI Assistant", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -12,7 +36,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+if TRAFFIC_RECORD_PATH:
+    app.add_middleware(TrafficRecorderMiddleware)
+app.add_middleware(SlowRequestMiddleware)
+# Added last so it runs first: the request id is set before anything else logs
+app.add_middleware(RequestIdMiddleware)
 
 # Include routes
 app.include_router(router)
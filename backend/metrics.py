@@ -0,0 +1,81 @@
+from collections import defaultdict, deque
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+# Process-local metrics: counters, gauges and windowed latency samples,
+# plus collectors that are polled when a snapshot is taken.
+SAMPLE_WINDOW = 2048
+
+_lock = Lock()
+_counters: Dict[str, float] = defaultdict(float)
+_gauges: Dict[str, float] = {}
+_samples: Dict[str, deque] = {}
+_collectors: Dict[str, Callable[[], dict]] = {}
+
+def incr(name: str, value: float = 1.0) -> None:
+    with _lock:
+        _counters[name] += value
+
+def set_gauge(name: str, value: float) -> None:
+    with _lock:
+        _gauges[name] = value
+
+def observe(name: str, value: float) -> None:
+    """Record a sample (usually a duration in seconds) for percentile reporting"""
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=SAMPLE_WINDOW)
+        samples.append(value)
+
+def percentile(name: str, q: float) -> Optional[float]:
+    """Return the q-th percentile (0-100) of the recent samples for name"""
+    with _lock:
+        samples = sorted(_samples.get(name, ()))
+    if not samples:
+        return None
+    index = min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))
+    return samples[index]
+
+def counter(name: str) -> float:
+    with _lock:
+        return _counters.get(name, 0.0)
+
+def register_collector(name: str, collector: Callable[[], dict]) -> None:
+    """Register a callable whose result is included in every snapshot"""
+    _collectors[name] = collector
+
+def _summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "count": len(ordered),
+        "p50": ordered[int(round(0.5 * last))],
+        "p90": ordered[int(round(0.9 * last))],
+        "p99": ordered[int(round(0.99 * last))],
+        "max": ordered[last]
+    }
+
+def snapshot() -> dict:
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        samples = {name: list(values) for name, values in _samples.items() if values}
+    collected = {}
+    for name, collector in list(_collectors.items()):
+        try:
+            collected[name] = collector()
+        except Exception as e:
+            collected[name] = {"error": str(e)}
+    return {
+        "counters": counters,
+        "gauges": gauges,
+        "latencies": {name: _summarize(values) for name, values in samples.items()},
+        "collectors": collected
+    }
+
+def reset() -> None:
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _samples.clear()
@@ -1,9 +1,18 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 
 class QueryRequest(BaseModel):
     query: str
     jurisdiction: Optional[str] = "federal"
+    page_size: int = Field(default=10, ge=1, le=50)
+    cursor: Optional[str] = None
+    latency_budget_ms: Optional[int] = Field(default=None, ge=100)
+    # Facet filters; several values within one facet match any of them
+    jurisdictions: Optional[List[str]] = None
+    courts: Optional[List[str]] = None
+    court_levels: Optional[List[str]] = None
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
 
 class CaseSummary(BaseModel):
     case_name: str
@@ -18,6 +27,8 @@ class CaseSummary(BaseModel):
     relevance_score: float
     full_text_link: Optional[str] = None
     jurisdiction: Optional[str] = "federal"
+    generation_tier: Optional[str] = None
+    case_id: Optional[str] = None
 
 class QueryClarification(BaseModel):
     needs_clarification: bool
@@ -25,18 +36,37 @@ class QueryClarification(BaseModel):
     suggested_refinements: List[str]
     original_query: str
 
+class SpellingCorrection(BaseModel):
+    original: str
+    corrected: str
+
+class Suggestion(BaseModel):
+    text: str
+    score: float
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: List[Suggestion]
+
 class QueryResponse(BaseModel):
     query: str
     results: List[CaseSummary]
     total_results: int
+    # Seconds the search took when this response was computed; a response
+    # served from the search cache repeats the original value
     processing_time: float
     jurisdiction_filter: Optional[str] = None
     clarification: Optional[QueryClarification] = None
+    next_cursor: Optional[str] = None
+    facet_counts: Optional[Dict[str, Dict[str, int]]] = None
+    corrected_query: Optional[str] = None
+    spelling_corrections: Optional[List[SpellingCorrection]] = None
 
 class ReportRequest(BaseModel):
     query: str
     case_results: List[CaseSummary]
     jurisdiction: Optional[str] = "federal"
+    latency_budget_ms: Optional[int] = Field(default=None, ge=100)
 
 class ActionableInsight(BaseModel):
     category: str
@@ -44,6 +74,16 @@ class ActionableInsight(BaseModel):
     action_items: List[str]
     legal_considerations: List[str]
 
+class ReportFragment(BaseModel):
+    """What one case contributes to a report on a topic; cached and reused across reports"""
+    citation: str
+    case_name: str
+    insight: ActionableInsight
+    procedural_recommendations: List[str]
+    legal_warnings: List[str]
+    jurisdiction_notes: List[str]
+    generation_tier: Optional[str] = None
+
 class ReportResponse(BaseModel):
     query: str
     executive_summary: str
@@ -52,3 +92,44 @@ class ReportResponse(BaseModel):
     legal_warnings: List[str]
     jurisdiction_specific_notes: List[str]
     generated_at: str
+    generation_tier: Optional[str] = None
+
+class PackedCase(BaseModel):
+    id: str
+    digest: str
+    case_name: str
+    citation: str
+    year: int
+    court: str
+    court_level: str
+    jurisdiction: str
+    facts: str
+    legal_principle: str
+    ruling: str
+    keywords: List[str]
+
+class CasePackResponse(BaseModel):
+    format: int
+    jurisdiction: str
+    version: str
+    # False when cases and removed are a delta against the requested version
+    full: bool
+    since: Optional[str] = None
+    keyword_weight: int
+    cases: List[PackedCase]
+    removed: List[str] = []
+
+class RelatedCase(BaseModel):
+    id: str
+    case_name: str
+    citation: str
+    year: int
+    court: str
+    jurisdiction: str
+    score: float
+
+class RelatedCasesResponse(BaseModel):
+    id: str
+    case_name: str
+    citation: str
+    related: List[RelatedCase]
@@ -0,0 +1,48 @@
+import base64
+import hashlib
+import json
+from typing import Optional
+
+def _fingerprint(query: str, scope: str) -> str:
+    normalized = " ".join(query.lower().split()) + "|" + scope
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+# QueryRequest fields besides the query that shape the ranking
+SCOPE_FIELDS = {"jurisdictions", "courts", "court_levels", "year_from", "year_to"}
+
+def search_scope(jurisdiction: str, request) -> str:
+    """The scope of a search: its resolved jurisdiction and facet filters"""
+    return jurisdiction + request.model_dump_json(include=SCOPE_FIELDS)
+
+def encode_cursor(offset: int, query: str, scope: str) -> str:
+    """Build an opaque cursor pointing at the given result offset of a search.
+
+    scope identifies everything besides the query that shapes the ranking,
+    such as the jurisdiction and facet filters.
+    """
+    payload = json.dumps({"o": offset, "f": _fingerprint(query, scope)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, query: str, scope: str) -> int:
+    """Return the result offset stored in a cursor.
+
+    Raises ValueError if the cursor is malformed or was issued for a different search.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        offset = int(payload["o"])
+        fingerprint = payload["f"]
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if offset < 0 or fingerprint != _fingerprint(query, scope):
+        raise ValueError("Cursor does not belong to this search")
+    return offset
+
+def cursor_offset(cursor: str) -> Optional[int]:
+    """The offset in a cursor, without checking which search it was issued for"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))["o"])
+    except Exception:
+        return None
@@ -0,0 +1,91 @@
+from typing import List, Optional, Tuple
+from models import ActionableInsight, ReportFragment
+
+# Parsers for LLM responses. They are plain functions of the response text so
+# executors.run_parser can run them off the event loop.
+
+def parse_summary_response(text: str) -> Tuple[Optional[str], List[str]]:
+    """Extract the summary and key takeaways from a case summary response.
+
+    Either part is empty when the response does not contain it, so the caller
+    can substitute its fallback.
+    """
+    lines = text.strip().split('\n')
+    summary_lines = []
+    takeaways = []
+    
+    current_section = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        if 'summary' in line.lower() or line.startswith('1.'):
+            current_section = 'summary'
+            if line.startswith('1.'):
+                summary_lines.append(line[2:].strip())
+            continue
+        elif 'takeaway' in line.lower() or 'key points' in line.lower() or line.startswith('2.'):
+            current_section = 'takeaways'
+            continue
+            
+        if current_section == 'summary' and not line.startswith('-') and not line.startswith('•'):
+            summary_lines.append(line)
+        elif current_section == 'takeaways' and (line.startswith('-') or line.startswith('•') or line.startswith('*')):
+            takeaway = line.lstrip('-•* ').strip()
+            if takeaway:
+                takeaways.append(takeaway)
+    
+    return (' '.join(summary_lines) or None), takeaways
+
+def _split_items(text: str) -> List[str]:
+    return [item.strip() for item in text.split(';') if item.strip()]
+
+def parse_report_fragment(text: str, case: dict, tier_name: str) -> ReportFragment:
+    """Parse the fragment format; raises ValueError if the response has no usable insight"""
+    insight = None
+    lists = {'procedure': [], 'warning': [], 'jurisdiction': []}
+    current_section = None
+    for line in text.strip().split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        label, _, rest = line.partition(':')
+        label = label.strip().lstrip('#*').strip().lower()
+        if label == 'insight':
+            parts = [part.strip() for part in rest.split('|')]
+            if len(parts) >= 4 and parts[1]:
+                insight = ActionableInsight(
+                    category=parts[0] or case['case_name'],
+                    insight=parts[1],
+                    action_items=_split_items(parts[2]),
+                    legal_considerations=_split_items(parts[3])
+                )
+            current_section = None
+            continue
+        if label in lists and not rest.strip():
+            current_section = label
+            continue
+        if current_section and (line.startswith('-') or line.startswith('•') or line.startswith('*')):
+            item = line.lstrip('-•* ').strip()
+            if item:
+                lists[current_section].append(item)
+    if insight is None:
+        raise ValueError("No insight in fragment response")
+    return ReportFragment(
+        citation=case['citation'],
+        case_name=case['case_name'],
+        insight=insight,
+        procedural_recommendations=lists['procedure'],
+        legal_warnings=lists['warning'],
+        jurisdiction_notes=lists['jurisdiction'],
+        generation_tier=tier_name
+    )
+
+def parse_executive_summary(text: str) -> str:
+    """The synthesis response as one paragraph, without an "Executive summary:" label"""
+    text = text.strip()
+    label, separator, rest = text.partition(':')
+    if separator and 'executive summary' in label.lower():
+        text = rest.strip()
+    return ' '.join(text.split())
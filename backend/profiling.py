@@ -0,0 +1,125 @@
+import hmac
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from fastapi import HTTPException, Request
+from config import ADMIN_TOKEN, SLOW_REQUEST_BUFFER_SIZE, SLOW_REQUEST_THRESHOLD_MS
+from logs import request_id_var
+
+# Per-request stage timings: stage -> [seconds, calls]. Unset outside a
+# request, so stage() costs one contextvar lookup when nothing is recording.
+# Concurrent tasks of one request share the dict, so a stage that runs in
+# several tasks at once can add up to more than the request's wall time.
+_stage_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("stage_timings", default=None)
+
+class stage:
+    """Attribute the time spent in the block to a named stage of the current request.
+
+    A plain class rather than a generator context manager, since it sits on
+    the hot path of every request.
+    """
+
+    __slots__ = ("name", "timings", "start_time")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.timings = _stage_timings.get()
+
+    def __enter__(self) -> "stage":
+        if self.timings is not None:
+            self.start_time = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.timings is not None:
+            entry = self.timings.setdefault(self.name, [0.0, 0])
+            entry[0] += time.perf_counter() - self.start_time
+            entry[1] += 1
+
+slow_requests: deque = deque(maxlen=SLOW_REQUEST_BUFFER_SIZE)
+
+class SlowRequestMiddleware:
+    """Keep the stage breakdown of every request slower than SLOW_REQUEST_THRESHOLD_MS.
+
+    Stage timings are collected for every request, since slowness is only
+    known at the end; fast requests simply discard them.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or SLOW_REQUEST_THRESHOLD_MS <= 0:
+            await self.app(scope, receive, send)
+            return
+        timings: Dict[str, list] = {}
+        status = {}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = _stage_timings.set(timings)
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _stage_timings.reset(token)
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            if elapsed_ms >= SLOW_REQUEST_THRESHOLD_MS:
+                slow_requests.append({
+                    "at": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                    "request_id": request_id_var.get(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status.get("code"),
+                    "duration_ms": round(elapsed_ms, 2),
+                    "stages": {
+                        name: {"ms": round(seconds * 1000, 2), "calls": calls}
+                        for name, (seconds, calls) in sorted(timings.items(), key=lambda item: -item[1][0])
+                    }
+                })
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{code.co_name}"
+
+def sample_stacks(seconds: float, interval: float) -> Counter:
+    """Sample every thread's stack for a while; returns collapsed stack -> sample count"""
+    own_thread = threading.get_ident()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks: Counter = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            frames: List[str] = []
+            while frame is not None:
+                frames.append(_frame_name(frame))
+                frame = frame.f_back
+            frames.append(names.get(thread_id, f"thread-{thread_id}"))
+            stacks[";".join(reversed(frames))] += 1
+        time.sleep(interval)
+    return stacks
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format, one "frame;frame;frame count" line per stack"""
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+# One on-demand profile at a time; sampling costs nothing until one is requested
+profile_lock = threading.Lock()
+
+def require_admin(request: Request) -> None:
+    """Route dependency: the admin surface is hidden unless ADMIN_TOKEN is set and presented"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    presented = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(presented.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Admin token required")
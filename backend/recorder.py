@@ -0,0 +1,207 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from typing import List, Optional
+import metrics
+from case_packs import case_id
+from config import TRAFFIC_RECORD_KEY, TRAFFIC_RECORD_MAX_BODY_BYTES, TRAFFIC_RECORD_PATH, TRAFFIC_RECORD_QUEUE_SIZE
+from database import get_index, register_index
+from keyword_matcher import tokenize
+from llm_transport import llm_call_log_var
+from models import QueryRequest, ReportRequest
+from pagination import cursor_offset
+from stopwords import COMMON_WORDS
+
+logger = logging.getLogger(__name__)
+
+# 2 added the "llm" calls of each request
+RECORD_FORMAT = 2
+# Recorded routes and the short name each is stored under
+RECORDED_ROUTES = {"/search": "search", "/generate-report": "report"}
+
+def build_traffic_vocabulary(cases: List[dict]) -> frozenset:
+    """Words a recorded query keeps verbatim: everyday words and the corpus's legal vocabulary.
+
+    Case names are left out, since they are mostly the names of parties.
+    """
+    words = set(COMMON_WORDS)
+    for case in cases:
+        for text in (case["facts"], case["legal_principle"], case["ruling"], *case["keywords"]):
+            words.update(word for word in tokenize(text) if word.isalpha())
+    return frozenset(words)
+
+register_index("traffic_vocabulary", build_traffic_vocabulary)
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+def anonymize_query(query: str, key: bytes) -> str:
+    """Replace every word that is not legal vocabulary with a keyed hash.
+
+    Names, plates, addresses and other free text become tokens like
+    "x3f9a0c12" that match nothing in the corpus; the same word always gets
+    the same token, so repeated queries still repeat. Only exact vocabulary
+    is kept: a word one typo away from it may just as well be a surname.
+    """
+    vocabulary = get_index("traffic_vocabulary")
+
+    def replace(match: "re.Match") -> str:
+        word = match.group(0).lower()
+        if word in vocabulary:
+            return match.group(0)
+        return "x" + hmac.new(key, word.encode("utf-8"), hashlib.sha256).hexdigest()[:8]
+
+    return _WORD_RE.sub(replace, query)
+
+def _search_payload(body: bytes, key: bytes) -> dict:
+    request = QueryRequest.model_validate_json(body)
+    payload = request.model_dump(exclude={"query", "cursor"}, exclude_none=True)
+    payload["query"] = anonymize_query(request.query, key)
+    if request.cursor:
+        # The cursor is tied to the original query text, so only its offset is kept
+        payload["offset"] = cursor_offset(request.cursor)
+    return payload
+
+def _report_payload(body: bytes, key: bytes) -> dict:
+    request = ReportRequest.model_validate_json(body)
+    payload = request.model_dump(exclude={"query", "case_results"}, exclude_none=True)
+    payload["query"] = anonymize_query(request.query, key)
+    # Cases by id and score; the summaries are regenerated text and are not kept
+    payload["cases"] = [
+        [result.case_id or case_id(result.model_dump()), result.relevance_score]
+        for result in request.case_results
+    ]
+    return payload
+
+_PAYLOAD_BUILDERS = {"search": _search_payload, "report": _report_payload}
+
+class TrafficRecorder:
+    """Appends anonymized requests to a JSON-lines file from a background thread.
+
+    The request path only puts the raw body on a bounded queue; parsing,
+    anonymizing and writing happen on the writer thread. When the queue is
+    full the request is dropped from the recording and counted, never
+    waited on. Each line is one request:
+    {"t": arrival epoch seconds, "r": route, "s": status, "ms": duration, "b": payload,
+     "llm": [[model, milliseconds, response bytes], ...]};
+    a {"format": ..., "started": ...} line marks each start of recording.
+    LLM responses themselves are never kept, since they restate the query.
+    """
+
+    def __init__(self, path: str, key: bytes, queue_size: int = TRAFFIC_RECORD_QUEUE_SIZE):
+        self.path = path
+        self.key = key
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self.recorded = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, route: str, arrived_at: float, body: bytes, status: Optional[int], duration_ms: float, llm_calls: List[list]) -> None:
+        if len(body) > TRAFFIC_RECORD_MAX_BODY_BYTES:
+            metrics.incr("traffic.skipped_large")
+            return
+        try:
+            self._queue.put_nowait((route, arrived_at, body, status, duration_ms, llm_calls))
+        except queue.Full:
+            metrics.incr("traffic.dropped")
+
+    def _entry(self, route: str, arrived_at: float, body: bytes, status: Optional[int], duration_ms: float, llm_calls: List[list]) -> str:
+        return json.dumps({
+            "t": round(arrived_at, 3),
+            "r": route,
+            "s": status,
+            "ms": round(duration_ms, 1),
+            "b": _PAYLOAD_BUILDERS[route](body, self.key),
+            "llm": llm_calls
+        }, separators=(",", ":"))
+
+    def _run(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"format": RECORD_FORMAT, "started": round(time.time(), 3)}, separators=(",", ":")) + "\n")
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                try:
+                    f.write(self._entry(*item) + "\n")
+                    self.recorded += 1
+                except Exception:
+                    # Bodies the route rejected as invalid are not worth replaying
+                    metrics.incr("traffic.unrecordable")
+                if self._queue.empty():
+                    f.flush()
+
+    def stop(self) -> None:
+        """Write out everything queued and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> dict:
+        return {"path": self.path, "recorded": self.recorded, "queued": self._queue.qsize()}
+
+traffic_recorder: Optional[TrafficRecorder] = None
+
+def start_recording() -> None:
+    """Start recording if TRAFFIC_RECORD_PATH is set"""
+    global traffic_recorder
+    if not TRAFFIC_RECORD_PATH or traffic_recorder is not None:
+        return
+    # Without a configured key the hashes only repeat within one run of the server
+    key = TRAFFIC_RECORD_KEY.encode("utf-8") if TRAFFIC_RECORD_KEY else os.urandom(16)
+    traffic_recorder = TrafficRecorder(TRAFFIC_RECORD_PATH, key)
+    traffic_recorder.start()
+    metrics.register_collector("traffic_recorder", traffic_recorder.stats)
+    logger.info("Recording traffic", extra={"event": "traffic.recording", "path": TRAFFIC_RECORD_PATH})
+
+def stop_recording() -> None:
+    global traffic_recorder
+    if traffic_recorder is not None:
+        traffic_recorder.stop()
+        traffic_recorder = None
+
+class TrafficRecorderMiddleware:
+    """Hand each recorded route's request body, arrival time, outcome and LLM calls to the recorder"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        route = RECORDED_ROUTES.get(scope["path"]) if scope["type"] == "http" and scope["method"] == "POST" else None
+        if route is None or traffic_recorder is None:
+            await self.app(scope, receive, send)
+            return
+        chunks: List[bytes] = []
+        status = {}
+
+        async def receive_and_keep():
+            message = await receive()
+            if message["type"] == "http.request":
+                chunks.append(message.get("body", b""))
+            return message
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        arrived_at = time.time()
+        start_time = time.perf_counter()
+        llm_calls: List[list] = []
+        token = llm_call_log_var.set(llm_calls)
+        try:
+            await self.app(scope, receive_and_keep, send_with_status)
+        finally:
+            llm_call_log_var.reset(token)
+            recorder = traffic_recorder
+            if recorder is not None:
+                recorder.record(route, arrived_at, b"".join(chunks), status.get("code"), (time.perf_counter() - start_time) * 1000, list(llm_calls))
@@ -0,0 +1,489 @@
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+import metrics
+from case_packs import case_digest, case_id
+from config import (
+    RELATED_BATCH_SIZE,
+    RELATED_BUILD_IN_PROCESS,
+    RELATED_GRAPH_PATH,
+    RELATED_MAX_DRIFT,
+    RELATED_MAX_FEATURES,
+    RELATED_TEXT_WEIGHT,
+    RELATED_TOP_K
+)
+from database import get_index, register_index
+from http_cache import EncodedBody
+from keyword_matcher import tokenize
+from models import RelatedCase, RelatedCasesResponse
+from serialization import dump_model
+from stopwords import COMMON_WORDS
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; the sparse pure-Python path finds the same neighbours
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_STOP_WORDS = frozenset(COMMON_WORDS)
+
+# A case's similarity to another is a weighted sum of the cosine similarity of
+# their TF-IDF text vectors (facts, principle, ruling and keywords) and the
+# Jaccard similarity of their keyword sets
+def case_terms(case: dict) -> Counter:
+    text = " ".join([case["facts"], case["legal_principle"], case["ruling"], *case["keywords"]])
+    return Counter(word for word in tokenize(text) if word not in _STOP_WORDS)
+
+def case_keywords(case: dict) -> Set[str]:
+    return {" ".join(tokenize(keyword)) for keyword in case["keywords"]}
+
+Vector = Dict[int, float]
+# (score, position), best first
+Neighbours = List[Tuple[float, int]]
+
+class _GraphState:
+    """Everything a later build needs to extend the graph instead of recomputing it.
+
+    Positions are the order cases were added to the graph, not corpus
+    order. The vocabularies and IDF weights are fixed at the last full
+    build, so cases added incrementally are weighted as if the corpus had
+    not grown. Keywords outside the keyword vocabulary can never be shared
+    with another case, so they only count towards the Jaccard union.
+    """
+
+    def __init__(self, vocabulary: Dict[str, int], idf: List[float], keyword_vocabulary: Dict[str, int]):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.keyword_vocabulary = keyword_vocabulary
+        self.ids: List[str] = []
+        self.digests: Dict[str, str] = {}
+        self.vectors: List[Vector] = []
+        self.keywords: List[frozenset] = []
+        self.keyword_counts: List[int] = []
+        self.neighbours: List[Neighbours] = []
+
+    def vectorize(self, case: dict) -> Vector:
+        weights = {
+            self.vocabulary[term]: count * self.idf[self.vocabulary[term]]
+            for term, count in case_terms(case).items() if term in self.vocabulary
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def append(self, case: dict) -> None:
+        self.ids.append(case_id(case))
+        self.digests[self.ids[-1]] = case_digest(case)
+        self.vectors.append(self.vectorize(case))
+        keywords = case_keywords(case)
+        self.keywords.append(frozenset(self.keyword_vocabulary[keyword] for keyword in keywords if keyword in self.keyword_vocabulary))
+        self.keyword_counts.append(len(keywords))
+        self.neighbours.append([])
+
+def _most_frequent(document_frequency: Counter, min_frequency: int) -> Dict[str, int]:
+    ranked = sorted(
+        (item for item in document_frequency if document_frequency[item] >= min_frequency),
+        key=lambda item: (-document_frequency[item], item)
+    )
+    return {item: position for position, item in enumerate(ranked[:RELATED_MAX_FEATURES])}
+
+def _fit_vocabulary(cases: List[dict]) -> Tuple[Dict[str, int], List[float], Dict[str, int]]:
+    """The RELATED_MAX_FEATURES terms and shared keywords found in the most cases, with smoothed IDF weights"""
+    term_frequency: Counter = Counter()
+    keyword_frequency: Counter = Counter()
+    for case in cases:
+        term_frequency.update(case_terms(case).keys())
+        keyword_frequency.update(case_keywords(case))
+    vocabulary = _most_frequent(term_frequency, 1)
+    idf = [math.log((1 + len(cases)) / (1 + term_frequency[term])) + 1 for term in vocabulary]
+    return vocabulary, idf, _most_frequent(keyword_frequency, 2)
+
+def _top_k(scored: List[Tuple[float, int]]) -> Neighbours:
+    scored = [(score, position) for score, position in scored if score > 0]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return scored[:RELATED_TOP_K]
+
+def _score_rows_numpy(state: _GraphState, rows: List[int]):
+    """Yield (row, scores against every position) a batch of rows at a time"""
+    size = len(state.ids)
+    text = np.zeros((size, len(state.vocabulary)), dtype=np.float32)
+    for position, vector in enumerate(state.vectors):
+        if vector:
+            text[position, list(vector)] = list(vector.values())
+    keywords = np.zeros((size, max(len(state.keyword_vocabulary), 1)), dtype=np.float32)
+    for position, shared in enumerate(state.keywords):
+        if shared:
+            keywords[position, list(shared)] = 1.0
+    keyword_counts = np.array(state.keyword_counts, dtype=np.float32)
+    for start in range(0, len(rows), RELATED_BATCH_SIZE):
+        batch = np.array(rows[start:start + RELATED_BATCH_SIZE])
+        cosine = text[batch] @ text.T
+        shared = keywords[batch] @ keywords.T
+        union = keyword_counts[batch, None] + keyword_counts[None, :] - shared
+        jaccard = np.divide(shared, union, out=np.zeros_like(shared), where=union > 0)
+        scores = RELATED_TEXT_WEIGHT * cosine + (1 - RELATED_TEXT_WEIGHT) * jaccard
+        scores[np.arange(len(batch)), batch] = 0.0
+        for offset, row in enumerate(batch.tolist()):
+            yield row, scores[offset]
+
+def _neighbours_numpy(scores) -> Neighbours:
+    count = min(RELATED_TOP_K, len(scores))
+    best = np.argpartition(-scores, count - 1)[:count] if count else []
+    return _top_k([(float(scores[position]), int(position)) for position in best])
+
+def _score_rows_python(state: _GraphState, rows: List[int]):
+    """Same scores as the numpy path, accumulated through term and keyword postings"""
+    text_postings: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+    keyword_postings: Dict[int, List[int]] = defaultdict(list)
+    for position, vector in enumerate(state.vectors):
+        for term, weight in vector.items():
+            text_postings[term].append((position, weight))
+        for keyword in state.keywords[position]:
+            keyword_postings[keyword].append(position)
+    for row in rows:
+        cosine: Dict[int, float] = defaultdict(float)
+        for term, weight in state.vectors[row].items():
+            for position, other in text_postings[term]:
+                cosine[position] += weight * other
+        shared: Dict[int, int] = defaultdict(int)
+        for keyword in state.keywords[row]:
+            for position in keyword_postings[keyword]:
+                shared[position] += 1
+        scores: Dict[int, float] = {}
+        for position in cosine.keys() | shared.keys():
+            if position == row:
+                continue
+            union = state.keyword_counts[row] + state.keyword_counts[position] - shared.get(position, 0)
+            jaccard = shared.get(position, 0) / union if union else 0.0
+            scores[position] = RELATED_TEXT_WEIGHT * cosine.get(position, 0.0) + (1 - RELATED_TEXT_WEIGHT) * jaccard
+        yield row, scores
+
+def _score_rows(state: _GraphState, rows: List[int]):
+    """Yield (row, neighbours, scores against the other positions: an array with numpy, a dict without)"""
+    if np is not None:
+        for row, scores in _score_rows_numpy(state, rows):
+            yield row, _neighbours_numpy(scores), scores
+    else:
+        for row, scores in _score_rows_python(state, rows):
+            yield row, _top_k([(score, position) for position, score in scores.items()]), scores
+
+def _full_build(cases: List[dict]) -> _GraphState:
+    state = _GraphState(*_fit_vocabulary(cases))
+    for case in cases:
+        state.append(case)
+    for row, neighbours, _ in _score_rows(state, list(range(len(state.ids)))):
+        state.neighbours[row] = neighbours
+    return state
+
+def _extend(state: _GraphState, cases: List[dict], removed: Set[str] = frozenset()) -> None:
+    """Drop the removed case ids from the graph and add cases, rescoring only the rows that changed.
+
+    Similarity is symmetric, so each new row's scores against the existing
+    cases are also those cases' scores against it; an existing case's
+    neighbour list only changes where a new case beats its current k-th.
+    An existing case that loses a neighbour to a removal no longer knows
+    its next best, so its row is rescored in full. A changed case is
+    removed and added again.
+    """
+    stale: List[int] = []
+    if removed:
+        kept = [position for position, identifier in enumerate(state.ids) if identifier not in removed]
+        renumbered = {old: new for new, old in enumerate(kept)}
+        neighbours = []
+        for new, old in enumerate(kept):
+            survivors = [(score, renumbered[other]) for score, other in state.neighbours[old] if other in renumbered]
+            if len(survivors) < len(state.neighbours[old]):
+                stale.append(new)
+            neighbours.append(survivors)
+        for identifier in removed:
+            state.digests.pop(identifier, None)
+        state.ids = [state.ids[old] for old in kept]
+        state.vectors = [state.vectors[old] for old in kept]
+        state.keywords = [state.keywords[old] for old in kept]
+        state.keyword_counts = [state.keyword_counts[old] for old in kept]
+        state.neighbours = neighbours
+    first_new = len(state.ids)
+    for case in cases:
+        state.append(case)
+    # The score a new case must beat to enter each existing case's list;
+    # rescored rows take no offers
+    thresholds = [
+        neighbours[-1][0] if len(neighbours) >= RELATED_TOP_K else 0.0
+        for neighbours in state.neighbours[:first_new]
+    ]
+    for position in stale:
+        thresholds[position] = math.inf
+    if np is not None:
+        thresholds = np.array(thresholds, dtype=np.float32)
+    offers: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+    for row, neighbours, scores in _score_rows(state, stale + list(range(first_new, len(state.ids)))):
+        state.neighbours[row] = neighbours
+        if row < first_new:
+            continue
+        if np is not None:
+            existing = scores[:first_new]
+            for position in np.flatnonzero(existing > thresholds).tolist():
+                offers[position].append((float(existing[position]), row))
+        else:
+            for position, score in scores.items():
+                if position < first_new and score > thresholds[position]:
+                    offers[position].append((score, row))
+    for position, offered in offers.items():
+        state.neighbours[position] = _top_k(state.neighbours[position] + offered)
+
+def _turnover(fitted: Dict[str, int], current: Dict[str, int]) -> float:
+    return 1 - len(fitted.keys() & current.keys()) / len(current) if current else 0.0
+
+def _drift(state: _GraphState, cases: List[dict]) -> float:
+    """How far the graph's vocabulary and IDF weights are from those fitted to cases.
+
+    The larger of the share of each current vocabulary missing from the
+    graph's and the mean relative change of the IDF weights they share.
+    """
+    vocabulary, idf, keyword_vocabulary = _fit_vocabulary(cases)
+    shared = vocabulary.keys() & state.vocabulary.keys()
+    idf_change = sum(
+        abs(idf[vocabulary[term]] - state.idf[state.vocabulary[term]]) / state.idf[state.vocabulary[term]]
+        for term in shared
+    ) / len(shared) if shared else 1.0
+    return max(
+        _turnover(state.vocabulary, vocabulary),
+        _turnover(state.keyword_vocabulary, keyword_vocabulary),
+        idf_change
+    )
+
+# Outlives corpus reloads so a reload that only adds cases extends the graph
+_state: Optional[_GraphState] = None
+_last_build: dict = {}
+
+def _changes(state: Optional[_GraphState], cases: List[dict]) -> Optional[Tuple[Set[str], List[dict]]]:
+    """The case ids to remove and the cases to add to bring the graph up to date with cases.
+
+    None when there is no graph yet or its vocabulary has drifted past
+    RELATED_MAX_DRIFT, so only a full build would match.
+    """
+    if state is None:
+        return None
+    unique: Dict[str, dict] = {}
+    for case in cases:
+        unique.setdefault(case_id(case), case)
+    removed = {
+        identifier for identifier, digest in state.digests.items()
+        if identifier not in unique or case_digest(unique[identifier]) != digest
+    }
+    added = [case for identifier, case in unique.items() if identifier in removed or identifier not in state.digests]
+    if (removed or added) and _drift(state, list(unique.values())) > RELATED_MAX_DRIFT:
+        return None
+    return removed, added
+
+Adjacency = Dict[str, List[Tuple[str, float]]]
+
+def _adjacency(state: _GraphState) -> Adjacency:
+    return {
+        state.ids[position]: [(state.ids[other], score) for score, other in neighbours]
+        for position, neighbours in enumerate(state.neighbours)
+    }
+
+# Graph files map each case id to its digest and neighbours, so a loader can
+# tell which parts of the graph still describe the corpus. They also keep the
+# fitted vocabularies and IDF weights, so the offline build can extend them
+GRAPH_FORMAT = 2
+
+def _load_graph(path: str) -> Optional[dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            graph = json.load(f)
+    except FileNotFoundError:
+        return None
+    return graph if graph.get("format") == GRAPH_FORMAT else None
+
+def _read_state(cases: List[dict], path: str) -> Optional[_GraphState]:
+    """The graph stored at path, as a state that _changes and _extend can bring up to date.
+
+    Vectors are recomputed from cases with the stored vocabulary; cases no
+    longer in the corpus, or changed since, are kept as empty rows under
+    their old digest until _extend removes them.
+    """
+    graph = _load_graph(path)
+    if graph is None or graph["top_k"] != RELATED_TOP_K:
+        return None
+    state = _GraphState(
+        {term: position for position, term in enumerate(graph["vocabulary"])},
+        graph["idf"],
+        {keyword: position for position, keyword in enumerate(graph["keyword_vocabulary"])}
+    )
+    by_id: Dict[str, dict] = {}
+    for case in cases:
+        by_id.setdefault(case_id(case), case)
+    for identifier, entry in graph["cases"].items():
+        case = by_id.get(identifier)
+        if case is not None and case_digest(case) == entry["digest"]:
+            state.append(case)
+        else:
+            state.ids.append(identifier)
+            state.digests[identifier] = entry["digest"]
+            state.vectors.append({})
+            state.keywords.append(frozenset())
+            state.keyword_counts.append(0)
+            state.neighbours.append([])
+    positions = {identifier: position for position, identifier in enumerate(state.ids)}
+    for position, entry in enumerate(graph["cases"].values()):
+        state.neighbours[position] = [(score, positions[other]) for other, score in entry["related"]]
+    return state
+
+def write_graph(cases: List[dict], path: str = RELATED_GRAPH_PATH, incremental: bool = True) -> Tuple[int, str]:
+    """Bring the graph at path up to date with a corpus; returns the number of cases and "full" or "incremental".
+
+    With incremental set, the graph already at path is extended: only new
+    and changed cases, and cases that lost a neighbour, are scored. It is
+    built from scratch when there is none or its vocabulary has drifted
+    past RELATED_MAX_DRIFT.
+    """
+    state = _read_state(cases, path) if incremental else None
+    changes = _changes(state, cases)
+    if changes is None:
+        state = _full_build(cases)
+        mode = "full"
+    else:
+        removed, added = changes
+        _extend(state, added, removed)
+        mode = "incremental"
+    graph = {
+        "format": GRAPH_FORMAT,
+        "top_k": RELATED_TOP_K,
+        "vocabulary": list(state.vocabulary),
+        "idf": state.idf,
+        "keyword_vocabulary": list(state.keyword_vocabulary),
+        "cases": {
+            identifier: {"digest": state.digests[identifier], "related": [[other, round(score, 6)] for other, score in neighbours]}
+            for identifier, neighbours in _adjacency(state).items()
+        }
+    }
+    # Written beside the target and renamed, so a server never reads half a file
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(graph, f, separators=(",", ":"))
+    os.replace(temporary, path)
+    return len(state.ids), mode
+
+def read_graph(cases: List[dict], path: str = RELATED_GRAPH_PATH) -> Tuple[Adjacency, int]:
+    """The stored graph's lists for cases unchanged since it was built, and how many cases it is missing.
+
+    Neighbours that were changed or removed since are left out of the lists.
+    """
+    digests = {case_id(case): case_digest(case) for case in cases}
+    graph = _load_graph(path)
+    if graph is None:
+        return {}, len(digests)
+    current = {
+        identifier for identifier, entry in graph["cases"].items()
+        if digests.get(identifier) == entry["digest"]
+    }
+    adjacency = {
+        identifier: [(other, score) for other, score in graph["cases"][identifier]["related"] if other in current]
+        for identifier in current
+    }
+    return adjacency, len(digests) - len(current)
+
+class RelatedIndex:
+    """Precomputed top-k related cases per case id, each answered with one lookup"""
+
+    def __init__(self, cases: List[dict], adjacency: Adjacency):
+        by_id: Dict[str, dict] = {}
+        for case in cases:
+            by_id.setdefault(case_id(case), case)
+        self.cases = by_id
+        self.adjacency = adjacency
+        self._bodies: Dict[str, EncodedBody] = {}
+        self._lock = Lock()
+
+    def neighbours(self, identifier: str) -> Optional[List[Tuple[str, float]]]:
+        return self.adjacency.get(identifier)
+
+    def body(self, identifier: str) -> Optional[EncodedBody]:
+        """The serialized response for a case, built on first request"""
+        body = self._bodies.get(identifier)
+        if body is None:
+            neighbours = self.adjacency.get(identifier)
+            if neighbours is None:
+                return None
+            case = self.cases[identifier]
+            body = EncodedBody(dump_model(RelatedCasesResponse(
+                id=identifier,
+                case_name=case["case_name"],
+                citation=case["citation"],
+                related=[
+                    RelatedCase(
+                        id=other,
+                        case_name=self.cases[other]["case_name"],
+                        citation=self.cases[other]["citation"],
+                        year=self.cases[other]["year"],
+                        court=self.cases[other]["court"],
+                        jurisdiction=self.cases[other].get("jurisdiction", "federal"),
+                        score=round(score, 4)
+                    )
+                    for other, score in neighbours
+                ]
+            )))
+            with self._lock:
+                self._bodies[identifier] = body
+        return body
+
+def build_related_index(cases: List[dict]) -> RelatedIndex:
+    """The related-cases graph from RELATED_GRAPH_PATH, or built here if that is stale and RELATED_BUILD_IN_PROCESS is set"""
+    global _state
+    start_time = time.perf_counter()
+    adjacency, missing = read_graph(cases, RELATED_GRAPH_PATH)
+    if missing == 0 or not RELATED_BUILD_IN_PROCESS:
+        if missing:
+            # Served as far as it goes; the missing cases answer 404 until the next offline build
+            logger.warning("Related-cases graph is missing cases; run build_related.py", extra={
+                "event": "related.graph_stale", "path": RELATED_GRAPH_PATH, "missing_cases": missing
+            })
+        metrics.incr("related.builds.file")
+        _last_build.update({
+            "mode": "file",
+            "cases": len(adjacency),
+            "missing": missing,
+            "duration_ms": round((time.perf_counter() - start_time) * 1000, 2)
+        })
+        return RelatedIndex(cases, adjacency)
+
+    # Extends the last graph built here, or else the stale file, unless the vocabulary has drifted
+    if _state is None:
+        _state = _read_state(cases, RELATED_GRAPH_PATH)
+    changes = _changes(_state, cases)
+    if changes is None:
+        _state = _full_build(cases)
+        mode = "full"
+        added = _state.ids
+    else:
+        removed, added = changes
+        _extend(_state, added, removed)
+        mode = "incremental"
+    metrics.incr(f"related.builds.{mode}")
+    _last_build.update({
+        "mode": mode,
+        "cases": len(_state.ids),
+        "added": len(added),
+        "missing": 0,
+        "duration_ms": round((time.perf_counter() - start_time) * 1000, 2)
+    })
+    return RelatedIndex(cases, _adjacency(_state))
+
+register_index("related", build_related_index)
+
+def get_related_index() -> RelatedIndex:
+    return get_index("related")
+
+metrics.register_collector("related_cases", lambda: {
+    "backend": "numpy" if np is not None else "python",
+    "top_k": RELATED_TOP_K,
+    "build_in_process": RELATED_BUILD_IN_PROCESS,
+    "last_build": dict(_last_build)
+})
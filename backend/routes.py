@@ -1,94 +1,293 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from datetime import datetime
 import time
 import asyncio
-from models import QueryRequest, QueryResponse, ReportRequest, ReportResponse
-from database import search_cases_by_keywords
+import json
+import logging
+from typing import Optional
+import metrics
+from models import CasePackResponse, QueryRequest, QueryResponse, RelatedCasesResponse, ReportRequest, ReportResponse, SuggestResponse
+from config import (
+    CASE_PACK_MAX_AGE_SECONDS,
+    PROFILE_MAX_SECONDS,
+    RELATED_MAX_AGE_SECONDS,
+    SLOW_REQUEST_THRESHOLD_MS,
+    SUGGEST_MAX_RESULTS,
+    WARM_UP_ON_STARTUP,
+    anthropic_client_status
+)
+from database import facet_counts, get_index, index_status, keyword_matches
 from ai_services import generate_ai_summary, generate_actionable_report
+from executors import run_search
+from admission import admitted_report, admitted_search
+from case_packs import get_case_pack
+from cache import CachedSummary, search_response_cache, search_response_cache_key, summary_cache, summary_cache_key
+from http_cache import EncodedBody, cached_response, compressed_response
+from serialization import dump_model, dump_with_preserialized_list
+from pagination import decode_cursor, encode_cursor, search_scope
+from related import get_related_index
+from profiling import collapsed, profile_lock, require_admin, sample_stacks, slow_requests, stage
+from routing import FALLBACK
+from spelling import correct_query
+from suggest import record_query, suggest
+from startup import PROCESS_STARTED_AT, reload_corpus, reload_lock, warm_up_state
 from utils import analyze_query_clarity
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 @router.get("/")
 async def root():
     return {"message": "Case Law AI Assistant API", "version": "1.0.0"}
 
-@router.post("/search", response_model=QueryResponse)
-async def search_case_law(request: QueryRequest):
+@router.post("/search", response_model=QueryResponse, dependencies=[Depends(admitted_search)])
+async def search_case_law(request: QueryRequest, http_request: Request):
     """Search for relevant case law based on natural language query and jurisdiction"""
     start_time = time.time()
+    # Set on arrival by admitted_search, so queueing counts against the budget
+    deadline = http_request.state.deadline
     
     try:
+        # Fix typos before anything else looks at the query
+        with stage("spelling"):
+            search_query, corrections = correct_query(request.query)
+        spelling = {"corrected_query": search_query, "spelling_corrections": corrections} if corrections else {}
+        record_query(search_query)
+        
         # Check if query needs clarification
-        clarification = analyze_query_clarity(request.query)
+        clarification = analyze_query_clarity(search_query)
         
         if clarification:
             # Return clarification request instead of search results
-            return QueryResponse(
+            return compressed_response(http_request, dump_model(QueryResponse(
                 query=request.query,
                 results=[],
                 total_results=0,
                 processing_time=round(time.time() - start_time, 3),
                 jurisdiction_filter=request.jurisdiction,
-                clarification=clarification
+                clarification=clarification,
+                **spelling
+            )))
+        
+        jurisdiction = request.jurisdiction or "federal"
+        if request.jurisdictions:
+            jurisdiction = "all"
+        
+        # Facet filters become bitsets, intersected into one candidate set before scoring
+        with stage("facets"):
+            facet_index = get_index("facets")
+            filters = facet_index.filters(
+                courts=request.courts,
+                court_levels=request.court_levels,
+                jurisdictions=request.jurisdictions,
+                year_from=request.year_from,
+                year_to=request.year_to
             )
+            candidates = facet_index.combine(filters)
+        scope = search_scope(jurisdiction, request)
+        
+        offset = 0
+        if request.cursor:
+            try:
+                offset = decode_cursor(request.cursor, search_query, scope)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # Repeated searches are served from stored bytes, already compressed. The
+        # stored body keeps the processing_time of the search that produced it
+        response_key = search_response_cache_key(request.query, request.jurisdiction, scope, offset, request.page_size)
+        cached_body = search_response_cache.get(response_key)
+        if cached_body is not None:
+            logger.info("Search served from cache", extra={"event": "search.completed", "cached": True})
+            return compressed_response(http_request, cached_body)
+        
+        # Search for this page of relevant cases, plus one to tell whether another page exists.
+        # The keywords are matched once, for both the ranking and the facet counts
+        with stage("search"):
+            keyword_scores = keyword_matches(search_query)
+            relevant_cases = await run_search(search_query, jurisdiction, request.page_size + 1, offset, candidates, keyword_scores)
+        next_cursor = None
+        if len(relevant_cases) > request.page_size:
+            relevant_cases = relevant_cases[:request.page_size]
+            next_cursor = encode_cursor(offset + request.page_size, search_query, scope)
         
-        # Search for relevant cases with jurisdiction filtering
-        relevant_cases = search_cases_by_keywords(request.query, request.jurisdiction or "federal")
+        # Only this page is summarized. Cached summaries are already serialized, so a hit costs a byte join
+        cache_keys = [summary_cache_key(case_data, search_query, jurisdiction) for case_data in relevant_cases]
+        cached_summaries = [summary_cache.get(key) for key in cache_keys]
+        missing = [i for i, cached in enumerate(cached_summaries) if cached is None]
         
-        # Generate AI summaries for each case concurrently
-        if relevant_cases:
+        # Generate AI summaries for the remaining cases concurrently
+        if missing:
             # Create tasks for concurrent processing
             tasks = [
-                generate_ai_summary(case_data, request.query, request.jurisdiction or "federal")
-                for case_data in relevant_cases
+                generate_ai_summary(relevant_cases[i], search_query, jurisdiction, deadline)
+                for i in missing
             ]
             
             # Execute all AI generation tasks concurrently
-            case_summaries = await asyncio.gather(*tasks)
-        else:
-            case_summaries = []
+            with stage("summaries"):
+                generated = await asyncio.gather(*tasks)
+            for i, summary in zip(missing, generated):
+                cached_summaries[i] = CachedSummary(summary, dump_model(summary))
+                # Fallback text is cheap to rebuild and should not outlive the load that caused it
+                if summary.generation_tier != FALLBACK.name:
+                    summary_cache.set(cache_keys[i], cached_summaries[i])
         
+        with stage("facets"):
+            counts = facet_counts(keyword_scores, jurisdiction, filters)
         processing_time = time.time() - start_time
         
-        return QueryResponse(
+        envelope = QueryResponse(
             query=request.query,
-            results=case_summaries,
-            total_results=len(case_summaries),
+            results=[],
+            total_results=len(cached_summaries),
             processing_time=round(processing_time, 3),
             jurisdiction_filter=request.jurisdiction,
-            clarification=None
+            clarification=None,
+            next_cursor=next_cursor,
+            facet_counts=counts,
+            **spelling
         )
+        with stage("serialize"):
+            body = EncodedBody(dump_with_preserialized_list(
+                envelope, "results", [cached.json for cached in cached_summaries]
+            ), static=False)
+        if all(cached.summary.generation_tier != FALLBACK.name for cached in cached_summaries):
+            search_response_cache.set(response_key, body)
+        logger.info("Search completed", extra={
+            "event": "search.completed",
+            "cached": False,
+            "results": len(cached_summaries),
+            "summaries_generated": len(missing),
+            "processing_time": round(processing_time, 3)
+        })
+        # A POST response is never revalidated, so it gets no ETag
+        return compressed_response(http_request, body)
         
+    except HTTPException:
+        raise
     except Exception as e:
+        logger.exception("Search failed", extra={"event": "search.error"})
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
-@router.post("/generate-report", response_model=ReportResponse)
-async def generate_report(request: ReportRequest):
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_completions(q: str = "", limit: int = Query(default=SUGGEST_MAX_RESULTS, ge=1, le=SUGGEST_MAX_RESULTS)):
+    """Ranked completions for a partially typed query, meant to be called on every keystroke"""
+    start_time = time.perf_counter()
+    suggestions = suggest(q, limit)
+    metrics.observe("suggest.seconds", time.perf_counter() - start_time)
+    return SuggestResponse(query=q, suggestions=suggestions)
+
+@router.post("/generate-report", response_model=ReportResponse, dependencies=[Depends(admitted_report)])
+async def generate_report(request: ReportRequest, http_request: Request):
     """Generate actionable insights report based on case law search results"""
     try:
         report = await generate_actionable_report(
             request.query, 
             request.case_results, 
-            request.jurisdiction or "federal"
+            request.jurisdiction or "federal",
+            http_request.state.deadline
         )
-        return report
+        return compressed_response(http_request, dump_model(report))
         
     except Exception as e:
+        logger.exception("Report failed", extra={"event": "report.error"})
         raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
 
+JURISDICTIONS = [
+    {"value": "all", "label": "All Jurisdictions"},
+    {"value": "federal", "label": "Federal Courts"},
+    {"value": "new_jersey", "label": "New Jersey"},
+    {"value": "pennsylvania", "label": "Pennsylvania"},
+    {"value": "new_york", "label": "New York"}
+]
+
+_jurisdictions_body = EncodedBody(json.dumps({"jurisdictions": JURISDICTIONS}, separators=(",", ":")).encode("utf-8"))
+
 @router.get("/jurisdictions")
-async def get_jurisdictions():
+async def get_jurisdictions(request: Request):
     """Get available jurisdictions for filtering"""
-    return {
-        "jurisdictions": [
-            {"value": "all", "label": "All Jurisdictions"},
-            {"value": "federal", "label": "Federal Courts"},
-            {"value": "new_jersey", "label": "New Jersey"},
-            {"value": "pennsylvania", "label": "Pennsylvania"},
-            {"value": "new_york", "label": "New York"}
-        ]
-    }
+    return cached_response(request, _jurisdictions_body, max_age=3600)
+
+@router.get("/case-packs/{jurisdiction}", response_model=CasePackResponse)
+async def get_case_pack_for_jurisdiction(jurisdiction: str, request: Request, since: Optional[str] = None):
+    """Export a jurisdiction's cases for offline keyword search.
+
+    With since set to a previously downloaded version, only the cases added or
+    changed since then are sent, with the ids of removed cases.
+    """
+    pack = get_case_pack(jurisdiction)
+    if pack is None:
+        raise HTTPException(status_code=404, detail=f"Unknown jurisdiction: {jurisdiction}")
+    body = pack.delta(since) if since else pack.full()
+    return cached_response(request, body, max_age=CASE_PACK_MAX_AGE_SECONDS)
+
+@router.get("/cases/{case_id}/related", response_model=RelatedCasesResponse)
+async def get_related_cases(case_id: str, request: Request):
+    """Cases most like the given one (by the case_id on search results), precomputed per corpus"""
+    body = get_related_index().body(case_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Unknown case: {case_id}")
+    return cached_response(request, body, max_age=RELATED_MAX_AGE_SECONDS)
 
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy", "timestamp": "2025-06-29"}
+    """Liveness probe: the worker is up and serving requests"""
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "uptime_seconds": round(time.time() - PROCESS_STARTED_AT, 3)
+    }
+
+@router.get("/ready")
+async def readiness_check():
+    """Readiness probe: reports index and cache warm state, 503 until warm-up has finished"""
+    case_store = index_status()
+    indexes_warm = case_store["corpus_loaded"] and all(case_store["indexes"].values())
+    ready = indexes_warm or not WARM_UP_ON_STARTUP
+    body = {
+        "status": "ready" if ready else "warming_up",
+        "warm_up": warm_up_state,
+        "case_store": case_store,
+        "llm_client": anthropic_client_status(),
+        "summary_cache": summary_cache.stats()
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@router.get("/metrics")
+async def get_metrics():
+    """Process-local counters, latency percentiles and LLM connection pool usage"""
+    return metrics.snapshot()
+
+@router.get("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def profile_worker(
+    seconds: float = Query(default=10, gt=0, le=PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(default=5, ge=1, le=1000)
+):
+    """Sample every thread of this worker for a while and return collapsed stacks for a flamegraph"""
+    if not profile_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        # Sampled from a worker thread, so the event loop keeps serving (and shows up in the profile)
+        stacks = await asyncio.to_thread(sample_stacks, seconds, interval_ms / 1000)
+    finally:
+        profile_lock.release()
+    return PlainTextResponse(collapsed(stacks))
+
+@router.post("/admin/reload-cases", dependencies=[Depends(require_admin)])
+async def reload_case_corpus():
+    """Reload the case corpus from disk, rebuild its indexes and clear the caches built on the old one"""
+    if not reload_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A reload is already running")
+    try:
+        # Indexes are rebuilt on a worker thread; searches keep being served meanwhile
+        return await asyncio.to_thread(reload_corpus)
+    finally:
+        reload_lock.release()
+
+@router.get("/admin/slow-requests", dependencies=[Depends(require_admin)])
+async def get_slow_requests():
+    """Stage breakdowns of the most recent requests over the slow-request threshold, newest first"""
+    return {"threshold_ms": SLOW_REQUEST_THRESHOLD_MS, "requests": list(reversed(slow_requests))}
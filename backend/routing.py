@@ -0,0 +1,144 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional
+import metrics
+from config import (
+    LLM_ROUTER_LATENCY_HALF_LIFE_SECONDS,
+    LLM_ROUTER_MAX_IN_FLIGHT,
+    LLM_ROUTER_PRIMARY_MAX_PRESSURE,
+    LLM_ROUTER_LATENCY_PRIORS
+)
+
+class ModelTier(NamedTuple):
+    name: str
+    model: Optional[str]  # None means precomputed/fallback text, no LLM call
+    max_pressure: float   # highest in-flight/capacity ratio at which this tier is still used
+
+HAIKU_MODEL = "claude-3-5-haiku-20241022"
+SONNET_MODEL = "claude-sonnet-4-20250514"
+
+FALLBACK = ModelTier("fallback", None, float("inf"))
+
+# Tiers per call kind, best first. A call kind's primary tier gives way under
+# load earlier than the tiers it degrades to.
+TIERS: Dict[str, List[ModelTier]] = {
+    "summary": [
+        ModelTier("haiku", HAIKU_MODEL, LLM_ROUTER_PRIMARY_MAX_PRESSURE),
+        FALLBACK
+    ],
+    # Per-case insight fragments are short and cached, so the fast model is enough
+    "report_fragment": [
+        ModelTier("haiku", HAIKU_MODEL, LLM_ROUTER_PRIMARY_MAX_PRESSURE),
+        FALLBACK
+    ],
+    "report": [
+        ModelTier("sonnet", SONNET_MODEL, LLM_ROUTER_PRIMARY_MAX_PRESSURE),
+        ModelTier("haiku", HAIKU_MODEL, 1.0),
+        FALLBACK
+    ]
+}
+
+EWMA_ALPHA = 0.2
+
+class ModelRouter:
+    """Picks a model tier per LLM call from the deadline, load and observed upstream latency"""
+
+    def __init__(self, max_in_flight: int, latency_priors: Dict[str, float], half_life: float = LLM_ROUTER_LATENCY_HALF_LIFE_SECONDS):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.half_life = half_life
+        self._priors: Dict[str, float] = dict(latency_priors)
+        # tier name -> (estimate, monotonic time it was last updated)
+        self._latency: Dict[str, tuple] = {}
+        self._lock = Lock()
+
+    def _estimate(self, name: str, now: float) -> float:
+        """The tier's latency estimate, decayed toward its prior since the last observation.
+
+        A tier that looked too slow for every deadline gets no calls and so no
+        new observations; the decay lets it be tried again instead of being
+        ruled out until a restart.
+        """
+        prior = self._priors.get(name, 0.0)
+        observed = self._latency.get(name)
+        if observed is None:
+            return prior
+        estimate, updated_at = observed
+        if self.half_life <= 0:
+            return estimate
+        weight = 0.5 ** ((now - updated_at) / self.half_life)
+        return prior + (estimate - prior) * weight
+
+    def expected_latency(self, tier: ModelTier) -> float:
+        return self._estimate(tier.name, time.monotonic()) if tier.model else 0.0
+
+    def pressure(self) -> float:
+        return self.in_flight / self.max_in_flight if self.max_in_flight else 0.0
+
+    def choose(self, kind: str, deadline: Optional[float] = None) -> ModelTier:
+        """Return the best tier whose load limit and expected latency fit the request"""
+        remaining = deadline - time.monotonic() if deadline is not None else float("inf")
+        pressure = self.pressure()
+        for tier in TIERS[kind]:
+            if pressure > tier.max_pressure:
+                continue
+            # Queueing behind other calls stretches latency once the pool is saturated
+            if self.expected_latency(tier) * max(1.0, pressure) > remaining:
+                continue
+            metrics.incr(f"llm.tier.{kind}.{tier.name}")
+            return tier
+        metrics.incr(f"llm.tier.{kind}.{FALLBACK.name}")
+        return FALLBACK
+
+    @contextmanager
+    def track(self, tier: ModelTier):
+        """Count an upstream call as in flight and fold a successful call's latency into the tier's estimate"""
+        with self._lock:
+            self.in_flight += 1
+        start_time = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            # Cancelled calls (e.g. the losing side of a hedge) and failed ones say
+            # nothing about latency: a refused connection fails at once, a call
+            # retried until its timeout takes several times the deadline
+            with self._lock:
+                self.in_flight -= 1
+            if not isinstance(e, asyncio.CancelledError):
+                metrics.incr(f"llm.model.{tier.name}.errors")
+            raise
+        else:
+            self._finish(tier, time.monotonic() - start_time)
+
+    def _finish(self, tier: ModelTier, elapsed: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            previous = self._estimate(tier.name, now) if tier.name in self._latency or tier.name in self._priors else elapsed
+            self._latency[tier.name] = ((1 - EWMA_ALPHA) * previous + EWMA_ALPHA * elapsed, now)
+        metrics.observe(f"llm.model.{tier.name}.seconds", elapsed)
+
+    def call_timeout(self, default_timeout: float, deadline: Optional[float] = None) -> float:
+        """Per-call timeout, shortened so a call cannot outlive the request's deadline"""
+        if deadline is None:
+            return default_timeout
+        return max(0.5, min(default_timeout, deadline - time.monotonic()))
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "pressure": round(self.pressure(), 3),
+            "expected_latency_seconds": {
+                name: round(self._estimate(name, time.monotonic()), 3) for name in sorted(set(self._priors) | set(self._latency))
+            }
+        }
+
+def deadline_from_budget(budget_ms: Optional[int], default_ms: int) -> float:
+    """Convert a request's latency budget into an absolute monotonic deadline"""
+    return time.monotonic() + (budget_ms or default_ms) / 1000
+
+model_router = ModelRouter(LLM_ROUTER_MAX_IN_FLIGHT, LLM_ROUTER_LATENCY_PRIORS)
+metrics.register_collector("model_router", model_router.stats)
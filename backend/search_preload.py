@@ -0,0 +1,13 @@
+"""Imported once by the search pool's fork server (see executors._mp_context).
+
+Loads the corpus and builds the ranking indexes before any worker exists, so
+every worker forked from the server shares them copy-on-write instead of
+loading its own copy. gc.freeze() moves them out of the collector's reach;
+otherwise the first collection in each worker writes to every object's
+header and copies the pages anyway.
+"""
+import gc
+import database
+
+database.warm_up()
+gc.freeze()
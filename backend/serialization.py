@@ -0,0 +1,22 @@
+from typing import List
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+def dump_model(model: BaseModel) -> bytes:
+    """Serialize a Pydantic model straight to JSON bytes, skipping jsonable_encoder"""
+    return model.__pydantic_serializer__.to_json(model)
+
+def dump_with_preserialized_list(model: BaseModel, field: str, items: List[bytes]) -> bytes:
+    """Serialize a model whose list field is supplied as pre-serialized JSON items.
+
+    Fields are emitted in declaration order, so the output matches dump_model()
+    for the same data; the list itself costs only a byte join.
+    """
+    chunks = []
+    for name in type(model).model_fields:
+        if name == field:
+            value = b"[" + b",".join(items) + b"]"
+        else:
+            value = to_json(getattr(model, name))
+        chunks.append(b'"' + name.encode() + b'":' + value)
+    return b"{" + b",".join(chunks) + b"}"
@@ -0,0 +1,166 @@
+import gzip
+import re
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from config import ENGLISH_WORDS_PATH
+from database import get_index, register_index
+from keyword_matcher import tokenize
+from models import SpellingCorrection
+from stopwords import COMMON_WORDS
+
+MIN_WORD_LENGTH = 4
+# Words shorter than this tolerate only one edit; two edits would turn too
+# many ordinary words ("research") into legal terms ("search")
+TWO_EDIT_MIN_LENGTH = 9
+
+def damerau_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_minimum = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+            row_minimum = min(row_minimum, current[j])
+        if row_minimum > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[len(b)]
+
+class SymSpellIndex:
+    """Symmetric-delete spelling dictionary.
+
+    Every dictionary word is stored under all strings reachable by deleting up
+    to max_edit_distance characters from its prefix. A lookup generates the
+    same deletes for the input term, so candidate retrieval is a handful of
+    dict lookups regardless of vocabulary size; candidates are then verified
+    with a real edit distance.
+    """
+
+    def __init__(self, max_edit_distance: int = 2, prefix_length: int = 7):
+        self.max_edit_distance = max_edit_distance
+        self.prefix_length = prefix_length
+        self.words: Dict[str, int] = {}
+        # Valid words that are never corrected but never suggested either
+        self.english_words: FrozenSet[str] = frozenset()
+        self._deletes: Dict[str, List[str]] = {}
+
+    def _edits(self, word: str, max_distance: int) -> Set[str]:
+        key = word[:self.prefix_length]
+        edits = {key}
+        frontier = {key}
+        for _ in range(max_distance):
+            next_frontier = set()
+            for candidate in frontier:
+                if len(candidate) <= 1:
+                    continue
+                for i in range(len(candidate)):
+                    next_frontier.add(candidate[:i] + candidate[i + 1:])
+            next_frontier -= edits
+            edits |= next_frontier
+            frontier = next_frontier
+        return edits
+
+    def add_word(self, word: str, count: int = 1) -> None:
+        if word in self.words:
+            self.words[word] += count
+            return
+        self.words[word] = count
+        for delete in self._edits(word, self.max_edit_distance):
+            self._deletes.setdefault(delete, []).append(word)
+
+    def lookup(self, term: str, max_distance: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """Closest dictionary word to term as (word, distance); frequency breaks ties"""
+        if max_distance is None:
+            max_distance = self.max_edit_distance
+        if term in self.words:
+            return term, 0
+        best = None
+        seen = set()
+        for delete in self._edits(term, max_distance):
+            for candidate in self._deletes.get(delete, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                distance = damerau_levenshtein(term, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                rank = (distance, -self.words[candidate])
+                if best is None or rank < best[0]:
+                    best = (rank, candidate)
+        if best is None:
+            return None
+        return best[1], best[0][0]
+
+# (suffix, replacement) pairs tried when an inflected word is not in the
+# English word list itself, e.g. "searched" -> "search", "cities" -> "city"
+_INFLECTIONS = (
+    ("ies", "y"), ("es", ""), ("s", ""), ("ed", ""), ("ed", "e"), ("d", ""),
+    ("ing", ""), ("ing", "e"), ("ers", ""), ("er", ""), ("ly", "")
+)
+
+def load_english_words(path: str = ENGLISH_WORDS_PATH) -> FrozenSet[str]:
+    """One lowercase word per line; a missing list only means fewer words are protected"""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    except FileNotFoundError:
+        return frozenset()
+
+def is_english_word(word: str, english_words: FrozenSet[str]) -> bool:
+    """Whether word, or its stem without a common inflection, is an English word"""
+    if word in english_words:
+        return True
+    for suffix, replacement in _INFLECTIONS:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and word[:-len(suffix)] + replacement in english_words:
+            return True
+    return False
+
+def build_spelling_index(cases: List[dict]) -> SymSpellIndex:
+    """Dictionary from the corpus vocabulary; legal terms outweigh narrative text"""
+    index = SymSpellIndex()
+    index.english_words = load_english_words()
+    for word in COMMON_WORDS:
+        index.add_word(word, 1)
+    for case in cases:
+        for field, weight in (("keywords", 10), ("case_name", 5), ("legal_principle", 5), ("ruling", 2), ("facts", 1)):
+            text = " ".join(case[field]) if field == "keywords" else case[field]
+            for word in tokenize(text):
+                if not word.isdigit():
+                    index.add_word(word, weight)
+    return index
+
+register_index("spelling", build_spelling_index)
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+def correct_query(query: str) -> Tuple[str, List[SpellingCorrection]]:
+    """Replace misspelled query words with their closest corpus vocabulary word.
+
+    Only words with no exact match are corrected: short words, words in the
+    dictionary and ordinary English words ("main", "weed") are left alone.
+    Long words tolerate two edits, others only one.
+    """
+    index = get_index("spelling")
+    corrections: List[SpellingCorrection] = []
+
+    def replace(match: "re.Match") -> str:
+        original = match.group(0)
+        word = original.lower()
+        if len(word) < MIN_WORD_LENGTH or word.isdigit() or word in index.words:
+            return original
+        if is_english_word(word, index.english_words):
+            return original
+        result = index.lookup(word, 2 if len(word) >= TWO_EDIT_MIN_LENGTH else 1)
+        if result is None:
+            return original
+        corrections.append(SpellingCorrection(original=original, corrected=result[0]))
+        return result[0]
+
+    corrected = _WORD_RE.sub(replace, query)
+    return corrected, corrections
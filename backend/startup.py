@@ -0,0 +1,59 @@
+import logging
+import threading
+import time
+from cache import report_fragment_cache, search_response_cache, summary_cache
+from config import get_anthropic_client
+from database import corpus_generation, get_cases, reload_cases
+from database import warm_up as warm_up_case_store
+from executors import start_executors
+
+logger = logging.getLogger(__name__)
+
+PROCESS_STARTED_AT = time.time()
+
+warm_up_state = {
+    "status": "not_started",
+    "duration_seconds": None,
+    "error": None
+}
+
+def run_warm_up() -> None:
+    """Load the corpus, build indexes and create the LLM client ahead of the first request"""
+    warm_up_state["status"] = "running"
+    start_time = time.time()
+    try:
+        warm_up_case_store()
+        # Search workers load the corpus as they start, so the first offloaded search doesn't wait
+        start_executors()
+        get_anthropic_client()
+        warm_up_state["status"] = "done"
+        logger.info("Warm-up finished", extra={"event": "warm_up.done", "duration_seconds": round(time.time() - start_time, 3)})
+    except Exception as e:
+        logger.exception("Warm-up failed", extra={"event": "warm_up.error"})
+        warm_up_state["status"] = "failed"
+        warm_up_state["error"] = str(e)
+    warm_up_state["duration_seconds"] = round(time.time() - start_time, 3)
+
+# One reload at a time; a second request while one runs gets a 409
+reload_lock = threading.Lock()
+
+def _clear_corpus_caches() -> None:
+    for cache in (search_response_cache, summary_cache, report_fragment_cache):
+        cache.clear()
+
+def reload_corpus() -> dict:
+    """Reload the corpus from CASES_PATH and drop everything cached from the old one"""
+    start_time = time.time()
+    reload_cases()
+    _clear_corpus_caches()
+    # Search workers still hold the old corpus; replace them before the first search needs to
+    start_executors()
+    # Requests that were still running on the old corpus may have cached their results meanwhile
+    _clear_corpus_caches()
+    result = {
+        "case_count": len(get_cases()),
+        "generation": corpus_generation(),
+        "duration_seconds": round(time.time() - start_time, 3)
+    }
+    logger.info("Corpus reloaded", extra={"event": "corpus.reloaded", **result})
+    return result
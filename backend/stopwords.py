@@ -0,0 +1,12 @@
+# Everyday words officers type around the legal terms. Spelling correction
+# never "corrects" them into corpus vocabulary, and the related-cases and
+# traffic-recording vocabularies treat them as stop words. Kept free of
+# imports so any module can use it without pulling in the case store.
+COMMON_WORDS = """
+a about after all also an and any are as at be because been before being both but by can
+could did do does during each either for from had has have he her his how i if in into is
+it its may me might my no nor not of on or our out over own she should so some such than
+that the their them then there these they this those through to too under until up upon us
+was we were what when where whether which while who whom why will with without would you
+your get got go make need officer officers police cop person someone car without inside
+""".split()
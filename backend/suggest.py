@@ -0,0 +1,209 @@
+import re
+from collections import Counter
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from config import SUGGEST_MAX_RESULTS
+from database import get_index, register_index
+from keyword_matcher import KeywordAutomaton, tokenize
+from models import Suggestion
+from utils import REFINEMENT_LISTS
+
+# Base weight each source contributes to a phrase; every observed query that
+# mentions the phrase adds OBSERVED_QUERY_WEIGHT on top
+SUGGEST_KEYWORD_WEIGHT = 1.0
+PRINCIPLE_WEIGHT = 1.0
+REFINEMENT_WEIGHT = 2.0
+OBSERVED_QUERY_WEIGHT = 1.0
+# A typed query is completed from its last few words at most
+MAX_TAIL_WORDS = 4
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+def normalize(text: str) -> str:
+    return " ".join(tokenize(text))
+
+class _Node:
+    __slots__ = ("edges", "top")
+
+    def __init__(self, top: Optional[List[str]] = None):
+        # first character -> (edge label, child)
+        self.edges: Dict[str, Tuple[str, "_Node"]] = {}
+        # Best phrases anywhere below this node, best first
+        self.top: List[str] = top or []
+
+class PhraseTrie:
+    """Radix (path-compressed) trie mapping typed prefixes to ranked phrases.
+
+    Every phrase is inserted under its full text and under each suffix that
+    starts a word, so "amend" completes "fourth amendment". Each node keeps
+    the top max_results phrases of its subtree, so a lookup is one walk down
+    the prefix and a copy of that list. Scores only ever increase, which
+    lets record() update those lists in place along the phrase's paths
+    without rescanning any subtree.
+    """
+
+    def __init__(self, max_results: int = SUGGEST_MAX_RESULTS):
+        self.max_results = max_results
+        self.root = _Node()
+        self.scores: Dict[str, float] = {}
+        # Lowercased text as first added, punctuation kept, so one list never mixes casings
+        self.display: Dict[str, str] = {}
+        self._lock = Lock()
+
+    def _rank(self, phrase: str) -> tuple:
+        return (-self.scores[phrase], len(phrase), phrase)
+
+    def _offer(self, node: _Node, phrase: str) -> None:
+        top = node.top
+        if phrase not in top:
+            if len(top) >= self.max_results and self._rank(phrase) >= self._rank(top[-1]):
+                return
+            top = top + [phrase]
+        node.top = sorted(top, key=self._rank)[:self.max_results]
+
+    def _insert_key(self, key: str) -> List[_Node]:
+        """Add key to the trie, returning the nodes on its path, deepest last"""
+        node = self.root
+        path = [node]
+        while key:
+            edge = node.edges.get(key[0])
+            if edge is None:
+                child = _Node()
+                node.edges[key[0]] = (key, child)
+                path.append(child)
+                return path
+            label, child = edge
+            common = 0
+            while common < min(len(label), len(key)) and label[common] == key[common]:
+                common += 1
+            if common < len(label):
+                # Split the edge; the new node covers exactly the old child's subtree
+                middle = _Node(list(child.top))
+                middle.edges[label[common]] = (label[common:], child)
+                node.edges[key[0]] = (label[:common], middle)
+                child = middle
+            node = child
+            path.append(node)
+            key = key[common:]
+        return path
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        while prefix:
+            edge = node.edges.get(prefix[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if prefix.startswith(label):
+                prefix = prefix[len(label):]
+            elif label.startswith(prefix):
+                return child
+            else:
+                return None
+            node = child
+        return node
+
+    def _keys(self, phrase: str) -> List[str]:
+        words = phrase.split(" ")
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def add(self, text: str, weight: float) -> None:
+        """Add a phrase, or add weight to one already present"""
+        phrase = normalize(text)
+        if not phrase:
+            return
+        with self._lock:
+            self.display.setdefault(phrase, " ".join(text.split()).lower())
+            self.scores[phrase] = self.scores.get(phrase, 0.0) + weight
+            for key in self._keys(phrase):
+                for node in self._insert_key(key):
+                    self._offer(node, phrase)
+
+    def complete(self, prefix: str, limit: int) -> List[Tuple[str, float]]:
+        """Best phrases with a word starting at the typed prefix, as (phrase, score)"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [(phrase, self.scores[phrase]) for phrase in node.top[:limit]]
+
+    def completion(self, phrase: str, prefix: str) -> str:
+        """Display text of phrase from the word where the typed prefix matched"""
+        words = phrase.split(" ")
+        start = next(i for i in range(len(words)) if " ".join(words[i:]).startswith(prefix))
+        display = self.display[phrase]
+        return display[list(_WORD_RE.finditer(display))[start].start():]
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+# Observed query counts per vocabulary phrase. They outlive corpus reloads
+# and are replayed into each rebuilt trie. Only vocabulary phrases are
+# counted, so no officer's query text is ever offered to another user.
+_observed: Counter = Counter()
+_observed_lock = Lock()
+
+class SuggestIndex:
+    def __init__(self, trie: PhraseTrie, matcher: KeywordAutomaton):
+        self.trie = trie
+        self.matcher = matcher
+
+def build_suggest_index(cases: List[dict]) -> SuggestIndex:
+    """Typeahead vocabulary: case keywords, legal principles and the clarification refinements"""
+    trie = PhraseTrie()
+    for case in cases:
+        for keyword in case["keywords"]:
+            trie.add(keyword, SUGGEST_KEYWORD_WEIGHT)
+        trie.add(case["legal_principle"], PRINCIPLE_WEIGHT)
+    for refinements in REFINEMENT_LISTS:
+        for refinement in refinements:
+            trie.add(refinement, REFINEMENT_WEIGHT)
+    with _observed_lock:
+        observed = dict(_observed)
+    for phrase, count in observed.items():
+        if phrase in trie.scores:
+            trie.add(phrase, count * OBSERVED_QUERY_WEIGHT)
+    matcher = KeywordAutomaton()
+    for phrase in trie.scores:
+        matcher.add(phrase, phrase)
+    return SuggestIndex(trie, matcher.build())
+
+register_index("suggest", build_suggest_index)
+
+def record_query(query: str) -> None:
+    """Count a submitted query towards the vocabulary phrases it mentions"""
+    index = get_index("suggest")
+    phrases = list(index.matcher.match(query))
+    if not phrases:
+        return
+    with _observed_lock:
+        _observed.update(phrases)
+    for phrase in phrases:
+        index.trie.add(phrase, OBSERVED_QUERY_WEIGHT)
+
+def suggest(text: str, limit: int = SUGGEST_MAX_RESULTS) -> List[Suggestion]:
+    """Completions for partially typed text, best first.
+
+    The typed text is completed from its longest tail of words (up to
+    MAX_TAIL_WORDS) that starts a word of some phrase. On its own the tail
+    completes to the whole phrase ("amend" suggests "fourth amendment"); after
+    earlier words, which are kept as typed, only the phrase from the matched
+    word onward is appended, so "when can i search incid" suggests "when can i
+    search incident to arrest".
+    """
+    trie = get_index("suggest").trie
+    words = tokenize(text)
+    if not words:
+        return []
+    trailing_space = text[-1:].isspace()
+    for start in range(max(0, len(words) - MAX_TAIL_WORDS), len(words)):
+        tail = " ".join(words[start:]) + (" " if trailing_space else "")
+        completions = trie.complete(tail, limit)
+        if completions:
+            head = " ".join(words[:start])
+            suggestions: Dict[str, Suggestion] = {}
+            for phrase, score in completions:
+                # Phrases sharing the matched words complete to the same text; keep the best
+                completion = f"{head} {trie.completion(phrase, tail)}" if head else trie.display[phrase]
+                suggestions.setdefault(completion, Suggestion(text=completion, score=score))
+            return list(suggestions.values())
+    return []
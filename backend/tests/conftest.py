@@ -0,0 +1,26 @@
+import os
+import sys
+
+# The backend modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture
+def search_client(monkeypatch):
+    """A TestClient for the app whose case summaries are built without the LLM"""
+    from fastapi.testclient import TestClient
+    import main
+    import routes
+    from models import CaseSummary
+
+    async def summary(case_data, query, jurisdiction="federal", deadline=None):
+        return CaseSummary(
+            case_name=case_data["case_name"], citation=case_data["citation"], year=case_data["year"],
+            court=case_data["court"], summary="", key_takeaways=[], facts="", legal_principle="",
+            ruling="", relevance_score=case_data["relevance_score"], generation_tier="stub"
+        )
+
+    monkeypatch.setattr(routes, "generate_ai_summary", summary)
+    with TestClient(main.app) as client:
+        yield client
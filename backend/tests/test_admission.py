@@ -0,0 +1,37 @@
+import asyncio
+import time
+import pytest
+from starlette.requests import Request
+import admission
+from admission import AdmissionController, Overloaded, request_priority
+
+def make_request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/search",
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+    })
+
+def test_priority_header_is_ignored_without_api_key():
+    assert request_priority(make_request({"X-Priority": "urgent"})) == "standard"
+
+def test_priority_comes_from_api_key(monkeypatch):
+    monkeypatch.setattr(admission, "PRIORITY_API_KEYS", {"field-key": "urgent"})
+    assert request_priority(make_request({"X-API-Key": "field-key", "X-Priority": "bulk"})) == "urgent"
+    assert request_priority(make_request({"X-API-Key": "other-key", "X-Priority": "urgent"})) == "standard"
+
+def test_deadline_bounds_queue_wait():
+    controller = AdmissionController(1, {"urgent": 4, "standard": 4, "bulk": 4}, {"urgent": 10, "standard": 10, "bulk": 10})
+
+    async def scenario():
+        async with controller.admit("standard"):
+            start = time.monotonic()
+            with pytest.raises(Overloaded) as shed:
+                async with controller.admit("standard", time.monotonic() + 0.05):
+                    pass
+            return time.monotonic() - start, shed.value.reason
+
+    waited, reason = asyncio.run(scenario())
+    assert reason == "deadline"
+    assert waited < 1
@@ -0,0 +1,62 @@
+import asyncio
+import gc
+import json
+import pytest
+import database
+import executors
+
+QUERIES = ["police searched my car during a traffic stop", "miranda warnings before interrogation"]
+
+def test_process_pool_ranks_like_inline(monkeypatch):
+    monkeypatch.setattr(executors, "SEARCH_EXECUTOR", "process")
+    try:
+        for query in QUERIES:
+            assert asyncio.run(executors.run_search(query, "all")) == database.search_cases_by_keywords(query, "all")
+    finally:
+        executors.shutdown_executors()
+
+def test_searches_survive_a_pool_replacement(monkeypatch):
+    monkeypatch.setattr(executors, "SEARCH_EXECUTOR", "process")
+
+    async def scenario():
+        pending = [asyncio.create_task(executors.run_search(query, "all")) for query in QUERIES * 4]
+        await asyncio.sleep(0)
+        # As after a reload: the next search starts a new pool while these are in flight
+        monkeypatch.setattr(executors, "_search_pool_generation", -1)
+        await asyncio.to_thread(executors.get_search_pool)
+        return await asyncio.gather(*pending)
+
+    try:
+        executors.get_search_pool()
+        results = asyncio.run(scenario())
+    finally:
+        executors.shutdown_executors()
+    assert results == [database.search_cases_by_keywords(query, "all") for query in QUERIES * 4]
+
+def test_workers_share_the_fork_server_corpus(monkeypatch):
+    if executors._start_method() != "forkserver":
+        pytest.skip("workers are spawned")
+    monkeypatch.setattr(executors, "SEARCH_EXECUTOR", "process")
+    try:
+        pool = executors.get_search_pool()
+        assert pool.submit(database.corpus_source).result() == database.corpus_source()
+        # Inherited from search_preload rather than loaded by the worker
+        assert pool.submit(gc.get_freeze_count).result() > 0
+    finally:
+        executors.shutdown_executors()
+
+def test_workers_reload_a_corpus_the_fork_server_did_not_preload(tmp_path, monkeypatch):
+    monkeypatch.setattr(executors, "SEARCH_EXECUTOR", "process")
+    path = tmp_path / "cases.json"
+    path.write_text(json.dumps(database.get_cases()[:5]), encoding="utf-8")
+    original_path = database.CASES_PATH
+    monkeypatch.setattr(database, "CASES_PATH", str(path))
+    try:
+        database.reload_cases()
+        pool = executors.get_search_pool()
+        assert pool.submit(database.corpus_source).result() == database.corpus_source()
+        assert asyncio.run(executors.run_search(QUERIES[0], "all")) == database.search_cases_by_keywords(QUERIES[0], "all")
+    finally:
+        executors.shutdown_executors()
+        monkeypatch.setattr(database, "CASES_PATH", original_path)
+        database.reload_cases()
@@ -0,0 +1,54 @@
+import pytest
+import database
+from facets import court_level
+
+QUERIES = ["police searched my car during a traffic stop", "miranda warnings", "warrant"]
+
+def brute_force_counts(query: str, jurisdiction: str, court_levels=None, year_range=None) -> dict:
+    """Facet counts over every case with a keyword hit, each facet ignoring its own filter"""
+    automaton = database.get_index("keyword_automaton").match(query.lower())
+    cases = database.get_cases()
+
+    def passes(case, excluding):
+        if excluding != "jurisdiction" and jurisdiction != "all" and case.get("jurisdiction", "federal") != jurisdiction:
+            return False
+        if excluding != "court_level" and court_levels and court_level(case) not in court_levels:
+            return False
+        if excluding != "decade" and year_range and not year_range[0] <= case["year"] <= year_range[1]:
+            return False
+        return True
+
+    counts = {}
+    for facet, value_of in (
+        ("court", lambda case: case["court"]),
+        ("court_level", court_level),
+        ("jurisdiction", lambda case: case.get("jurisdiction", "federal")),
+        ("decade", lambda case: f"{case['year'] // 10 * 10}s")
+    ):
+        counts[facet] = {}
+        for index, case in enumerate(cases):
+            if index in automaton and passes(case, facet):
+                counts[facet][value_of(case)] = counts[facet].get(value_of(case), 0) + 1
+    return counts
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("jurisdiction", ["all", "federal"])
+def test_counts_match_keyword_hits_and_skip_own_filter(query, jurisdiction):
+    filters = database.get_index("facets").filters(court_levels=["supreme"], year_from=1960, year_to=1999)
+    counts = database.facet_counts(database.keyword_matches(query), jurisdiction, filters)
+    assert counts == brute_force_counts(query, jurisdiction, ["supreme"], (1960, 1999))
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_shared_keyword_scores_rank_like_a_fresh_match(query):
+    facet_index = database.get_index("facets")
+    candidates = facet_index.combine(facet_index.filters(court_levels=["supreme"]))
+    keyword_scores = database.keyword_matches(query)
+    assert database.rank_cases(query, "all", 10, 0, candidates, keyword_scores) == database.rank_cases(query, "all", 10, 0, candidates)
+
+def test_selected_facet_keeps_alternative_counts():
+    facet_index = database.get_index("facets")
+    keyword_scores = database.keyword_matches("search")
+    unfiltered = database.facet_counts(keyword_scores, "all", {})
+    filtered = database.facet_counts(keyword_scores, "all", facet_index.filters(court_levels=["supreme"]))
+    assert filtered["court_level"] == unfiltered["court_level"]
+    assert set(filtered["court"]) <= set(unfiltered["court"])
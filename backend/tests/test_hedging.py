@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from hedging import HedgePolicy
+
+def primed_policy() -> HedgePolicy:
+    policy = HedgePolicy("test", enabled=True, max_hedge_fraction=1.0, min_samples=1, min_delay=0.01)
+    policy._latencies.extend([0.02] * 10)
+    return policy
+
+def calls(*behaviours):
+    """A call() whose nth invocation sleeps, then returns, raises or cancels itself as given"""
+    remaining = list(behaviours)
+
+    async def call():
+        seconds, outcome = remaining.pop(0)
+        await asyncio.sleep(seconds)
+        if outcome == "cancel":
+            raise asyncio.CancelledError()
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return call
+
+def test_hedge_win_records_latency_from_the_first_call():
+    policy = primed_policy()
+    result = asyncio.run(policy.run(calls((1.0, "primary"), (0.05, "hedge"))))
+    assert result == "hedge"
+    # Threshold 0.02 s plus the hedge's 0.05 s, not the hedge's own time
+    assert policy._latencies[-1] >= 0.07
+
+def test_cancelled_copy_is_skipped():
+    policy = primed_policy()
+    assert asyncio.run(policy.run(calls((0.04, "cancel"), (0.1, "hedge")))) == "hedge"
+
+def test_both_copies_failing_raises_the_first_error():
+    policy = primed_policy()
+    with pytest.raises(ValueError, match="primary"):
+        asyncio.run(policy.run(calls((0.04, ValueError("primary")), (0.1, ValueError("hedge")))))
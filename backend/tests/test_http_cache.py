@@ -0,0 +1,34 @@
+import gzip
+import json
+from starlette.requests import Request
+from http_cache import EncodedBody, cached_response, compressed_response
+
+def make_request(method: str, headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "headers": [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+    })
+
+BODY = EncodedBody(json.dumps({"results": ["case"] * 500}).encode("utf-8"), static=False)
+
+def test_post_response_has_no_validators_and_reuses_compressed_bytes():
+    response = compressed_response(make_request("POST", {"Accept-Encoding": "gzip"}), BODY)
+    assert "etag" not in response.headers
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.body is BODY.body("gzip")
+    assert gzip.decompress(response.body) == BODY.raw
+
+def test_get_response_revalidates():
+    etag = cached_response(make_request("GET", {}), BODY).headers["etag"]
+    assert cached_response(make_request("GET", {"If-None-Match": etag}), BODY).status_code == 304
+
+def test_search_cache_keeps_requested_jurisdiction(search_client):
+    # null and "federal" resolve to the same search, but each is echoed as sent
+    query = {"query": "miranda warnings during custodial interrogation"}
+    first = search_client.post("/search", json={**query, "jurisdiction": None})
+    second = search_client.post("/search", json={**query, "jurisdiction": "federal"})
+    assert first.status_code == second.status_code == 200
+    assert first.json()["jurisdiction_filter"] is None
+    assert second.json()["jurisdiction_filter"] == "federal"
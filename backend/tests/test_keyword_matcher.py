@@ -0,0 +1,38 @@
+from keyword_matcher import KeywordAutomaton, tokenize
+
+def automaton(*phrases: str) -> KeywordAutomaton:
+    matcher = KeywordAutomaton()
+    for phrase in phrases:
+        matcher.add(phrase, phrase)
+    return matcher.build()
+
+def test_phrases_match_on_word_boundaries():
+    matcher = automaton("search")
+    assert matcher.match("legal research on searches") == {}
+    assert matcher.match("a search of the car") == {"search": 1.0}
+
+def test_overlapping_phrases_both_match():
+    matcher = automaton("fourth amendment", "amendment", "amendment rights")
+    assert matcher.matched_phrases("my fourth amendment rights") == ["fourth amendment", "amendment", "amendment rights"]
+
+def test_punctuation_separates_words():
+    assert tokenize("Self-Incrimination, (Miranda)!") == ["self", "incrimination", "miranda"]
+    matcher = automaton("self-incrimination")
+    assert matcher.match("the right against self incrimination") == {"self-incrimination": 1.0}
+    assert matcher.match("my self-incrimination privilege") == {"self-incrimination": 1.0}
+
+def test_each_phrase_counts_once_per_text():
+    matcher = KeywordAutomaton()
+    matcher.add("warrant", "case", 2.0)
+    matcher.add("search warrant", "case", 1.0)
+    matcher.build()
+    assert matcher.match("warrant after warrant, then a search warrant") == {"case": 3.0}
+
+def test_rebuilding_after_add_does_not_duplicate_outputs():
+    matcher = automaton("amendment", "fourth amendment")
+    matcher.add("fifth amendment", "fifth amendment")
+    matcher.build()
+    matcher.build()
+    matches = [phrase_id for _, phrase_id in matcher.iter_matches("fourth amendment")]
+    assert len(matches) == len(set(matches)) == 2
+    assert matcher.matched_phrases("fifth amendment") == ["fifth amendment", "amendment"]
@@ -0,0 +1,23 @@
+import io
+import json
+import logging
+from logs import setup_logging, stop_logging
+
+def test_logging_restarts_after_stop():
+    logger = logging.getLogger("tests.logs")
+    for run in range(2):
+        stream = io.StringIO()
+        setup_logging(stream)
+        logger.warning("run %d", run, extra={"event": "test.run"})
+        stop_logging()
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == [f"run {run}"]
+        assert lines[0]["event"] == "test.run"
+
+def test_stop_logging_detaches_queue_handler():
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    setup_logging(io.StringIO())
+    assert len(root.handlers) == len(handlers) + 1
+    stop_logging()
+    assert root.handlers == handlers
@@ -0,0 +1,76 @@
+import pytest
+import database
+from facets import FacetIndex
+from pagination import decode_cursor, encode_cursor
+
+QUERIES = [
+    "police searched my car during a traffic stop",
+    "miranda warnings",
+    "warrant",
+    # Matches nearly every case, with many tied scores
+    "the court ruled on the search of the car"
+]
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(20, "Miranda  warnings", "federal{}")
+    assert decode_cursor(cursor, "miranda warnings", "federal{}") == 20
+
+@pytest.mark.parametrize("query, scope", [("miranda rights", "federal{}"), ("miranda warnings", "all{}")])
+def test_cursor_from_another_search_is_rejected(query, scope):
+    cursor = encode_cursor(20, "miranda warnings", "federal{}")
+    with pytest.raises(ValueError, match="does not belong"):
+        decode_cursor(cursor, query, scope)
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(ValueError, match="Malformed"):
+        decode_cursor("not a cursor", "miranda warnings", "federal{}")
+
+def full_sort(query: str, jurisdiction: str) -> list:
+    """Every case scored and sorted, ties to the earlier case"""
+    keyword_scores = database.keyword_matches(query)
+    query_words = query.lower().split()
+    scored = []
+    for index, case in enumerate(database.get_cases()):
+        if jurisdiction != "all" and case.get("jurisdiction", "federal") != jurisdiction:
+            continue
+        score = keyword_scores.get(index, 0) + database._text_score(case, query_words)
+        if score > 0:
+            scored.append((index, score))
+    return sorted(scored, key=lambda item: (-item[1], item[0]))
+
+@pytest.mark.parametrize("query", QUERIES)
+@pytest.mark.parametrize("jurisdiction", ["all", "federal"])
+@pytest.mark.parametrize("offset, max_results", [(0, 1), (0, 5), (3, 4), (10, 10)])
+def test_early_exit_keeps_full_sort_order(query, jurisdiction, offset, max_results):
+    expected = full_sort(query, jurisdiction)[offset:offset + max_results]
+    assert database.rank_cases(query, jurisdiction, max_results, offset) == expected
+
+def test_early_exit_keeps_an_earlier_case_that_ties_without_keywords(monkeypatch):
+    def case(name: str, facts: str, principle: str, keywords: list) -> dict:
+        return {"case_name": name, "citation": name, "year": 2000, "court": "Supreme Court of the United States",
+                "facts": facts, "legal_principle": principle, "keywords": keywords, "jurisdiction": "federal"}
+
+    # The keyword case scores 2 + 1 and is ranked first; the earlier case
+    # scores 0 + 3, which the bound must still consider to break the tie
+    cases = [case("Alpha v. State", "alpha", "alpha", []), case("People v. Doe", "alpha", "beta", ["alpha"])]
+    indexes = {"keyword_automaton": database._build_keyword_automaton(cases), "facets": FacetIndex(cases)}
+    monkeypatch.setattr(database, "get_cases", lambda: cases)
+    monkeypatch.setattr(database, "get_index", indexes.get)
+    assert database.rank_cases("alpha", "federal", 1) == [(0, 3)]
+
+def test_search_pages_follow_the_ranking(search_client):
+    request = {"query": QUERIES[-1], "jurisdiction": "all", "page_size": 5}
+    names = []
+    for _ in range(20):
+        response = search_client.post("/search", json=request).json()
+        names += [result["case_name"] for result in response["results"]]
+        if response["next_cursor"] is None:
+            break
+        request["cursor"] = response["next_cursor"]
+    cases = database.get_cases()
+    assert names == [cases[index]["case_name"] for index, _ in full_sort(QUERIES[-1], "all")]
+
+def test_search_rejects_a_cursor_from_another_query(search_client):
+    first = search_client.post("/search", json={"query": QUERIES[-1], "page_size": 1}).json()
+    response = search_client.post("/search", json={"query": "miranda warnings during custodial interrogation", "cursor": first["next_cursor"]})
+    assert response.status_code == 400
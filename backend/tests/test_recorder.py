@@ -0,0 +1,17 @@
+from recorder import anonymize_query
+
+KEY = b"test-key"
+
+def test_vocabulary_is_kept_and_other_words_are_hashed():
+    words = anonymize_query("Officer searched John Smith in his car", KEY).split()
+    assert words[:2] + words[4:] == ["Officer", "searched", "in", "his", "car"]
+    assert all(word.startswith("x") and len(word) == 9 for word in words[2:4])
+
+def test_near_vocabulary_words_are_hashed():
+    # One edit from "warrant" and "search", but could as well be names
+    for word in ("warant", "serch"):
+        assert anonymize_query(word, KEY) != word
+
+def test_hashes_repeat_only_under_the_same_key():
+    assert anonymize_query("Smith", KEY) == anonymize_query("smith", KEY)
+    assert anonymize_query("Smith", KEY) != anonymize_query("Smith", b"other-key")
@@ -0,0 +1,81 @@
+import copy
+import pytest
+import database
+import related
+from case_packs import case_id
+
+def test_graph_file_round_trip(tmp_path):
+    cases = database.get_cases()
+    path = str(tmp_path / "graph.json")
+    assert related.write_graph(cases, path) == (len(cases), "full")
+    adjacency, missing = related.read_graph(cases, path)
+    assert missing == 0
+    built = related._adjacency(related._full_build(cases))
+    assert adjacency.keys() == built.keys()
+    for identifier, neighbours in built.items():
+        assert [other for other, _ in adjacency[identifier]] == [other for other, _ in neighbours]
+        assert [score for _, score in adjacency[identifier]] == pytest.approx([score for _, score in neighbours], abs=1e-6)
+
+def assert_same_graph(adjacency, built):
+    assert adjacency.keys() == built.keys()
+    for identifier, neighbours in built.items():
+        assert [other for other, _ in adjacency[identifier]] == [other for other, _ in neighbours]
+        assert [score for _, score in adjacency[identifier]] == pytest.approx([score for _, score in neighbours], abs=1e-5)
+
+def test_offline_build_extends_the_graph_file_like_a_full_rebuild(tmp_path):
+    cases = database.get_cases()
+    path = str(tmp_path / "graph.json")
+    related.write_graph(cases, path)
+    # Repeating the facts changes the case's weights but no document frequency,
+    # so a full rebuild fits the same vocabulary and IDF weights
+    changed = copy.deepcopy(cases)
+    changed[0]["facts"] += " " + changed[0]["facts"]
+    assert related.write_graph(changed, path) == (len(cases), "incremental")
+    adjacency, missing = related.read_graph(changed, path)
+    assert missing == 0
+    assert_same_graph(adjacency, related._adjacency(related._full_build(changed)))
+
+def test_extend_rescores_rows_that_lose_a_neighbour():
+    cases = database.get_cases()
+    state = related._full_build(cases[:-5])
+    removed = case_id(cases[0])
+    related._extend(state, cases[-5:], {removed})
+    assert removed not in state.ids
+    for row, neighbours, _ in related._score_rows(state, list(range(len(state.ids)))):
+        assert [position for _, position in state.neighbours[row]] == [position for _, position in neighbours]
+
+def test_offline_build_starts_over_once_the_vocabulary_drifts(tmp_path, monkeypatch):
+    cases = database.get_cases()
+    path = str(tmp_path / "graph.json")
+    related.write_graph(cases[:-5], path)
+    monkeypatch.setattr(related, "RELATED_MAX_DRIFT", 0.0)
+    assert related.write_graph(cases, path) == (len(cases), "full")
+    assert related.write_graph(cases, path) == (len(cases), "incremental")
+
+def test_changed_cases_are_dropped_from_a_stale_graph(tmp_path):
+    cases = database.get_cases()
+    path = str(tmp_path / "graph.json")
+    related.write_graph(cases, path)
+    changed = copy.deepcopy(cases)
+    changed[0]["facts"] += " Additional facts."
+    adjacency, missing = related.read_graph(changed, path)
+    assert missing == 1
+    assert case_id(changed[0]) not in adjacency
+    assert all(case_id(changed[0]) not in [other for other, _ in neighbours] for neighbours in adjacency.values())
+
+def test_server_loads_the_graph_file_without_building(tmp_path, monkeypatch):
+    cases = database.get_cases()
+    path = str(tmp_path / "graph.json")
+    related.write_graph(cases, path)
+    monkeypatch.setattr(related, "RELATED_GRAPH_PATH", path)
+    monkeypatch.setattr(related, "_full_build", None)
+    index = related.build_related_index(cases)
+    assert related._last_build["mode"] == "file"
+    assert index.body(case_id(cases[0])) is not None
+
+def test_missing_graph_file_is_built_only_when_opted_in(tmp_path, monkeypatch):
+    cases = database.get_cases()
+    monkeypatch.setattr(related, "RELATED_GRAPH_PATH", str(tmp_path / "missing.json"))
+    assert related.build_related_index(cases).body(case_id(cases[0])) is None
+    monkeypatch.setattr(related, "RELATED_BUILD_IN_PROCESS", True)
+    assert related.build_related_index(cases).body(case_id(cases[0])) is not None
@@ -0,0 +1,25 @@
+import json
+import database
+import startup
+from cache import search_response_cache, summary_cache
+
+def test_reload_swaps_corpus_and_clears_caches(tmp_path, monkeypatch):
+    cases = database.get_cases()
+    path = tmp_path / "cases.json"
+    path.write_text(json.dumps(cases[:5]), encoding="utf-8")
+    original_path = database.CASES_PATH
+    search_response_cache.set(("query", "federal", 0, 10), b"{}")
+    summary_cache.set(("citation", "query", "federal"), b"{}")
+    generation = database.corpus_generation()
+    monkeypatch.setattr(database, "CASES_PATH", str(path))
+    try:
+        result = startup.reload_corpus()
+        assert result["case_count"] == 5
+        assert result["generation"] == generation + 1
+        assert len(search_response_cache) == 0 and len(summary_cache) == 0
+        # Indexes were rebuilt from the new corpus before the swap
+        assert all(database.index_status()["indexes"].values())
+        assert database.get_index("facets").all == (1 << 5) - 1
+    finally:
+        monkeypatch.setattr(database, "CASES_PATH", original_path)
+        database.reload_cases()
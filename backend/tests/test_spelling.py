@@ -0,0 +1,28 @@
+import pytest
+from spelling import correct_query, is_english_word, load_english_words
+
+@pytest.mark.parametrize("query", [
+    "driving on main street",
+    "can police search my weed",
+    "suspect handcuffed and searched",
+    "officers smelled marijuana in the cars",
+])
+def test_valid_words_are_not_corrected(query):
+    corrected, corrections = correct_query(query)
+    assert corrected == query
+    assert corrections == []
+
+@pytest.mark.parametrize("query, expected", [
+    ("serch during a trafic stop", "search during a traffic stop"),
+    ("search without a warant", "search without a warrant"),
+])
+def test_misspelled_legal_terms_are_corrected(query, expected):
+    corrected, corrections = correct_query(query)
+    assert corrected == expected
+    assert corrections
+
+def test_inflected_english_words_are_recognized():
+    english_words = load_english_words()
+    assert is_english_word("searched", english_words)
+    assert is_english_word("cities", english_words)
+    assert not is_english_word("trafic", english_words)
@@ -0,0 +1,43 @@
+import pytest
+import suggest
+from suggest import PhraseTrie
+
+@pytest.fixture
+def trie(monkeypatch):
+    trie = PhraseTrie(max_results=5)
+    trie.add("Search incident to arrest", 3.0)
+    trie.add("Scope of search incident to arrest for minor offenses", 1.0)
+    trie.add("Fourth Amendment", 2.0)
+    trie.add("Use of deadly force against fleeing suspects", 1.0)
+    trie.add("Self-Incrimination", 1.0)
+    monkeypatch.setattr(suggest, "get_index", lambda name: suggest.SuggestIndex(trie, None))
+    return trie
+
+def texts(text: str) -> list:
+    return [suggestion.text for suggestion in suggest.suggest(text)]
+
+def test_prefix_completes_whole_phrase(trie):
+    assert trie.complete("fourth am", 5) == [("fourth amendment", 2.0)]
+    assert texts("Fourth am") == ["fourth amendment"]
+
+def test_suffix_match_completes_whole_phrase_without_head(trie):
+    assert texts("amend") == ["fourth amendment"]
+    assert texts("incrim") == ["self-incrimination"]
+
+def test_typed_head_keeps_only_matched_words(trie):
+    assert texts("when can i search incid") == [
+        "when can i search incident to arrest",
+        "when can i search incident to arrest for minor offenses"
+    ]
+    assert texts("can officers use deadly fo") == ["can officers use deadly force against fleeing suspects"]
+
+def test_same_completion_is_listed_once(trie):
+    trie.add("Search incident to arrest for minor offenses", 0.5)
+    assert texts("when can i search incid") == [
+        "when can i search incident to arrest",
+        "when can i search incident to arrest for minor offenses"
+    ]
+
+def test_no_completion(trie):
+    assert texts("zzz") == []
+    assert texts("") == []
@@ -2,6 +2,47 @@ from typing import Optional
 import re
 from models import QueryClarification
 
+# Refinements offered for vague queries, by the topic the query mentions
+SEARCH_REFINEMENTS = [
+    "vehicle search without consent",
+    "search incident to arrest",
+    "search warrant requirements",
+    "consent to search procedures"
+]
+TRAFFIC_STOP_REFINEMENTS = [
+    "traffic stop duration limits",
+    "vehicle search during traffic stop", 
+    "passenger rights during traffic stop",
+    "DUI investigation procedures"
+]
+ARREST_REFINEMENTS = [
+    "arrest warrant requirements",
+    "warrantless arrest authority",
+    "arrest procedures for specific crimes",
+    "Miranda rights timing"
+]
+RIGHTS_REFINEMENTS = [
+    "Miranda rights requirements",
+    "Fourth Amendment search rights",
+    "suspect's right to counsel",
+    "passenger rights during stops"
+]
+GENERAL_REFINEMENTS = [
+    "vehicle search procedures",
+    "traffic stop authority",
+    "arrest warrant requirements", 
+    "evidence collection rules",
+    "Miranda rights timing",
+    "use of force guidelines"
+]
+REFINEMENT_LISTS = (
+    SEARCH_REFINEMENTS,
+    TRAFFIC_STOP_REFINEMENTS,
+    ARREST_REFINEMENTS,
+    RIGHTS_REFINEMENTS,
+    GENERAL_REFINEMENTS
+)
+
 def analyze_query_clarity(query: str) -> Optional[QueryClarification]:
     """Analyze if query is too vague and needs clarification"""
     query_lower = query.lower().strip()
@@ -47,43 +88,16 @@ def analyze_query_clarity(query: str) -> Optional[QueryClarification]:
     suggestions = []
     
     if 'search' in query_lower:
-        suggestions = [
-            "vehicle search without consent",
-            "search incident to arrest",
-            "search warrant requirements",
-            "consent to search procedures"
-        ]
+        suggestions = SEARCH_REFINEMENTS
     elif 'traffic' in query_lower or 'stop' in query_lower:
-        suggestions = [
-            "traffic stop duration limits",
-            "vehicle search during traffic stop", 
-            "passenger rights during traffic stop",
-            "DUI investigation procedures"
-        ]
+        suggestions = TRAFFIC_STOP_REFINEMENTS
     elif 'arrest' in query_lower:
-        suggestions = [
-            "arrest warrant requirements",
-            "warrantless arrest authority",
-            "arrest procedures for specific crimes",
-            "Miranda rights timing"
-        ]
+        suggestions = ARREST_REFINEMENTS
     elif 'rights' in query_lower:
-        suggestions = [
-            "Miranda rights requirements",
-            "Fourth Amendment search rights",
-            "suspect's right to counsel",
-            "passenger rights during stops"
-        ]
+        suggestions = RIGHTS_REFINEMENTS
     else:
         # Generic suggestions for very vague queries
-        suggestions = [
-            "vehicle search procedures",
-            "traffic stop authority",
-            "arrest warrant requirements", 
-            "evidence collection rules",
-            "Miranda rights timing",
-            "use of force guidelines"
-        ]
+        suggestions = GENERAL_REFINEMENTS
     
     clarification_message = "Your query seems quite broad. To provide more relevant case law and guidance, could you be more specific about the situation or legal issue you're dealing with?"
     
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { QueryRequest, QueryResponse, ReportRequest, ReportResponse, Jurisdiction } from '../types';
+import type { CasePack, QueryRequest, RelatedCasesResponse, SuggestResponse, Suggestion, QueryResponse, ReportRequest, ReportResponse, Jurisdiction } from '../types';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -22,6 +22,16 @@ export const searchCaseLaw = async (request: QueryRequest): Promise<QueryRespons
   }
 };
 
+export const getSuggestions = async (query: string, limit = 8): Promise<Suggestion[]> => {
+  try {
+    const response = await apiClient.get<SuggestResponse>('/suggest', { params: { q: query, limit } });
+    return response.data.suggestions;
+  } catch {
+    // Typeahead is best-effort; a failed lookup just shows no suggestions
+    return [];
+  }
+};
+
 export const generateReport = async (request: ReportRequest): Promise<ReportResponse> => {
   try {
     const response = await apiClient.post<ReportResponse>('/generate-report', request);
@@ -46,6 +56,44 @@ export const getJurisdictions = async (): Promise<Jurisdiction[]> => {
   }
 };
 
+export const getCasePack = async (jurisdiction: string, since?: string): Promise<CasePack> => {
+  try {
+    const response = await apiClient.get<CasePack>(`/case-packs/${jurisdiction}`, {
+      params: since ? { since } : undefined,
+    });
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(error.response?.data?.detail || 'Failed to fetch case pack');
+    }
+    throw new Error('An unexpected error occurred');
+  }
+};
+
+// Bring a stored pack up to date: apply the delta, or replace it when the server sent a full pack
+export const syncCasePack = async (stored: CasePack): Promise<CasePack> => {
+  const update = await getCasePack(stored.jurisdiction, stored.version);
+  if (update.full) {
+    return update;
+  }
+  const cases = new Map(stored.cases.map((packed) => [packed.id, packed]));
+  update.removed.forEach((id) => cases.delete(id));
+  update.cases.forEach((packed) => cases.set(packed.id, packed));
+  return { ...update, full: true, since: undefined, cases: Array.from(cases.values()), removed: [] };
+};
+
+export const getRelatedCases = async (caseId: string): Promise<RelatedCasesResponse> => {
+  try {
+    const response = await apiClient.get<RelatedCasesResponse>(`/cases/${caseId}/related`);
+    return response.data;
+  } catch (error) {
+    if (axios.isAxiosError(error)) {
+      throw new Error(error.response?.data?.detail || 'Failed to fetch related cases');
+    }
+    throw new Error('An unexpected error occurred');
+  }
+};
+
 export const healthCheck = async (): Promise<{ status: string; timestamp: string }> => {
   try {
     const response = await apiClient.get('/health');
@@ -11,6 +11,8 @@ export interface CaseSummary {
   relevance_score: number;
   full_text_link?: string;
   jurisdiction?: string;
+  generation_tier?: string;
+  case_id?: string;
 }
 
 export interface QueryClarification {
@@ -20,6 +22,21 @@ export interface QueryClarification {
   original_query: string;
 }
 
+export interface SpellingCorrection {
+  original: string;
+  corrected: string;
+}
+
+export interface Suggestion {
+  text: string;
+  score: number;
+}
+
+export interface SuggestResponse {
+  query: string;
+  suggestions: Suggestion[];
+}
+
 export interface QueryResponse {
   query: string;
   results: CaseSummary[];
@@ -27,11 +44,23 @@ export interface QueryResponse {
   processing_time: number;
   jurisdiction_filter?: string;
   clarification?: QueryClarification;
+  next_cursor?: string;
+  facet_counts?: Record<string, Record<string, number>>;
+  corrected_query?: string;
+  spelling_corrections?: SpellingCorrection[];
 }
 
 export interface QueryRequest {
   query: string;
   jurisdiction?: string;
+  page_size?: number;
+  cursor?: string;
+  latency_budget_ms?: number;
+  jurisdictions?: string[];
+  courts?: string[];
+  court_levels?: string[];
+  year_from?: number;
+  year_to?: number;
 }
 
 export interface ActionableInsight {
@@ -49,15 +78,60 @@ export interface ReportResponse {
   legal_warnings: string[];
   jurisdiction_specific_notes: string[];
   generated_at: string;
+  generation_tier?: string;
 }
 
 export interface ReportRequest {
   query: string;
   case_results: CaseSummary[];
   jurisdiction?: string;
+  latency_budget_ms?: number;
 }
 
 export interface Jurisdiction {
   value: string;
   label: string;
 }
+
+export interface PackedCase {
+  id: string;
+  digest: string;
+  case_name: string;
+  citation: string;
+  year: number;
+  court: string;
+  court_level: string;
+  jurisdiction: string;
+  facts: string;
+  legal_principle: string;
+  ruling: string;
+  keywords: string[];
+}
+
+export interface CasePack {
+  format: number;
+  jurisdiction: string;
+  version: string;
+  full: boolean;
+  since?: string;
+  keyword_weight: number;
+  cases: PackedCase[];
+  removed: string[];
+}
+
+export interface RelatedCase {
+  id: string;
+  case_name: string;
+  citation: string;
+  year: number;
+  court: string;
+  jurisdiction: string;
+  score: number;
+}
+
+export interface RelatedCasesResponse {
+  id: string;
+  case_name: string;
+  citation: string;
+  related: RelatedCase[];
+}